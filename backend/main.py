@@ -3,33 +3,56 @@ Enhanced FastAPI backend for Smart Crop Advisory System
 """
 
 import os
+import json
 import uuid
-from typing import Optional
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # Load environment variables from backend/.env (when running from project root)
 env_path = os.path.join(os.path.dirname(__file__), ".env")
 load_dotenv(dotenv_path=env_path)
 
+# Per-request messages are DEBUG; at the default level they cost one level check
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
 # Import services (absolute imports from project root)
 from backend.services.weather_service import get_weather_service
 from backend.services.soil_service import get_soil_service
-from backend.services.crop_service import get_crop_service
+from backend.services.crop_service import get_crop_service, FEATURES
 from backend.services.translation_service import get_translation_service
-from backend.services.chatbot_service import get_chatbot_service
+from backend.services.chatbot_service import get_chatbot_service, ChatbotService
+from backend.services.session_store import SQLiteSessionStore
+from backend.services.batching_service import get_micro_batcher
+from backend.services.location_catalog import get_location_catalog, CachedJSON
+from backend.services.recommendation_table import load_recommendation_table
 
 # Import models (absolute imports from project root)
 from backend.models.request_models import PredictRequest, ChatbotRequest
-from backend.models.response_models import PredictResponse, CropPrediction, ChatbotResponse
+from backend.models.response_models import (
+    PredictResponse, CropPrediction, ChatbotResponse, BatchPrediction, BatchPredictResponse
+)
 
 # Import utilities (absolute imports from project root)
 from backend.utils.helpers import (
     calculate_risk_level, validate_soil_values, validate_month,
-    get_season_name, format_response
+    get_season_name, format_response, parse_feature_rows, feature_row,
+    parse_quantization_steps, quantize_features
 )
+from backend.utils.timing import StageTimer, StageStats
+from backend.utils.metrics import REGISTRY, CONTENT_TYPE
+from backend.utils.cache import TTLCache
+from backend.utils.streaming import ndjson_lines, NDJSONStreamingResponse
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -60,6 +83,110 @@ crop_service = get_crop_service()
 translation_service = get_translation_service()
 chatbot_service = get_chatbot_service()
 
+# CPU-bound model inference runs on a small bounded pool, off the event loop
+inference_workers = int(os.getenv("INFERENCE_WORKERS", "2"))
+inference_executor = ThreadPoolExecutor(max_workers=inference_workers, thread_name_prefix="inference")
+micro_batcher = get_micro_batcher(crop_service, executor=inference_executor, max_inflight=inference_workers)
+location_catalog = get_location_catalog(fallback_states=ChatbotService.STATES_LIST)
+recommendation_table = load_recommendation_table()
+stage_stats = StageStats()
+
+# /predict/stream: rows per inference batch, and parsed batches a stream may
+# hold before it stops reading the request body
+STREAM_BATCH_SIZE = int(os.getenv("PREDICT_STREAM_BATCH_SIZE", "256"))
+STREAM_MAX_BATCH_SIZE = 4096
+STREAM_QUEUE_BATCHES = int(os.getenv("PREDICT_STREAM_QUEUE_BATCHES", "4"))
+STREAM_MAX_LINE_BYTES = 65536
+
+# /predict/ top crops, keyed on the location and the model features rounded to
+# PREDICT_CACHE_STEPS; entries live as long as the weather they were computed from.
+# Only the predictions are shared: every response reports its own inputs
+predict_cache_size = int(os.getenv("PREDICT_CACHE_SIZE", "4096"))
+predict_cache_steps = parse_quantization_steps(os.getenv("PREDICT_CACHE_STEPS", "ph=0.1"), FEATURES)
+predict_cache = TTLCache(
+    maxsize=predict_cache_size,
+    ttl=float(os.getenv(
+        "PREDICT_CACHE_TTL",
+        weather_service.cache.ttl if weather_service.cache is not None else 600
+    ))
+) if predict_cache_size > 0 else None
+
+# Prometheus metrics, served on /metrics
+STAGE_LATENCY = REGISTRY.histogram(
+    "predict_stage_duration_milliseconds",
+    "Latency of each /predict/ pipeline stage",
+    ("stage",)
+)
+PREDICT_ERRORS = REGISTRY.counter(
+    "predict_errors_total",
+    "Failed predictions by HTTP status code",
+    ("status",)
+)
+PRECOMPUTED_LOOKUPS = REGISTRY.counter(
+    "predict_precomputed_total",
+    "Default-soil predictions by whether the precomputed table answered them",
+    ("result",)
+)
+STREAM_ROWS = REGISTRY.counter(
+    "predict_stream_rows_total",
+    "/predict/stream input lines by outcome",
+    ("result",)
+)
+CATALOG_NOT_MODIFIED = REGISTRY.counter(
+    "catalog_not_modified_total",
+    "State and district lookups answered with 304 from the client's ETag"
+)
+REGISTRY.gauge(
+    "chatbot_sessions",
+    "Live chatbot sessions (sqlite store: as of its last sweep)",
+    lambda: len(chatbot_service.sessions)
+)
+REGISTRY.gauge(
+    "predict_batch_queue_depth",
+    "Predictions waiting for the micro-batcher",
+    lambda: micro_batcher.metrics()["queue_depth"]
+)
+if weather_service.cache is not None:
+    REGISTRY.counter_function(
+        "weather_cache_events_total",
+        "Weather cache lookups by outcome",
+        "event",
+        lambda: {key: weather_service.cache.stats()[key] for key in ("hits", "misses", "coalesced", "evictions")}
+    )
+    REGISTRY.gauge(
+        "weather_cache_size",
+        "Districts currently in the weather cache",
+        lambda: weather_service.cache.stats()["size"]
+    )
+if predict_cache is not None:
+    REGISTRY.counter_function(
+        "predict_cache_events_total",
+        "/predict/ response cache lookups by outcome",
+        "event",
+        lambda: {key: predict_cache.stats()[key] for key in ("hits", "misses", "coalesced", "evictions")}
+    )
+    REGISTRY.gauge(
+        "predict_cache_size",
+        "Responses currently in the /predict/ response cache",
+        lambda: predict_cache.stats()["size"]
+    )
+
+
+def record_timings(timer: StageTimer):
+    """Feed one finished request's stage timings to /predict/timings and /metrics"""
+    timings = timer.finish()
+    stage_stats.record(timings)
+    for stage, duration in timings.items():
+        STAGE_LATENCY.observe(duration, stage=stage)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Fail any queued predictions, stop the micro-batcher and close pooled connections"""
+    await micro_batcher.stop()
+    await weather_service.aclose()
+    inference_executor.shutdown(wait=False)
+
 
 # ============================================================================
 # HEALTH CHECK ENDPOINTS
@@ -86,77 +213,100 @@ async def health():
             "crop_model": "✓",
             "translation": "✓",
             "chatbot": "✓"
-        }
+        },
+        "batcher": micro_batcher.metrics(),
+        "weather_cache": weather_service.cache.stats() if weather_service.cache is not None else None,
+        "predict_cache": predict_cache.stats() if predict_cache is not None else None,
+        "chatbot_sessions": chatbot_service.sessions.stats(),
+        "precomputed_table": {
+            "fingerprint": recommendation_table.fingerprint[:12],
+            "current_model": recommendation_table.fingerprint == crop_service.registry.get().fingerprint,
+            "weather_source": recommendation_table.weather_source,
+            "built_at": recommendation_table.built_at
+        } if recommendation_table is not None else None
     }
 
 
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Stage latency histograms, cache and error counters in the Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # ============================================================================
 # MAIN PREDICTION ENDPOINT
 # ============================================================================
 
-@app.post("/predict/", response_model=PredictResponse, tags=["Predictions"])
-async def predict_crop(request: PredictRequest):
+def did_you_mean(names: List[str]) -> str:
+    return f". Did you mean: {', '.join(names)}?" if names else ""
+
+
+def resolve_location(state: str, district: str) -> Tuple[str, str]:
     """
-    Predict top 3 crops with confidence scores.
+    Map state and district to their spelling in the rainfall dataset.
     
-    **Mandatory fields:**
-    - state: State/UT name (UPPERCASE)
-    - district: District name (UPPERCASE)
-    - month: Month abbreviation (JAN, FEB, etc)
+    Case, spacing and punctuation differences are corrected; anything else
+    is rejected with the closest matches, instead of silently falling back
+    to default rainfall.
     
-    **Optional fields (auto-fetched if not provided):**
-    - nitrogen, phosphorous, potassium, ph
+    Returns:
+        Tuple of (state, district) as spelled in the dataset
     
-    **Returns:**
-    - Top 3 crop recommendations with confidence scores
-    - Risk assessment based on weather
-    - Advisory message
+    Raises:
+        HTTPException: 400 if the state or district is not in the dataset
     """
+    index = location_catalog.index()
+    if not len(index.districts):
+        # Rainfall data not loaded; nothing to validate against
+        return state, district
     
-    try:
-        # Validate mandatory fields
-        if not request.state or not request.district or not request.month:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="State, district, and month are mandatory"
-            )
-        
-        # Validate month format
-        if not validate_month(request.month):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Month must be in format: JAN, FEB, MAR, ... DEC"
-            )
-        
+    resolved_state = index.resolve_state(state, fuzzy=False)
+    if resolved_state is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown state '{state}'" + did_you_mean([m.name for m in index.suggest_states(state, k=3)])
+        )
+    
+    resolved_district = index.resolve_district(district, resolved_state, fuzzy=False)
+    if resolved_district is None:
+        suggestions = [m.name for m in index.suggest_districts(district, resolved_state, k=3)]
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown district '{district}' in {resolved_state}" + did_you_mean(suggestions)
+        )
+    
+    return resolved_state, resolved_district
+
+
+def lookup_local_inputs(request: PredictRequest, timer: StageTimer):
+    """
+    Soil and rainfall stages: in-memory lookups that run while weather is in flight.
+    
+    Returns:
+        Tuple of (nitrogen, phosphorous, potassium, ph, soil_values_used, rainfall)
+    """
+    with timer.stage("soil"):
         # Fetch or use provided soil values
         nitrogen = request.nitrogen
         phosphorous = request.phosphorous
         potassium = request.potassium
         ph = request.ph
         
-        soil_values_used = {
-            "nitrogen": nitrogen,
-            "phosphorous": phosphorous,
-            "potassium": potassium,
-            "ph": ph
-        }
-        
         # If auto-detect is enabled and values are missing, fetch them
         if request.use_auto_values:
             if nitrogen is None or phosphorous is None or potassium is None or ph is None:
-                print("📊 Fetching default soil values...")
                 default_soil = soil_service.get_default_soil_values(request.district)
                 nitrogen = nitrogen or default_soil["nitrogen"]
                 phosphorous = phosphorous or default_soil["phosphorous"]
                 potassium = potassium or default_soil["potassium"]
                 ph = ph or default_soil["ph"]
-                
-                soil_values_used = {
-                    "nitrogen": nitrogen,
-                    "phosphorous": phosphorous,
-                    "potassium": potassium,
-                    "ph": ph
-                }
+        
+        soil_values_used = {
+            "nitrogen": nitrogen,
+            "phosphorous": phosphorous,
+            "potassium": potassium,
+            "ph": ph
+        }
         
         # Validate soil values
         validation = validate_soil_values(nitrogen, phosphorous, potassium, ph)
@@ -165,39 +315,46 @@ async def predict_crop(request: PredictRequest):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Soil values are out of valid range"
             )
-        
-        # Fetch weather data
-        print(f"🌤️ Fetching weather data for {request.district}...")
-        temperature, humidity = weather_service.get_weather_data(
-            request.district, 
-            request.state
-        )
-        
-        # Fetch rainfall data
-        print(f"💧 Fetching rainfall data...")
+    
+    with timer.stage("rainfall"):
         rainfall = soil_service.get_rainfall_data(
             request.state, 
             request.district, 
             request.month
         )
-        
-        # Get crop predictions
-        print(f"🌾 Running crop prediction model...")
-        predictions = crop_service.predict_top_crops(
-            nitrogen=nitrogen,
-            phosphorous=phosphorous,
-            potassium=potassium,
-            temperature=temperature,
-            humidity=humidity,
-            ph=ph,
-            rainfall=rainfall,
-            top_n=3
-        )
-        
-        # Calculate risk level
+    
+    return nitrogen, phosphorous, potassium, ph, soil_values_used, rainfall
+
+
+def lookup_precomputed(request: PredictRequest):
+    """
+    Precomputed answer for a request that left every soil value to the defaults.
+    
+    Returns:
+        Recommendation, or None if the table is missing, was built for another
+        model, or does not cover this district and month
+    """
+    if recommendation_table is None or not request.use_auto_values:
+        return None
+    if any(v is not None for v in (request.nitrogen, request.phosphorous, request.potassium, request.ph)):
+        return None
+    if recommendation_table.fingerprint != crop_service.registry.get().fingerprint:
+        return None
+    
+    recommendation = recommendation_table.lookup(request.state, request.district, request.month)
+    PRECOMPUTED_LOOKUPS.inc(result="hit" if recommendation is not None else "miss")
+    return recommendation
+
+
+def build_response(request: PredictRequest, predictions, rainfall: float, temperature: float,
+                   humidity: float, soil_values_used: dict, timer: StageTimer) -> PredictResponse:
+    """Risk and advisory stages, then the response body"""
+    # Calculate risk level
+    with timer.stage("risk"):
         risk_level, risk_description = calculate_risk_level(rainfall, temperature, humidity)
-        
-        # Generate advisory message
+    
+    # Generate advisory message
+    with timer.stage("advisory"):
         top_crop = predictions[0][0]
         advisory_message = translation_service.get_advisory_message(
             crop=top_crop,
@@ -206,36 +363,317 @@ async def predict_crop(request: PredictRequest):
             risk_level=risk_level,
             language=request.language
         )
+    
+    # Prepare response
+    top_predictions = [
+        CropPrediction(crop=crop, confidence=round(conf, 2))
+        for crop, conf in predictions
+    ]
+    
+    return PredictResponse(
+        top_predictions=top_predictions,
+        risk_level=risk_level,
+        rainfall=rainfall,
+        temperature=temperature,
+        humidity=humidity,
+        advisory_message=advisory_message,
+        soil_values_used=soil_values_used
+    )
+
+
+def predict_cache_key(request: PredictRequest, features: List[float]) -> tuple:
+    """
+    Prediction cache key: everything the top crops depend on, with the model
+    features rounded so near-identical requests share one entry.
+    
+    The model fingerprint is part of the key, so a reloaded model never
+    serves predictions computed by the previous one.
+    """
+    return (
+        crop_service.registry.get().fingerprint,
+        request.state, request.district, request.month,
+        quantize_features(features, [predict_cache_steps[name] for name in FEATURES])
+    )
+
+
+async def run_prediction(request: PredictRequest, timer: Optional[StageTimer] = None) -> PredictResponse:
+    """
+    Run the prediction pipeline and record each stage in `timer`.
+    
+    Stages: validation -> (weather || soil + rainfall) -> inference -> risk -> advisory.
+    The weather call is the only remote one, so it is started first and the
+    local lookups run while it is in flight. Inference is micro-batched and
+    scored on the bounded inference executor, off the event loop.
+    
+    Requests that use the default soil values are answered from the
+    precomputed district x month table (climatological weather) when one
+    is built for the current model: validation -> precomputed -> risk -> advisory.
+    
+    Otherwise, once the inputs are known, the top crops are looked up in the
+    prediction cache; identical concurrent misses share one inference call.
+    Risk, advisory and the echoed inputs always come from this request.
+    """
+    timer = timer or StageTimer()
+    
+    try:
+        with timer.stage("validation"):
+            # Validate mandatory fields
+            if not request.state or not request.district or not request.month:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="State, district, and month are mandatory"
+                )
+            
+            # Validate month format
+            if not validate_month(request.month):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Month must be in format: JAN, FEB, MAR, ... DEC"
+                )
+            
+            request.state, request.district = resolve_location(request.state, request.district)
         
-        # Prepare response
-        top_predictions = [
-            CropPrediction(crop=crop, confidence=round(conf, 2))
-            for crop, conf in predictions
-        ]
+        with timer.stage("precomputed"):
+            recommendation = lookup_precomputed(request)
+        if recommendation is not None:
+            return build_response(
+                request, recommendation.predictions, recommendation.rainfall,
+                recommendation.temperature, recommendation.humidity, recommendation.soil_values, timer
+            )
         
-        response = PredictResponse(
-            top_predictions=top_predictions,
-            risk_level=risk_level,
-            rainfall=rainfall,
-            temperature=temperature,
-            humidity=humidity,
-            advisory_message=advisory_message,
-            soil_values_used=soil_values_used
-        )
+        # Fetch weather data concurrently with the soil and rainfall lookups
+        weather_task = asyncio.ensure_future(timer.timed(
+            "weather",
+            weather_service.get_weather_data_async(request.district, request.state)
+        ))
+        try:
+            # ensure_future only schedules the task; yield once so the weather
+            # request is actually sent before the synchronous lookups block the loop
+            await asyncio.sleep(0)
+            nitrogen, phosphorous, potassium, ph, soil_values_used, rainfall = \
+                lookup_local_inputs(request, timer)
+            temperature, humidity = await weather_task
+        except BaseException:
+            weather_task.cancel()
+            raise
         
-        print("✅ Prediction completed successfully")
-        return response
+        features = [nitrogen, phosphorous, potassium, temperature, humidity, ph, rainfall]
+        
+        async def predict():
+            # Get crop predictions; concurrent requests share one forward pass
+            return await timer.timed("inference", micro_batcher.submit(features, top_n=3))
+        
+        if predict_cache is None:
+            predictions = await predict()
+        else:
+            predictions = await predict_cache.get_or_load_async(predict_cache_key(request, features), predict)
+        return build_response(request, predictions, rainfall, temperature, humidity, soil_values_used, timer)
         
-    except HTTPException:
+    except HTTPException as e:
+        PREDICT_ERRORS.inc(status=e.status_code)
         raise
     except Exception as e:
-        print(f"❌ Error in prediction: {str(e)}")
+        PREDICT_ERRORS.inc(status=500)
+        logger.exception("Error in prediction: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Prediction failed: {str(e)}"
         )
 
 
+@app.post("/predict/", response_model=PredictResponse, tags=["Predictions"])
+async def predict_crop(request: PredictRequest, response: Response):
+    """
+    Predict top 3 crops with confidence scores.
+    
+    **Mandatory fields:**
+    - state: State/UT name (UPPERCASE)
+    - district: District name (UPPERCASE)
+    - month: Month abbreviation (JAN, FEB, etc)
+    
+    **Optional fields (auto-fetched if not provided):**
+    - nitrogen, phosphorous, potassium, ph
+    
+    **Returns:**
+    - Top 3 crop recommendations with confidence scores
+    - Risk assessment based on weather
+    - Advisory message
+    
+    Per-stage timings are returned in the `Server-Timing` header.
+    """
+    
+    timer = StageTimer()
+    try:
+        return await run_prediction(request, timer)
+    finally:
+        record_timings(timer)
+        response.headers["Server-Timing"] = timer.server_timing()
+
+
+@app.get("/predict/timings", tags=["Predictions"])
+async def predict_timings():
+    """Rolling p50/p95/p99 latency of every /predict/ stage, in milliseconds"""
+    return {"stages": stage_stats.summary()}
+
+
+@app.post("/predict/batch", response_model=BatchPredictResponse, tags=["Predictions"])
+async def predict_crop_batch(request: Request, top_n: int = 3):
+    """
+    Predict top N crops for many feature rows in one forward pass.
+    
+    **Body:** a JSON array, or NDJSON (`application/x-ndjson`) with one item
+    per line. Each item is either an object with `nitrogen`, `phosphorous`,
+    `potassium`, `temperature`, `humidity`, `ph` and `rainfall`, or a list of
+    those seven values in that order.
+    
+    **Returns:**
+    - One set of top N crop recommendations per input row, in input order
+    """
+    
+    try:
+        body = await request.body()
+        matrix = parse_feature_rows(body, request.headers.get("content-type", ""), FEATURES)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid batch body: {str(e)}"
+        )
+    
+    try:
+        predictions = await asyncio.get_running_loop().run_in_executor(
+            inference_executor, crop_service.predict_top_crops_batch, matrix, top_n
+        )
+        
+        results = [
+            BatchPrediction(top_predictions=[
+                CropPrediction(crop=crop, confidence=round(conf, 2))
+                for crop, conf in row
+            ])
+            for row in predictions
+        ]
+        
+        return BatchPredictResponse(count=len(results), results=results)
+        
+    except Exception as e:
+        logger.exception("Error in batch prediction: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+
+_STREAM_END = object()
+
+
+async def read_stream_batches(request: Request, queue: asyncio.Queue, batch_size: int):
+    """
+    Parse the NDJSON request body line by line into batches on `queue`.
+    
+    Each batch is a list of (line number, feature row or error message).
+    `queue.put` blocks while the queue is full, so a client that sends
+    faster than it reads stops being read: TCP flow control pushes back.
+    Ends with _STREAM_END, or with the exception that stopped the read.
+    """
+    batch = []
+    try:
+        line_number = 0
+        async for line in ndjson_lines(request.stream(), STREAM_MAX_LINE_BYTES):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                item = feature_row(json.loads(line), FEATURES)
+            except (ValueError, UnicodeDecodeError) as e:
+                item = str(e)
+            batch.append((line_number, item))
+            if len(batch) >= batch_size:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+        await queue.put(_STREAM_END)
+    except Exception as e:
+        await queue.put(e)
+
+
+def score_stream_batch(batch: list, top_n: int) -> Tuple[bytes, int, int]:
+    """
+    Score one batch in a single forward pass and render it as NDJSON.
+    
+    Returns:
+        Tuple of (NDJSON lines, rows scored, rows rejected)
+    """
+    rows = [item for _, item in batch if not isinstance(item, str)]
+    if rows:
+        indices, confidences = crop_service.top_crops_arrays(rows, top_n)
+        names = crop_service.labels[indices].tolist()
+        confidences = confidences.astype(float).round(2).tolist()
+    
+    lines, scored = [], 0
+    for line_number, item in batch:
+        if isinstance(item, str):
+            result = {"line": line_number, "error": item}
+        else:
+            result = {"line": line_number, "top_predictions": [
+                {"crop": crop, "confidence": confidence}
+                for crop, confidence in zip(names[scored], confidences[scored])
+            ]}
+            scored += 1
+        lines.append(json.dumps(result, ensure_ascii=False))
+    lines.append("")
+    return "\n".join(lines).encode("utf-8"), scored, len(batch) - scored
+
+
+@app.post("/predict/stream", tags=["Predictions"])
+async def predict_crop_stream(request: Request, top_n: int = 3, batch_size: int = STREAM_BATCH_SIZE):
+    """
+    Stream top N crops for an NDJSON body of any length.
+    
+    **Body:** NDJSON (`application/x-ndjson`), one item per line, in the
+    same formats as `/predict/batch`.
+    
+    **Returns:** NDJSON, one line per non-empty input line, in input order:
+    `{"line": 1, "top_predictions": [...]}` or `{"line": 2, "error": "..."}`.
+    
+    Lines are scored in batches of `batch_size` as they arrive and each
+    batch is written back as soon as it is scored. At most a few parsed
+    batches are held per stream; while they are waiting, the request body
+    is not read further.
+    """
+    batch_size = max(1, min(batch_size, STREAM_MAX_BATCH_SIZE))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_BATCHES)
+    reader = asyncio.ensure_future(read_stream_batches(request, queue, batch_size))
+    
+    async def results():
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is _STREAM_END:
+                    return
+                if isinstance(batch, Exception):
+                    logger.debug("Prediction stream stopped: %s", batch)
+                    yield (json.dumps({"error": f"Stream stopped: {batch}"}) + "\n").encode("utf-8")
+                    return
+                
+                try:
+                    payload, scored, rejected = await loop.run_in_executor(
+                        inference_executor, score_stream_batch, batch, top_n
+                    )
+                except Exception as e:
+                    # Headers are already sent; report the failure in-band and stop
+                    logger.exception("Error in streaming prediction: %s", e)
+                    yield (json.dumps({"error": f"Prediction failed: {e}"}) + "\n").encode("utf-8")
+                    return
+                STREAM_ROWS.inc(scored, result="ok")
+                STREAM_ROWS.inc(rejected, result="error")
+                yield payload
+        finally:
+            reader.cancel()
+    
+    return NDJSONStreamingResponse(results())
+
+
 # ============================================================================
 # CHATBOT ENDPOINTS
 # ============================================================================
@@ -254,11 +692,17 @@ async def chatbot(request: ChatbotRequest):
         session_id = request.session_id or str(uuid.uuid4())
         
         # Get chatbot response
-        response_data = chatbot_service.get_response(
+        get_response = partial(
+            chatbot_service.get_response,
             user_message=request.message,
             session_id=session_id,
             language=request.language
         )
+        if isinstance(chatbot_service.sessions, SQLiteSessionStore):
+            # SQLite reads and writes can wait out a 5 s busy timeout; keep them off the event loop
+            response_data = await asyncio.get_running_loop().run_in_executor(None, get_response)
+        else:
+            response_data = get_response()
         
         # Check if ready for prediction
         if response_data.get("ready_for_prediction"):
@@ -279,7 +723,11 @@ async def chatbot(request: ChatbotRequest):
             )
             
             # Get prediction
-            prediction = await predict_crop(predict_request)
+            timer = StageTimer()
+            try:
+                prediction = await run_prediction(predict_request, timer)
+            finally:
+                record_timings(timer)
             
             # Extract top recommendation
             top_crop = prediction.top_predictions[0]
@@ -306,7 +754,7 @@ async def chatbot(request: ChatbotRequest):
         return response
         
     except Exception as e:
-        print(f"❌ Chatbot error: {str(e)}")
+        logger.exception("Chatbot error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Chatbot error: {str(e)}"
@@ -317,15 +765,19 @@ async def chatbot(request: ChatbotRequest):
 # UTILITY ENDPOINTS
 # ============================================================================
 
+def cached_json_response(request: Request, cached: CachedJSON) -> Response:
+    """Serve a pre-serialized catalog body, or 304 if the client already has it"""
+    headers = {"ETag": cached.etag, "Cache-Control": location_catalog.cache_control}
+    if cached.matches(request.headers.get("if-none-match")):
+        CATALOG_NOT_MODIFIED.inc()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
 @app.get("/states/", tags=["Utilities"])
-async def get_states():
+async def get_states(request: Request):
     """Get list of all available states"""
-    states = [
-        "MAHARASHTRA", "KARNATAKA", "TAMIL NADU", "PUNJAB", "HARYANA",
-        "UTTAR PRADESH", "MADHYA PRADESH", "RAJASTHAN", "WEST BENGAL",
-        "ANDHRA PRADESH", "TELANGANA", "BIHAR", "GUJRAT", "UTTARANCHAL",
-    ]
-    return {"states": states}
+    return cached_json_response(request, location_catalog.states())
 
 
 @app.get("/months/", tags=["Utilities"])
@@ -339,28 +791,17 @@ async def get_months():
 
 
 @app.get("/districts/{state}", tags=["Utilities"])
-async def get_districts(state: str):
+async def get_districts(state: str, request: Request):
     """Get districts for a given state"""
-    try:
-        import pandas as pd
-        df = pd.read_csv("data/district wise rainfall normal.csv")
-        districts = df[df['STATE_UT_NAME'] == state.upper()]['DISTRICT'].unique().tolist()
-        
-        if not districts:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"State '{state}' not found"
-            )
-        
-        return {"state": state.upper(), "districts": districts}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    cached = location_catalog.districts(state)
+    
+    if cached is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching districts: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"State '{state}' not found"
         )
+    
+    return cached_json_response(request, cached)
 
 
 # ============================================================================
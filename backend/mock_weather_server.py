@@ -0,0 +1,105 @@
+"""
+Mock OpenWeatherMap server for offline load tests
+
+Serves GET /data/2.5/weather with the same response shape as
+OpenWeatherMap. Readings are a deterministic function of the query, and
+latency and error injection are configurable.
+
+Run from project root:
+    python -m backend.mock_weather_server --port 8090 --latency-ms 80 --error-rate 0.01
+
+Then point the backend at it:
+    WEATHER_BACKEND=mock MOCK_WEATHER_URL=http://127.0.0.1:8090/data/2.5/weather
+"""
+
+import os
+import zlib
+import random
+import asyncio
+import argparse
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+KELVIN = 273.15
+
+
+def reading_for(query: str):
+    """Deterministic (temperature in Celsius, humidity in %) for a query string"""
+    seed = zlib.crc32(" ".join(query.split()).upper().encode("utf-8"))
+    temperature = 12.0 + (seed % 2600) / 100.0        # 12.00 .. 37.99 C
+    humidity = 25 + (seed // 2600) % 70               # 25 .. 94 %
+    return temperature, humidity
+
+
+def create_app(latency_ms: float = 0.0, jitter_ms: float = 0.0,
+               error_rate: float = 0.0, seed: Optional[int] = 0) -> FastAPI:
+    """
+    Build the mock weather app.
+
+    Args:
+        latency_ms: Base delay added to every response
+        jitter_ms: Uniform random extra delay in [0, jitter_ms]
+        error_rate: Fraction of requests answered with an injected error
+        seed: Seed for jitter and error injection (None = nondeterministic)
+    """
+    app = FastAPI(title="Mock OpenWeatherMap")
+    rng = random.Random(seed)
+    app.state.requests = 0
+    app.state.errors = 0
+
+    @app.get("/data/2.5/weather")
+    async def weather(q: str, appid: str = "", units: str = "standard"):
+        app.state.requests += 1
+
+        delay = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms > 0 else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+
+        if error_rate > 0 and rng.random() < error_rate:
+            app.state.errors += 1
+            status_code = rng.choice((429, 500, 503))
+            return JSONResponse(status_code=status_code, content={"cod": status_code, "message": "injected error"})
+
+        temperature, humidity = reading_for(q)
+        if units != "metric":
+            temperature += KELVIN
+
+        return {
+            "name": q.split(",")[0].strip().title(),
+            "main": {
+                "temp": round(temperature, 2),
+                "temp_min": round(temperature - 1.0, 2),
+                "temp_max": round(temperature + 1.0, 2),
+                "humidity": humidity,
+            },
+            "cod": 200,
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests, "errors": app.state.errors}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenWeatherMap server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_WEATHER_PORT", 8090)))
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("MOCK_WEATHER_LATENCY_MS", 0)))
+    parser.add_argument("--jitter-ms", type=float, default=float(os.getenv("MOCK_WEATHER_JITTER_MS", 0)))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("MOCK_WEATHER_ERROR_RATE", 0)))
+    parser.add_argument("--seed", type=int, default=int(os.getenv("MOCK_WEATHER_SEED", 0)))
+    args = parser.parse_args()
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
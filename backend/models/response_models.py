@@ -45,6 +45,32 @@ class PredictResponse(BaseModel):
     soil_values_used: dict  # Show which values were used
 
 
+class BatchPrediction(BaseModel):
+    """Top crops for one row of a batch request"""
+    top_predictions: List[CropPrediction]
+
+
+class BatchPredictResponse(BaseModel):
+    """Response model for batch crop predictions"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "count": 1,
+                "results": [
+                    {"top_predictions": [
+                        {"crop": "rice", "confidence": 87.1},
+                        {"crop": "jute", "confidence": 9.4},
+                        {"crop": "coconut", "confidence": 3.5}
+                    ]}
+                ]
+            }
+        }
+    )
+    
+    count: int
+    results: List[BatchPrediction]
+
+
 class ChatbotResponse(BaseModel):
     """Response model for chatbot"""
     model_config = ConfigDict(
@@ -0,0 +1,193 @@
+"""
+Batching Service - Dynamic micro-batching in front of the crop model
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+Prediction = List[Tuple[str, float]]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single predictions and runs them as one batch.
+
+    The first request that arrives opens a window of `max_wait_ms`; every
+    request queued before the window closes (or until `max_batch` items are
+    collected) is scored with one call to `predict_batch`, and each waiting
+    future receives its own row of the result.
+
+    With an `executor` the forward pass runs off the event loop; at most
+    `max_inflight` batches are scored at once and the next window only
+    opens when a slot is free.
+    """
+
+    def __init__(self,
+                 predict_batch: Callable[[np.ndarray, int], List[Prediction]],
+                 max_batch: int = 64,
+                 max_wait_ms: float = 2.0,
+                 executor: Optional[Executor] = None,
+                 max_inflight: int = 1):
+        """
+        Args:
+            predict_batch: Function scoring an (N, 7) matrix, e.g. CropService.predict_top_crops_batch
+            max_batch: Maximum number of items per forward pass
+            max_wait_ms: Maximum time the first item of a batch waits for company
+            executor: Executor running the forward pass; None runs it on the event loop
+            max_inflight: Maximum number of batches being scored at once
+        """
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.executor = executor
+        self.max_inflight = max(1, max_inflight)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: set = set()
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.last_batch_size = 0
+        self.max_queue_depth = 0
+
+    async def submit(self, features: Sequence[float], top_n: int = 3) -> Prediction:
+        """
+        Queue one feature vector and wait for its prediction.
+
+        Args:
+            features: The 7 model features in FEATURES order
+            top_n: Number of top predictions to return
+
+        Returns:
+            List of tuples (crop_name, confidence_percentage)
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((features, top_n, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_inflight)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background worker, failing anything still queued"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def _collect(self) -> list:
+        """Wait for the first item, then gather more until the batch is full or the window closes"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.get_running_loop().create_task(self._process(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, batch: list):
+        try:
+            await self._score(batch)
+        finally:
+            self._slots.release()
+
+    async def _score(self, batch: list):
+        # Drop requests whose callers went away while queued
+        batch = [item for item in batch if not item[2].done()]
+        if not batch:
+            return
+
+        matrix = np.array([item[0] for item in batch], dtype=np.float32)
+        top_n = max(item[1] for item in batch)
+
+        try:
+            if self.executor is None:
+                results = self.predict_batch(matrix, top_n)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.predict_batch, matrix, top_n
+                )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, item_top_n, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result[:item_top_n])
+
+        self.batches += 1
+        self.items += len(batch)
+        self.last_batch_size = len(batch)
+
+    def metrics(self) -> Dict[str, float]:
+        """Queue depth and batch size statistics"""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "last_batch_size": self.last_batch_size,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "inflight_batches": len(self._tasks),
+        }
+
+
+def get_micro_batcher(crop_service, executor: Optional[Executor] = None,
+                      max_inflight: int = 1) -> MicroBatcher:
+    """Factory function to create a MicroBatcher in front of a CropService"""
+    return MicroBatcher(
+        crop_service.predict_top_crops_batch,
+        max_batch=int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64")),
+        max_wait_ms=float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2")),
+        executor=executor,
+        max_inflight=max_inflight,
+    )
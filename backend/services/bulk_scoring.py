@@ -0,0 +1,520 @@
+"""
+Bulk Scoring - Score soil-test files offline, chunk by chunk
+
+Reads CSV (or Parquet, with pyarrow installed) in fixed-size chunks, joins
+the rainfall normals and weather by (state, district, month) with array
+lookups, scores every chunk in one forward pass and appends the top crops
+to the output file. Only a few chunks are held in memory at a time, so
+memory use does not grow with the file. With --workers the forward passes
+run in worker processes while this process reads and joins the next chunks.
+
+Run from project root:
+    python -m backend.services.bulk_scoring soil_tests.csv scores.csv
+    python -m backend.services.bulk_scoring soil_tests.parquet scores.parquet --workers 0 --top-k 5
+
+Input columns (case-insensitive): state, district, month and
+nitrogen/N, phosphorous/P, potassium/K, ph. Optional temperature and
+humidity columns take precedence over the weather normals (climatology
+file, else the latest weather snapshot).
+
+Every input column is copied to the output, followed by crop_1..k,
+confidence_1..k, rainfall_used, temperature_used, humidity_used,
+risk_level and status ("ok", or why the row was not scored).
+"""
+
+import os
+import csv
+import time
+import logging
+import argparse
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.crop_service import FEATURES
+from backend.services.location_index import LocationIndex
+from backend.services.recommendation_table import CLIMATOLOGY_FILE, MONTHS, load_weather_normals
+from backend.utils.helpers import RISK_LEVELS, SOIL_RANGES, calculate_risk_level_batch
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 50000
+
+# Canonical column -> accepted header names (lowercase)
+COLUMN_ALIASES = {
+    "state": ("state", "state_ut_name"),
+    "district": ("district",),
+    "month": ("month",),
+    "nitrogen": ("nitrogen", "n"),
+    "phosphorous": ("phosphorous", "phosphorus", "p"),
+    "potassium": ("potassium", "k"),
+    "ph": ("ph",),
+    "temperature": ("temperature",),
+    "humidity": ("humidity",),
+}
+REQUIRED_COLUMNS = ("state", "district", "month", "nitrogen", "phosphorous", "potassium", "ph")
+
+MONTH_IDS = {month: month_id for month_id, month in enumerate(MONTHS)}
+
+# Row statuses, in the order they are checked
+STATUS_OK = "ok"
+STATUS_INVALID_MONTH = "invalid_month"
+STATUS_UNKNOWN_LOCATION = "unknown_location"
+STATUS_INVALID_SOIL = "invalid_soil"
+STATUS_NO_WEATHER = "no_weather"
+
+Columns = Dict[str, list]
+
+
+class PreparedChunk(NamedTuple):
+    """A chunk joined with rainfall and weather, waiting for its forward pass"""
+    columns: Columns
+    status: np.ndarray
+    ok: np.ndarray
+    rainfall: np.ndarray
+    temperature: np.ndarray
+    humidity: np.ndarray
+    features: np.ndarray  # (ok rows, 7) in FEATURES order
+
+
+def resolve_columns(header: Sequence[str]) -> Dict[str, str]:
+    """
+    Map canonical column names to the file's own headers.
+
+    Raises:
+        ValueError: If a required column is missing
+    """
+    by_name = {name.strip().lower(): name for name in header}
+    names = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_name:
+                names[canonical] = by_name[alias]
+                break
+
+    missing = [name for name in REQUIRED_COLUMNS if name not in names]
+    if missing:
+        raise ValueError(f"Missing input columns: {', '.join(missing)}")
+    return names
+
+
+def _floats(values: list) -> np.ndarray:
+    """Column of numbers as float64; blanks and non-numeric values become NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    out = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            out[i] = np.nan
+    return out
+
+
+class BulkScorer:
+    """
+    Scores column chunks against one model, rainfall table and set of weather normals.
+
+    Locations are resolved once per distinct (state, district) spelling and
+    weather once per distinct district x month in a chunk; every per-row
+    join is then an array gather.
+    """
+
+    # Distinct raw location spellings remembered between chunks
+    MAX_CACHED_LOCATIONS = 100000
+
+    def __init__(self, crop_service, rainfall_table,
+                 weather: Optional[Dict[Tuple[str, str, str], Tuple[float, float]]], top_k: int = 3):
+        """
+        Args:
+            crop_service: CropService (or SharedModelPool) used for scoring
+            rainfall_table: RainfallTable with the monthly normals
+            weather: (state, district, month) -> (temperature, humidity) normals, or None
+            top_k: Number of crops per row
+        """
+        self.crop_service = crop_service
+        self.table = rainfall_table
+        self.weather = weather or {}
+        self.top_k = top_k
+        self.labels = np.asarray(crop_service.labels, dtype=object)
+
+        self.location_index = LocationIndex(list(rainfall_table.districts_by_state), rainfall_table.districts_by_state)
+        self.month_columns = np.array([rainfall_table.column_index[month] for month in MONTHS], dtype=np.int64)
+        self._locations: Dict[Tuple[str, str], int] = {}
+
+    def close(self):
+        """Stop the model's worker processes, if it runs in a SharedModelPool"""
+        close = getattr(self.crop_service, "close", None)
+        if close is not None:
+            close()
+
+    def output_columns(self) -> List[str]:
+        """Names of the columns appended to every chunk"""
+        return (
+            [f"crop_{rank}" for rank in range(1, self.top_k + 1)]
+            + [f"confidence_{rank}" for rank in range(1, self.top_k + 1)]
+            + ["rainfall_used", "temperature_used", "humidity_used", "risk_level", "status"]
+        )
+
+    def _location_row(self, state: str, district: str) -> int:
+        """Rainfall table row of a raw (state, district) spelling, or -1"""
+        key = (state, district)
+        row = self._locations.get(key)
+        if row is None:
+            row = self.table.index.get(key)
+            if row is None:
+                # Case and punctuation differences only; typos are reported, not guessed
+                canonical_state = self.location_index.resolve_state(state, fuzzy=False)
+                canonical_district = (
+                    self.location_index.resolve_district(district, canonical_state, fuzzy=False)
+                    if canonical_state is not None else None
+                )
+                row = self.table.index.get((canonical_state, canonical_district), -1)
+            if len(self._locations) >= self.MAX_CACHED_LOCATIONS:
+                self._locations.clear()
+            self._locations[key] = row
+        return row
+
+    def _weather(self, rows: np.ndarray, month_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Normal temperature and humidity per row, NaN where unknown"""
+        temperature = np.full(len(rows), np.nan)
+        humidity = np.full(len(rows), np.nan)
+        if not self.weather or not len(rows):
+            return temperature, humidity
+
+        keys, inverse = np.unique(rows * len(MONTHS) + month_ids, return_inverse=True)
+        normals = np.full((len(keys), 2), np.nan)
+        for i, key in enumerate(keys.tolist()):
+            state, district = self.table.keys[key // len(MONTHS)]
+            observation = self.weather.get((state, district, MONTHS[key % len(MONTHS)]))
+            if observation is not None:
+                normals[i] = observation
+        return normals[inverse, 0], normals[inverse, 1]
+
+    def score(self, columns: Columns, names: Dict[str, str]) -> Columns:
+        """
+        Score one chunk.
+
+        Args:
+            columns: Input column name -> values, all of the same length
+            names: Canonical -> input column name, from resolve_columns
+
+        Returns:
+            The input columns followed by the output_columns()
+        """
+        prepared = self.prepare(columns, names)
+        return self.finish(prepared, *self._top_crops(prepared.features))
+
+    def score_chunks(self, chunks: Iterable[Columns], names: Dict[str, str]) -> Iterator[Columns]:
+        """
+        Score chunks in order.
+
+        When the model runs in a SharedModelPool, reading and joining the
+        next chunks overlaps with the workers scoring the previous ones; the
+        pool's slot ring bounds how far ahead this process reads.
+
+        Yields:
+            Each chunk's input columns followed by the output_columns()
+        """
+        pool_map = getattr(self.crop_service, "map", None)
+        if pool_map is None:
+            for columns in chunks:
+                yield self.score(columns, names)
+            return
+
+        prepared: deque = deque()
+
+        def features() -> Iterator[np.ndarray]:
+            for columns in chunks:
+                chunk = self.prepare(columns, names)
+                prepared.append(chunk)
+                yield chunk.features
+
+        for indices, scores in pool_map(features()):
+            yield self.finish(prepared.popleft(), indices[:, :self.top_k], scores[:, :self.top_k])
+
+    def _top_crops(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not len(features):
+            return np.empty((0, self.top_k), dtype=np.int64), np.empty((0, self.top_k), dtype=np.float32)
+        return self.crop_service.top_crops_arrays(features, self.top_k)
+
+    def prepare(self, columns: Columns, names: Dict[str, str]) -> PreparedChunk:
+        """Resolve, join and validate one chunk; everything but the forward pass"""
+        size = len(columns[names["state"]])
+        status = np.full(size, STATUS_OK, dtype=object)
+
+        # Location and month -> rainfall table row and column
+        pairs = [
+            (str(state).strip().upper(), str(district).strip().upper())
+            for state, district in zip(columns[names["state"]], columns[names["district"]])
+        ]
+        unique_pairs = list(dict.fromkeys(pairs))
+        pair_rows = {pair: self._location_row(*pair) for pair in unique_pairs}
+        rows = np.fromiter((pair_rows[pair] for pair in pairs), dtype=np.int64, count=size)
+        month_ids = np.fromiter(
+            (MONTH_IDS.get(str(month).strip().upper()[:3], -1) for month in columns[names["month"]]),
+            dtype=np.int64, count=size
+        )
+
+        located = (rows >= 0) & (month_ids >= 0)
+        rainfall = np.full(size, np.nan)
+        rainfall[located] = self.table.values[rows[located], self.month_columns[month_ids[located]]]
+
+        # Soil values, range-checked like /predict/
+        soil = {name: _floats(columns[names[name]]) for name in SOIL_RANGES}
+        soil_valid = np.ones(size, dtype=bool)
+        for name, (low, high) in SOIL_RANGES.items():
+            soil_valid &= (soil[name] >= low) & (soil[name] <= high)
+
+        # Weather: the file's own columns first, normals for the rest
+        temperature, humidity = self._weather(np.where(located, rows, 0), np.where(located, month_ids, 0))
+        for name, values in (("temperature", temperature), ("humidity", humidity)):
+            if name in names:
+                given = _floats(columns[names[name]])
+                values[:] = np.where(np.isnan(given), values, given)
+        temperature[~located] = np.nan
+        humidity[~located] = np.nan
+
+        status[np.isnan(temperature) | np.isnan(humidity)] = STATUS_NO_WEATHER
+        status[~soil_valid] = STATUS_INVALID_SOIL
+        status[~located | np.isnan(rainfall)] = STATUS_UNKNOWN_LOCATION
+        status[month_ids < 0] = STATUS_INVALID_MONTH
+        ok = status == STATUS_OK
+
+        values = dict(soil, temperature=temperature, humidity=humidity, rainfall=rainfall)
+        features = np.stack([values[name][ok] for name in FEATURES], axis=1).astype(np.float32)
+        return PreparedChunk(columns, status, ok, rainfall, temperature, humidity, features)
+
+    def finish(self, prepared: PreparedChunk, indices: np.ndarray, scores: np.ndarray) -> Columns:
+        """
+        Output columns of a prepared chunk.
+
+        Args:
+            prepared: Result of prepare()
+            indices: (ok rows, top_k) label indices from the model
+            scores: (ok rows, top_k) confidence percentages
+
+        Returns:
+            The input columns followed by the output_columns()
+        """
+        columns, status, ok, rainfall, temperature, humidity, _ = prepared
+        size = len(status)
+        crops = np.full((size, self.top_k), None, dtype=object)
+        confidence = np.full((size, self.top_k), None, dtype=object)
+        risk = np.full(size, None, dtype=object)
+        if ok.any():
+            crops[ok] = self.labels[indices]
+            confidence[ok] = np.round(scores.astype(np.float64), 2)
+            levels = calculate_risk_level_batch(rainfall[ok], temperature[ok], humidity[ok]).levels
+            risk[ok] = np.asarray(RISK_LEVELS, dtype=object)[levels]
+
+        out = dict(columns)
+        for rank in range(self.top_k):
+            out[f"crop_{rank + 1}"] = crops[:, rank].tolist()
+        for rank in range(self.top_k):
+            out[f"confidence_{rank + 1}"] = confidence[:, rank].tolist()
+        for name, values in (("rainfall", rainfall), ("temperature", temperature), ("humidity", humidity)):
+            rounded = np.round(values, 4).astype(object)
+            rounded[np.isnan(values)] = None
+            out[f"{name}_used"] = rounded.tolist()
+        out["risk_level"] = risk.tolist()
+        out["status"] = status.tolist()
+        return out
+
+
+def build_scorer(top_k: int = 3, climatology: str = CLIMATOLOGY_FILE, snapshot: Optional[str] = None,
+                 workers: int = 1, chunk_size: int = CHUNK_SIZE) -> BulkScorer:
+    """
+    BulkScorer over the current model, the rainfall file and the weather normals.
+
+    Args:
+        workers: Processes running the model; above 1 a SharedModelPool
+            scores every chunk (close the scorer to stop it)
+        chunk_size: Rows per chunk, used to split chunks evenly over the workers
+
+    Raises:
+        FileNotFoundError: If the rainfall file is missing
+    """
+    from backend.services.crop_service import get_crop_service
+    from backend.services.rainfall_store import get_rainfall_store
+    from backend.services.shared_pool import get_shared_model_pool
+
+    store = get_rainfall_store()
+    if not store.available:
+        raise FileNotFoundError(f"Rainfall file not found at {store.path}")
+
+    weather, source = load_weather_normals(climatology, snapshot)
+    if weather is None:
+        logger.warning("No climatology file at %s and no weather snapshot; "
+                       "rows need temperature and humidity columns", climatology)
+    if workers > 1:
+        model = get_shared_model_pool(workers, top_k, chunk_rows=max(1024, -(-chunk_size // workers)))
+    else:
+        model = get_crop_service()
+    return BulkScorer(model, store.table, weather, top_k)
+
+
+# ============================================================================
+# FILE FORMATS
+# ============================================================================
+
+def _file_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files need pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def read_chunks(path: str, chunk_size: int = CHUNK_SIZE,
+                fmt: Optional[str] = None) -> Tuple[List[str], Iterator[Columns]]:
+    """
+    Open an input file for chunked reading.
+
+    Returns:
+        Tuple of (header, iterator of column chunks with at most chunk_size rows)
+    """
+    if _file_format(path, fmt) == "parquet":
+        pa = _require_pyarrow()
+        parquet = pa.parquet.ParquetFile(path)
+        batches = (batch.to_pydict() for batch in parquet.iter_batches(batch_size=chunk_size))
+        return list(parquet.schema_arrow.names), batches
+
+    f = open(path, newline="", encoding="utf-8")
+    reader = csv.reader(f)
+    header = [name.strip() for name in next(reader, [])]
+
+    def chunks():
+        with f:
+            rows = []
+            for record in reader:
+                if not record:
+                    continue
+                rows.append(record + [""] * (len(header) - len(record)))
+                if len(rows) == chunk_size:
+                    yield dict(zip(header, map(list, zip(*rows))))
+                    rows = []
+            if rows:
+                yield dict(zip(header, map(list, zip(*rows))))
+
+    return header, chunks()
+
+
+class ChunkWriter:
+    """Appends column chunks to a CSV or Parquet file"""
+
+    def __init__(self, path: str, header: List[str], fmt: Optional[str] = None):
+        self.path = path
+        self.header = header
+        self.format = _file_format(path, fmt)
+        self._parquet = None
+        self._file = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.format == "csv":
+            self._file = open(path, "w", newline="", encoding="utf-8")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(header)
+        else:
+            self._pa = _require_pyarrow()
+
+    def write(self, columns: Columns):
+        if self.format == "csv":
+            self._csv.writerows(zip(*(columns[name] for name in self.header)))
+            return
+
+        table = self._pa.table({name: columns[name] for name in self.header})
+        if self._parquet is None:
+            self._parquet = self._pa.parquet.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def score_file(input_path: str, output_path: str, top_k: int = 3, chunk_size: int = CHUNK_SIZE,
+               workers: int = 1, climatology: str = CLIMATOLOGY_FILE, snapshot: Optional[str] = None,
+               input_format: Optional[str] = None, output_format: Optional[str] = None) -> Counter:
+    """
+    Score every row of `input_path` into `output_path`, preserving row order.
+
+    With workers > 1 the model runs in a SharedModelPool: this process
+    reads, joins and writes while the workers, which share one copy of the
+    weights, score the chunks already joined.
+
+    Returns:
+        Counter of row statuses
+    """
+    header, chunks = read_chunks(input_path, chunk_size, input_format)
+    names = resolve_columns(header)
+    statuses = Counter()
+
+    scorer = build_scorer(top_k, climatology, snapshot, workers, chunk_size)
+    try:
+        writer = ChunkWriter(output_path, header + scorer.output_columns(), output_format)
+        try:
+            for scored in scorer.score_chunks(chunks, names):
+                statuses.update(scored["status"])
+                writer.write(scored)
+        finally:
+            writer.close()
+    finally:
+        scorer.close()
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of soil tests offline")
+    parser.add_argument("input", help="soil tests (.csv, or .parquet with pyarrow)")
+    parser.add_argument("output", help="scored rows (.csv or .parquet)")
+    parser.add_argument("--top-k", type=int, default=3, help="crops per row")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    parser.add_argument("--climatology", default=CLIMATOLOGY_FILE, help="monthly temperature/humidity normals CSV")
+    parser.add_argument("--snapshot", default=None, help="weather snapshot to use if there is no climatology file")
+    parser.add_argument("--input-format", choices=("csv", "parquet"), default=None)
+    parser.add_argument("--output-format", choices=("csv", "parquet"), default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    workers = args.workers or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    try:
+        statuses = score_file(
+            args.input, args.output, top_k=args.top_k, chunk_size=max(1, args.chunk_size), workers=workers,
+            climatology=args.climatology, snapshot=args.snapshot,
+            input_format=args.input_format, output_format=args.output_format,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        raise SystemExit(str(e))
+    elapsed = time.perf_counter() - started
+
+    total = sum(statuses.values())
+    print(f"✓ {statuses[STATUS_OK]}/{total} rows scored in {elapsed:.2f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} rows/s, {workers} worker(s)) -> {args.output}")
+    for status, count in sorted(statuses.items()):
+        if status != STATUS_OK:
+            print(f"  {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,145 @@
 Chatbot Service - Conversational interface for crop advisory
 """
 
-from typing import Optional, Dict, List
 import json
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from backend.services.location_catalog import LocationCatalog, get_location_catalog
+from backend.services.session_store import get_session_store
+
+
+class Step(IntEnum):
+    """Conversation steps; each has exactly one code"""
+    START = 0
+    ASK_STATE = 1
+    ASK_DISTRICT = 2
+    ASK_MONTH = 3
+    ASK_USE_SOIL = 4
+    ASK_NITROGEN = 5
+    ASK_PHOSPHOROUS = 6
+    ASK_POTASSIUM = 7
+    ASK_PH = 8
+    PROVIDING_RECOMMENDATION = 9
+
+
+class Session:
+    """Compact per-session record: the current step and the answers collected so far"""
+
+    __slots__ = ("step", "language", "state", "district", "month",
+                 "nitrogen", "phosphorous", "potassium", "ph", "use_auto_values")
+
+    FIELDS = __slots__[2:]
+
+    def __init__(self, language: str = "en", step: int = Step.START):
+        self.step = step
+        self.language = language
+        self.state = self.district = self.month = None
+        self.nitrogen = self.phosphorous = self.potassium = self.ph = None
+        self.use_auto_values = True
+
+    def user_data(self) -> Dict[str, Any]:
+        """Collected answers in the shape of a PredictRequest"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def dumps(self) -> str:
+        """Serialize as a compact JSON array (slot order) for shared session stores"""
+        return json.dumps([getattr(self, name) for name in self.__slots__], separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, text: str) -> "Session":
+        session = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, json.loads(text)):
+            setattr(session, name, value)
+        return session
+
+
+class Reply:
+    """
+    One chatbot response, compiled once per language.
+
+    Replies without placeholders are rendered to their response dict up
+    front and shared by every turn; only templated ones ({state}) and
+    replies carrying the session's answers are built per turn.
+    """
+
+    __slots__ = ("message", "fields", "templated", "ready", "payload")
+
+    def __init__(self, message: str, input_type: Optional[str] = "text",
+                 options: Optional[List[str]] = None, ready: bool = False):
+        self.message = message
+        self.templated = "{" in message
+        self.ready = ready
+        if ready:
+            self.fields = {"requires_input": False, "ready_for_prediction": True}
+        else:
+            self.fields = {"requires_input": True, "input_type": input_type}
+            if options is not None:
+                self.fields["options"] = options
+        self.payload = {"message": message, **self.fields}
+
+    def render(self, session: Session) -> Dict[str, Any]:
+        if self.ready:
+            return {**self.payload, "user_data": session.user_data()}
+        if self.templated:
+            return {**self.payload, "message": self.message.format(state=session.state)}
+        return self.payload
+
+
+class Transition:
+    """
+    How one step handles a message.
+
+    `parse(message, session)` turns the message into a value (raising
+    ValueError if it is invalid) which is stored in the session attribute
+    `field`; `next_step` is a Step or a function of the value. The reply is
+    the prompt of the next step unless `reply` overrides it; `invalid` is
+    sent on ValueError.
+    """
+
+    __slots__ = ("parse", "field", "next_step", "reply", "invalid")
+
+    def __init__(self, parse: Callable[[str, Session], Any], field: Optional[str],
+                 next_step: Union[Step, Callable[[Any], Step]],
+                 reply: Optional[str] = None, invalid: Optional[str] = None):
+        self.parse = parse
+        self.field = field
+        self.next_step = next_step if callable(next_step) else (lambda _value, step=next_step: step)
+        self.reply = reply
+        self.invalid = invalid
+
+
+class InvalidAnswer(ValueError):
+    """A rejected answer, with close matches to offer instead"""
+
+    def __init__(self, suggestions: Optional[List[str]] = None):
+        super().__init__(suggestions)
+        self.suggestions = suggestions or []
+
+
+def _any(message: str, session: Session) -> str:
+    return message
+
+
+def _upper(message: str, session: Optional[Session] = None) -> str:
+    return message.upper().strip()
+
+
+def _number(message: str, session: Session) -> float:
+    return float(message)
+
+
+def _uses_defaults(message: str, session: Session) -> bool:
+    message = message.lower()
+    return "no" in message or "default" in message
+
 
 
 class ChatbotService:
     """Service to handle chatbot conversations"""
     
-    # Define conversation states
-    STATES = {
-        "START": 0,
-        "ASK_STATE": 1,
-        "ASK_DISTRICT": 2,
-        "ASK_MONTH": 3,
-        # kept legacy name and alias to avoid KeyError
-        "ASK_SOIL_VALUES": 4,
-        "ASK_USE_SOIL": 4,
-        "ASK_NITROGEN": 5,
-        "ASK_PHOSPHOROUS": 6,
-        "ASK_POTASSIUM": 7,
-        "ASK_PH": 8,
-        "PROVIDING_RECOMMENDATION": 9,
-    }
+    # Conversation step codes by name
+    STATES = {step.name: int(step) for step in Step}
     
     # All Indian states (sample)
     STATES_LIST = [
@@ -57,6 +174,10 @@ class ChatbotService:
             "medium_risk": "The risk level is moderate - you'll need to monitor conditions.",
             "high_risk": "The risk level is high - careful management will be needed.",
             "follow_up": "Would you like to know about fertilizer requirements or irrigation tips?",
+            "invalid_month": "Please choose a valid month (JAN, FEB, etc)",
+            "invalid_number": "Please enter a valid number",
+            "invalid_ph": "Please enter a valid pH value",
+            "help": "How can I help you further?",
         },
         "hi": {
             "welcome": "नमस्ते! 👋 मैं आपका फसल सलाहकार हूँ। मैं आपको सही फसल उगाने में मदद करूँगा। चलिए शुरू करते हैं! आप किस राज्य में हैं?",
@@ -75,19 +196,105 @@ class ChatbotService:
         }
     }
     
-    def __init__(self):
-        """Initialize chatbot service"""
-        self.sessions: Dict[str, Dict] = {}
     
-    def create_session(self, session_id: str, language: str = "en") -> Dict:
-        """Create a new chat session"""
-        self.sessions[session_id] = {
-            "state": self.STATES["START"],
-            "language": language,
-            "data": {},
-            "step": 0
+    SOIL_OPTIONS = ["Yes, I have values", "No, use defaults"]
+    
+    # Prompt sent on entering each step
+    PROMPTS = {
+        Step.ASK_STATE: "ask_state",
+        Step.ASK_DISTRICT: "ask_district",
+        Step.ASK_MONTH: "ask_month",
+        Step.ASK_USE_SOIL: "ask_use_soil",
+        Step.ASK_NITROGEN: "ask_nitrogen",
+        Step.ASK_PHOSPHOROUS: "ask_phosphorous",
+        Step.ASK_POTASSIUM: "ask_potassium",
+        Step.ASK_PH: "ask_ph",
+        Step.PROVIDING_RECOMMENDATION: "processing",
+    }
+    
+    def __init__(self, store=None, catalog: Optional[LocationCatalog] = None):
+        """
+        Initialize chatbot service
+        
+        Args:
+            store: Session store (defaults to the one selected by CHATBOT_SESSION_BACKEND)
+            catalog: Location catalog whose index validates states and districts
+        """
+        self.sessions = store if store is not None else get_session_store(
+            encode=Session.dumps, decode=Session.loads
+        )
+        self.catalog = catalog or get_location_catalog(fallback_states=self.STATES_LIST)
+        self.transitions = self._build_transitions()
+        self.replies = {language: self._compile_replies(language) for language in self.RESPONSES}
+    
+    def _build_transitions(self) -> Dict[int, Transition]:
+        """The conversation as a table: step -> how to parse the answer and where to go next"""
+        months = frozenset(self.MONTHS_LIST)
+        
+        def parse_state(message: str, session: Session) -> str:
+            index = self.catalog.index()
+            state = index.resolve_state(message)
+            if state is None:
+                raise InvalidAnswer([match.name for match in index.suggest_states(message, k=3)])
+            return state
+        
+        def parse_district(message: str, session: Session) -> str:
+            index = self.catalog.index()
+            if not index.has_districts(session.state):
+                # No rainfall data to check against; take the answer as typed
+                return _upper(message)
+            district = index.resolve_district(message, session.state)
+            if district is None:
+                raise InvalidAnswer([match.name for match in index.suggest_districts(message, session.state, k=3)])
+            return district
+        
+        def parse_month(message: str, session: Session) -> str:
+            value = _upper(message)
+            if value not in months:
+                raise InvalidAnswer()
+            return value
+        
+        return {
+            Step.START: Transition(_any, None, Step.ASK_STATE, reply="welcome"),
+            Step.ASK_STATE: Transition(parse_state, "state", Step.ASK_DISTRICT, invalid="invalid_state"),
+            Step.ASK_DISTRICT: Transition(parse_district, "district", Step.ASK_MONTH, invalid="invalid_district"),
+            Step.ASK_MONTH: Transition(parse_month, "month", Step.ASK_USE_SOIL, invalid="invalid_month"),
+            Step.ASK_USE_SOIL: Transition(
+                _uses_defaults, "use_auto_values",
+                lambda defaults: Step.PROVIDING_RECOMMENDATION if defaults else Step.ASK_NITROGEN
+            ),
+            Step.ASK_NITROGEN: Transition(_number, "nitrogen", Step.ASK_PHOSPHOROUS, invalid="invalid_number"),
+            Step.ASK_PHOSPHOROUS: Transition(_number, "phosphorous", Step.ASK_POTASSIUM, invalid="invalid_number"),
+            Step.ASK_POTASSIUM: Transition(_number, "potassium", Step.ASK_PH, invalid="invalid_number"),
+            Step.ASK_PH: Transition(_number, "ph", Step.PROVIDING_RECOMMENDATION, invalid="invalid_ph"),
+        }
+    
+    def _compile_replies(self, language: str) -> Dict[str, Reply]:
+        """Reply objects for one language, falling back to English for missing texts"""
+        texts = {**self.RESPONSES["en"], **self.RESPONSES[language]}
+        number = ("number", None)
+        specs = {
+            "ask_month": ("select", self.MONTHS_LIST),
+            "invalid_month": ("select", self.MONTHS_LIST),
+            "ask_use_soil": ("select", self.SOIL_OPTIONS),
+            "ask_nitrogen": number,
+            "ask_phosphorous": number,
+            "ask_potassium": number,
+            "ask_ph": number,
+            "invalid_number": number,
+            "invalid_ph": number,
         }
-        return self.sessions[session_id]
+        replies = {}
+        for key, text in texts.items():
+            input_type, options = specs.get(key, ("text", None))
+            replies[key] = Reply(text, input_type, options, ready=(key == "processing"))
+        return replies
+    
+    def create_session(self, session_id: str, language: str = "en") -> Session:
+        """Create a new chat session"""
+        session = Session(language)
+        self.sessions.put(session_id, session)
+        return session
     
     def get_response(self, user_message: str, session_id: str, language: str = "en") -> Dict:
         """
@@ -101,157 +308,32 @@ class ChatbotService:
         Returns:
             Dictionary with response and next steps
         """
-        if session_id not in self.sessions:
-            self.create_session(session_id, language)
-        
-        session = self.sessions[session_id]
-        messages = self.RESPONSES.get(language, self.RESPONSES["en"])
-        
-        # State machine logic
-        state = session["state"]
-        
-        if state == self.STATES["START"]:
-            session["state"] = self.STATES["ASK_STATE"]
-            return {
-                "message": messages["welcome"],
-                "requires_input": True,
-                "input_type": "text"
-            }
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.create_session(session_id, language)
         
-        elif state == self.STATES["ASK_STATE"]:
-            state_input = user_message.upper().strip()
-            if any(s.startswith(state_input) for s in self.STATES_LIST):
-                session["data"]["state"] = state_input
-                session["state"] = self.STATES["ASK_DISTRICT"]
-                return {
-                    "message": messages["ask_district"].format(state=state_input),
-                    "requires_input": True,
-                    "input_type": "text"
-                }
-            else:
-                return {
-                    "message": messages["invalid_state"],
-                    "requires_input": True,
-                    "input_type": "text"
-                }
+        replies = self.replies.get(language, self.replies["en"])
+        transition = self.transitions.get(session.step)
+        if transition is None:
+            return replies["help"].render(session)
         
-        elif state == self.STATES["ASK_DISTRICT"]:
-            district_input = user_message.upper().strip()
-            session["data"]["district"] = district_input
-            session["state"] = self.STATES["ASK_MONTH"]
-            return {
-                "message": messages["ask_month"],
-                "requires_input": True,
-                "input_type": "select",
-                "options": self.MONTHS_LIST
-            }
+        try:
+            value = transition.parse(user_message, session)
+        except InvalidAnswer as e:
+            reply = replies[transition.invalid].render(session)
+            if e.suggestions:
+                reply = {**reply, "input_type": "select", "options": e.suggestions}
+            return reply
+        except ValueError:
+            return replies[transition.invalid].render(session)
         
-        elif state == self.STATES["ASK_MONTH"]:
-            month_input = user_message.upper().strip()
-            if any(m == month_input for m in self.MONTHS_LIST):
-                session["data"]["month"] = month_input
-                session["state"] = self.STATES["ASK_USE_SOIL"]
-                return {
-                    "message": messages["ask_use_soil"],
-                    "requires_input": True,
-                    "input_type": "select",
-                    "options": ["Yes, I have values", "No, use defaults"]
-                }
-            else:
-                return {
-                    "message": "Please choose a valid month (JAN, FEB, etc)",
-                    "requires_input": True,
-                    "input_type": "select",
-                    "options": self.MONTHS_LIST
-                }
+        if transition.field is not None:
+            setattr(session, transition.field, value)
+        session.step = transition.next_step(value)
         
-        elif state == self.STATES["ASK_USE_SOIL"]:
-            if "no" in user_message.lower() or "default" in user_message.lower():
-                session["data"]["use_auto_values"] = True
-                session["state"] = self.STATES["PROVIDING_RECOMMENDATION"]
-                return {
-                    "message": messages["processing"],
-                    "requires_input": False,
-                    "ready_for_prediction": True
-                }
-            else:
-                session["state"] = self.STATES["ASK_NITROGEN"]
-                return {
-                    "message": messages["ask_nitrogen"],
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-        
-        elif state == self.STATES["ASK_NITROGEN"]:
-            try:
-                session["data"]["nitrogen"] = float(user_message)
-                session["state"] = self.STATES["ASK_PHOSPHOROUS"]
-                return {
-                    "message": messages["ask_phosphorous"],
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-            except ValueError:
-                return {
-                    "message": "Please enter a valid number",
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-        
-        elif state == self.STATES["ASK_PHOSPHOROUS"]:
-            try:
-                session["data"]["phosphorous"] = float(user_message)
-                session["state"] = self.STATES["ASK_POTASSIUM"]
-                return {
-                    "message": messages["ask_potassium"],
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-            except ValueError:
-                return {
-                    "message": "Please enter a valid number",
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-        
-        elif state == self.STATES["ASK_POTASSIUM"]:
-            try:
-                session["data"]["potassium"] = float(user_message)
-                session["state"] = self.STATES["ASK_PH"]
-                return {
-                    "message": messages["ask_ph"],
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-            except ValueError:
-                return {
-                    "message": "Please enter a valid number",
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-        
-        elif state == self.STATES["ASK_PH"]:
-            try:
-                session["data"]["ph"] = float(user_message)
-                session["state"] = self.STATES["PROVIDING_RECOMMENDATION"]
-                return {
-                    "message": messages["processing"],
-                    "requires_input": False,
-                    "ready_for_prediction": True,
-                    "user_data": session["data"]
-                }
-            except ValueError:
-                return {
-                    "message": "Please enter a valid pH value",
-                    "requires_input": True,
-                    "input_type": "number"
-                }
-        
-        return {
-            "message": "How can I help you further?",
-            "requires_input": True,
-            "input_type": "text"
-        }
+        # Write back so shared stores see the new step
+        self.sessions.put(session_id, session)
+        return replies[transition.reply or self.PROMPTS[session.step]].render(session)
 
 
 def get_chatbot_service() -> ChatbotService:
@@ -2,11 +2,39 @@
 Crop Service - Handles crop predictions with top 3 recommendations
 """
 
-import torch
+import logging
 import numpy as np
-import pickle
 from typing import List, Tuple, Dict
-import os
+
+from backend.services.inference_engine import softmax
+from backend.services.model_registry import get_model_registry
+
+
+logger = logging.getLogger(__name__)
+
+# Column order of the model input vector
+FEATURES = ("nitrogen", "phosphorous", "potassium", "temperature", "humidity", "ph", "rainfall")
+
+
+def top_k(probabilities: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the top N classes of every row without sorting the whole row.
+    
+    Args:
+        probabilities: (N, num_classes) array of scores
+        top_n: Number of classes to keep per row
+        
+    Returns:
+        Tuple of (indices, scores), both (N, top_n) and ordered best first
+    """
+    top_n = max(1, min(top_n, probabilities.shape[1]))
+    if top_n < probabilities.shape[1]:
+        indices = np.argpartition(-probabilities, top_n - 1, axis=1)[:, :top_n]
+    else:
+        indices = np.broadcast_to(np.arange(top_n), probabilities.shape).copy()
+    scores = np.take_along_axis(probabilities, indices, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(indices, order, axis=1), np.take_along_axis(scores, order, axis=1)
 
 
 class CropService:
@@ -14,45 +42,27 @@ class CropService:
     
     def __init__(self):
         """Initialize the crop prediction model"""
-        self.model = None
-        self.encoder = None
-        self.normalization = None
+        self.registry = get_model_registry()
         self._load_model()
     
     def _load_model(self):
-        """Load the trained PyTorch model and encoder"""
-        try:
-            # Import the model architecture (model/ is at project root)
-            from model.net import Net_64_128_64
-            
-            # Get the project root directory
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            
-            # Load model
-            self.model = Net_64_128_64(7, 22)
-            model_path = os.path.join(project_root, "model/baseline/baseline.hdf5")
-            
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(f"Model not found at {model_path}")
-            
-            self.model.load_state_dict(torch.load(model_path))
-            self.model.eval()  # Set to evaluation mode
-            
-            # Load normalization parameters
-            norm_path = os.path.join(project_root, "model/normalization/normalization.npz")
-            if os.path.exists(norm_path):
-                self.normalization = np.load(norm_path)
-            
-            # Load label encoder
-            encoder_path = os.path.join(project_root, "model/pkl_files/encoder.pkl")
-            if os.path.exists(encoder_path):
-                with open(encoder_path, "rb") as f:
-                    self.encoder = pickle.load(f)
-            
-            print("✓ ML Model loaded successfully")
-            
-        except Exception as e:
-            raise Exception(f"Failed to load model: {str(e)}")
+        """Warm the shared model registry (weights, normalization and encoder)"""
+        self.registry.get()
+    
+    @property
+    def model(self):
+        """Currently loaded model (torch module or NumPy engine)"""
+        return self.registry.get().model
+    
+    @property
+    def encoder(self):
+        """Currently loaded label encoder"""
+        return self.registry.get().encoder
+    
+    @property
+    def normalization(self):
+        """Currently loaded normalization parameters (mean, std)"""
+        return self.registry.get().normalization
     
     def predict_top_crops(self, 
                          nitrogen: float,
@@ -80,47 +90,105 @@ class CropService:
             List of tuples (crop_name, confidence_percentage)
         """
         try:
+            artifacts = self.registry.get()
+            
             # Prepare input vector
-            input_vector = np.array([
+            input_vector = np.array([[
                 nitrogen, phosphorous, potassium, 
                 temperature, humidity, ph, rainfall
-            ], dtype=np.float32)
-            
-            # Normalize input
-            if self.normalization is not None:
-                mean = self.normalization["mean"]
-                std = self.normalization["std"]
-                input_vector = (input_vector - mean) / std
+            ]], dtype=np.float32)
             
-            # Convert to tensor
-            input_tensor = torch.tensor(input_vector, dtype=torch.float32)
-            
-            # Get predictions
-            with torch.no_grad():
-                output = self.model(input_tensor)
-                # Apply softmax to get probabilities
-                probabilities = torch.softmax(output, dim=0)
-                probabilities = probabilities.numpy()
+            # Normalize input (unless folded into the model), get predictions
+            # and apply softmax to get probabilities
+            probabilities = softmax(artifacts.forward(input_vector), axis=1)
             
             # Get top N predictions
-            top_indices = np.argsort(probabilities)[-top_n:][::-1]
+            top_indices, top_scores = top_k(probabilities, top_n)
             
             # Decode crop names and get confidence scores
-            predictions = []
-            for idx in top_indices:
-                if self.encoder is not None:
-                    crop_name = self.encoder.inverse_transform(np.array([idx]))[0]
-                else:
-                    crop_name = f"Crop_{idx}"
-                
-                confidence = float(probabilities[idx] * 100)
-                predictions.append((crop_name, confidence))
+            predictions = [
+                (str(artifacts.labels[idx]), float(score * 100))
+                for idx, score in zip(top_indices[0], top_scores[0])
+            ]
             
-            print(f"✓ Predictions generated: {[p[0] for p in predictions]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Predictions generated: %s", [p[0] for p in predictions])
             return predictions
             
         except Exception as e:
             raise Exception(f"Prediction error: {str(e)}")
+    
+    def rank_crops_batch(self, matrix, top_n: int = 3) -> List[List[str]]:
+        """
+        Rank the top N crops for many feature vectors, without confidences.
+        
+        Skips every softmax, so it is the cheapest way to get the best crops.
+        
+        Args:
+            matrix: (N, 7) array-like of feature rows in FEATURES order
+            top_n: Number of crops to return per row
+            
+        Returns:
+            One list of crop names per input row, best first
+        """
+        artifacts = self.registry.get()
+        scores = artifacts.forward(np.asarray(matrix, dtype=np.float32).reshape(-1, len(FEATURES)),
+                                   probabilities=False)
+        indices, _ = top_k(scores, top_n)
+        return artifacts.labels[indices].tolist()
+    
+    def top_crops_arrays(self, matrix, top_n: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top N label indices and confidences for many feature vectors, as arrays.
+        
+        Args:
+            matrix: (N, 7) array-like of feature rows in FEATURES order
+            top_n: Number of top predictions per row
+            
+        Returns:
+            Tuple of (N, top_n) label indices into `labels` and (N, top_n)
+            confidence percentages, best first
+        """
+        artifacts = self.registry.get()
+        
+        inputs = np.asarray(matrix, dtype=np.float32)
+        if inputs.ndim != 2 or inputs.shape[1] != len(FEATURES):
+            raise ValueError(f"Expected an (N, {len(FEATURES)}) matrix, got shape {inputs.shape}")
+        
+        # Normalize all rows at once (unless folded into the model)
+        probabilities = softmax(artifacts.forward(inputs), axis=1)
+        
+        indices, scores = top_k(probabilities, top_n)
+        return indices, scores * 100
+    
+    @property
+    def labels(self) -> np.ndarray:
+        """Crop name of every label index"""
+        return self.registry.get().labels
+    
+    def predict_top_crops_batch(self, matrix, top_n: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        Predict top N crops for many feature vectors with one forward pass.
+        
+        Args:
+            matrix: (N, 7) array-like of feature rows in FEATURES order
+            top_n: Number of top predictions to return per row
+            
+        Returns:
+            One list of (crop_name, confidence_percentage) tuples per input row
+        """
+        try:
+            if len(matrix) == 0:
+                return []
+            
+            indices, confidences = self.top_crops_arrays(matrix, top_n)
+            names = self.labels[indices].tolist()
+            confidences = confidences.tolist()
+            
+            return [list(zip(row_names, row_conf)) for row_names, row_conf in zip(names, confidences)]
+            
+        except Exception as e:
+            raise Exception(f"Batch prediction error: {str(e)}")
 
 
 def get_crop_service() -> CropService:
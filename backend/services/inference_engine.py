@@ -0,0 +1,349 @@
+"""
+Inference Engines - Torch and pure-NumPy forward passes for Net_64_128_64
+"""
+
+import os
+import hashlib
+import argparse
+from typing import Dict, Optional
+
+import numpy as np
+
+
+# torch.nn.functional.selu constants
+SELU_ALPHA = 1.6732632423543772848170429916717
+SELU_SCALE = 1.0507009873554804934193349852946
+
+LAYERS = ("fc1", "fc2", "fc3", "fc4")
+
+
+def selu(x: np.ndarray) -> np.ndarray:
+    """SELU activation with the same constants as torch"""
+    return SELU_SCALE * np.where(x > 0, x, SELU_ALPHA * np.expm1(np.minimum(x, 0)))
+
+
+def softmax(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    """Numerically stable softmax"""
+    shifted = np.exp(x - x.max(axis=axis, keepdims=True))
+    return shifted / shifted.sum(axis=axis, keepdims=True)
+
+
+def fold_normalization(weight: np.ndarray, bias: np.ndarray,
+                       mean: np.ndarray, std: np.ndarray):
+    """
+    Bake input standardization into a Linear layer.
+
+    W @ ((x - mean) / std) + b == (W / std) @ x + (b - (W / std) @ mean)
+
+    Args:
+        weight: (out, in) layer weight
+        bias: (out,) layer bias
+        mean: (in,) feature means
+        std: (in,) feature standard deviations
+
+    Returns:
+        Tuple of (folded weight, folded bias) in float32
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    folded_weight = weight / np.asarray(std, dtype=np.float64)[None, :]
+    folded_bias = np.asarray(bias, dtype=np.float64) - folded_weight @ mean
+    return folded_weight.astype(np.float32), folded_bias.astype(np.float32)
+
+
+class TorchEngine:
+    """Runs the PyTorch Net_64_128_64 on NumPy input"""
+
+    name = "torch"
+
+    def __init__(self, module):
+        self.module = module
+
+    @classmethod
+    def from_checkpoint(cls, model_path: str, input_size: int, num_classes: int) -> "TorchEngine":
+        """Build the network and load a saved state_dict"""
+        import torch
+        from model.net import Net_64_128_64
+
+        module = Net_64_128_64(input_size, num_classes)
+        module.load_state_dict(torch.load(model_path, map_location="cpu"))
+        module.eval()  # Set to evaluation mode
+        return cls(module)
+
+    def __call__(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Forward pass.
+
+        Args:
+            inputs: (N, input_size) float32 array of normalized features
+
+        Returns:
+            (N, num_classes) model output
+        """
+        import torch
+
+        with torch.no_grad():
+            return self.module(torch.from_numpy(np.ascontiguousarray(inputs, dtype=np.float32))).numpy()
+
+    def logits(self, inputs: np.ndarray) -> np.ndarray:
+        """Forward pass without the final softmax (same ranking, less work)"""
+        import torch
+        import torch.nn.functional as F
+
+        m = self.module
+        with torch.no_grad():
+            x = torch.from_numpy(np.ascontiguousarray(inputs, dtype=np.float32))
+            x = F.selu(m.fc1(x))
+            x = F.selu(m.fc2(x))
+            x = F.selu(m.fc3(x))
+            return m.fc4(x).numpy()
+
+    def fold_normalization(self, mean: np.ndarray, std: np.ndarray) -> "TorchEngine":
+        """Return a copy whose fc1 expects raw, un-normalized features"""
+        import copy
+        import torch
+
+        module = copy.deepcopy(self.module)
+        weight, bias = fold_normalization(
+            module.fc1.weight.detach().numpy(), module.fc1.bias.detach().numpy(), mean, std
+        )
+        with torch.no_grad():
+            module.fc1.weight.copy_(torch.from_numpy(weight))
+            module.fc1.bias.copy_(torch.from_numpy(bias))
+        return TorchEngine(module)
+
+
+class NumpyEngine:
+    """
+    Pure-NumPy Net_64_128_64: four Linear layers with SELU in between.
+
+    Mirrors Net_64_128_64.forward, including the softmax it applies to the
+    last layer, so outputs match the torch engine.
+    """
+
+    name = "numpy"
+    module = None
+
+    def __init__(self, weights: Dict[str, np.ndarray]):
+        # Pre-transpose once so the forward pass is x @ W + b
+        self.layers = [
+            (np.ascontiguousarray(weights[f"{layer}.weight"].T, dtype=np.float32),
+             np.ascontiguousarray(weights[f"{layer}.bias"], dtype=np.float32))
+            for layer in LAYERS
+        ]
+
+    @classmethod
+    def from_npz(cls, weights_path: str) -> "NumpyEngine":
+        """Load weights exported by export_weights"""
+        with np.load(weights_path) as weights:
+            return cls({key: weights[key] for key in weights.files})
+
+    @classmethod
+    def from_layers(cls, layers) -> "NumpyEngine":
+        """Wrap already transposed (weight, bias) pairs as-is, e.g. views of shared memory"""
+        engine = cls.__new__(cls)
+        engine.layers = list(layers)
+        return engine
+
+    @classmethod
+    def from_engine(cls, engine) -> "NumpyEngine":
+        """NumPy copy of a torch or NumPy engine (including any folded normalization)"""
+        if isinstance(engine, NumpyEngine):
+            return engine
+        return cls({
+            key: value.detach().cpu().numpy()
+            for key, value in engine.module.state_dict().items()
+        })
+
+    def __call__(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Forward pass.
+
+        Args:
+            inputs: (N, input_size) float32 array of normalized features
+
+        Returns:
+            (N, num_classes) model output
+        """
+        return softmax(self.logits(inputs), axis=-1)
+
+    def logits(self, inputs: np.ndarray) -> np.ndarray:
+        """Forward pass without the final softmax (same ranking, less work)"""
+        x = np.asarray(inputs, dtype=np.float32)
+        for weight, bias in self.layers[:-1]:
+            x = selu(x @ weight + bias)
+        weight, bias = self.layers[-1]
+        return x @ weight + bias
+
+    def fold_normalization(self, mean: np.ndarray, std: np.ndarray) -> "NumpyEngine":
+        """Return a copy whose fc1 expects raw, un-normalized features"""
+        weights = {}
+        for layer, (weight, bias) in zip(LAYERS, self.layers):
+            weights[f"{layer}.weight"] = weight.T
+            weights[f"{layer}.bias"] = bias
+        weights["fc1.weight"], weights["fc1.bias"] = fold_normalization(
+            weights["fc1.weight"], weights["fc1.bias"], mean, std
+        )
+        return NumpyEngine(weights)
+
+
+SOURCE_HASH_KEY = "source_sha256"
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_weights(state_dict, weights_path: str, source_sha256: Optional[str] = None) -> str:
+    """
+    Write a torch state_dict to a compact float32 .npz file.
+
+    The file is written to a temporary name first and renamed into place,
+    so readers never see a half-written file.
+
+    Args:
+        state_dict: Net_64_128_64 state_dict (tensors or arrays)
+        weights_path: Destination .npz path
+        source_sha256: Hash of the checkpoint the weights come from, stored
+            in the file so a stale export can be detected
+
+    Returns:
+        The destination path
+    """
+    arrays = {}
+    if source_sha256 is not None:
+        arrays[SOURCE_HASH_KEY] = np.array(source_sha256)
+    for layer in LAYERS:
+        for param in ("weight", "bias"):
+            value = state_dict[f"{layer}.{param}"]
+            if hasattr(value, "detach"):
+                value = value.detach().cpu().numpy()
+            arrays[f"{layer}.{param}"] = np.asarray(value, dtype=np.float32)
+
+    os.makedirs(os.path.dirname(os.path.abspath(weights_path)), exist_ok=True)
+    tmp_path = f"{weights_path}.tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, weights_path)
+    return weights_path
+
+
+def export_checkpoint(model_path: str, weights_path: str) -> str:
+    """Export a saved torch checkpoint (baseline.hdf5) to .npz weights"""
+    import torch
+
+    return export_weights(torch.load(model_path, map_location="cpu"), weights_path,
+                          source_sha256=file_sha256(model_path))
+
+
+def exported_source_hash(weights_path: str) -> Optional[str]:
+    """Checkpoint hash recorded by export_weights, or None if none was recorded"""
+    with np.load(weights_path) as weights:
+        if SOURCE_HASH_KEY not in weights.files:
+            return None
+        return str(weights[SOURCE_HASH_KEY])
+
+
+def verify_parity(torch_engine: TorchEngine, numpy_engine: NumpyEngine,
+                  samples: int = 4096, seed: int = 0, atol: float = 1e-5,
+                  inputs: Optional[np.ndarray] = None) -> float:
+    """
+    Compare the NumPy forward pass with the torch one.
+
+    Args:
+        torch_engine: Reference engine
+        numpy_engine: Engine under test
+        samples: Number of random normalized inputs when `inputs` is not given
+        seed: Random seed for the generated inputs
+        atol: Maximum allowed absolute difference
+        inputs: Optional (N, input_size) normalized inputs to use instead
+
+    Returns:
+        Maximum absolute difference between the two outputs
+
+    Raises:
+        AssertionError: If the outputs or their argmax differ
+    """
+    if inputs is None:
+        input_size = numpy_engine.layers[0][0].shape[0]
+        inputs = np.random.default_rng(seed).standard_normal((samples, input_size)).astype(np.float32)
+
+    expected = torch_engine(inputs)
+    actual = numpy_engine(inputs)
+
+    max_diff = float(np.abs(expected - actual).max())
+    if max_diff > atol:
+        raise AssertionError(f"NumPy engine differs from torch by {max_diff:.3g} (atol={atol})")
+    if not np.array_equal(expected.argmax(axis=1), actual.argmax(axis=1)):
+        raise AssertionError("NumPy engine ranks classes differently from torch")
+    return max_diff
+
+
+def verify_topk(reference, optimized, mean: np.ndarray, std: np.ndarray,
+                top_n: int = 3, samples: int = 2048, seed: int = 0, tie_tol: float = 1e-4) -> int:
+    """
+    Check that an optimized model ranks crops exactly like the reference.
+
+    Inputs are drawn around the training distribution (mean +/- a few std).
+    A row may only differ where the reference scores of the swapped classes
+    are tied within `tie_tol`.
+
+    Args:
+        reference: Callable mapping raw (N, 7) features to scores
+        optimized: Callable mapping raw (N, 7) features to scores
+        mean: Feature means used to generate inputs
+        std: Feature standard deviations used to generate inputs
+        top_n: Number of ranked classes to compare
+        samples: Number of generated inputs
+        seed: Random seed for the generated inputs
+        tie_tol: Score difference below which two classes count as tied
+
+    Returns:
+        Number of rows checked
+
+    Raises:
+        AssertionError: If any row ranks differently outside of ties
+    """
+    rng = np.random.default_rng(seed)
+    inputs = (mean + std * rng.standard_normal((samples, len(mean))) * 2).astype(np.float32)
+
+    expected_scores = reference(inputs)
+    expected = np.argsort(-expected_scores, axis=1, kind="stable")[:, :top_n]
+    actual = np.argsort(-optimized(inputs), axis=1, kind="stable")[:, :top_n]
+
+    for row in np.nonzero((expected != actual).any(axis=1))[0]:
+        diff = np.abs(expected_scores[row, expected[row]] - expected_scores[row, actual[row]])
+        if diff.max() > tie_tol:
+            raise AssertionError(
+                f"Optimized model ranks row {row} as {actual[row].tolist()}, expected {expected[row].tolist()}"
+            )
+    return samples
+
+
+def main():
+    """Export the baseline checkpoint to .npz and check it against torch"""
+    from backend.services.model_registry import MODEL_PATH, WEIGHTS_PATH, INPUT_SIZE, NUM_CLASSES
+
+    parser = argparse.ArgumentParser(description="Export Net_64_128_64 weights for the NumPy engine")
+    parser.add_argument("--model", default=MODEL_PATH, help="torch checkpoint (baseline.hdf5)")
+    parser.add_argument("--out", default=WEIGHTS_PATH, help="destination .npz")
+    parser.add_argument("--skip-verify", action="store_true", help="do not run the parity check")
+    args = parser.parse_args()
+
+    export_checkpoint(args.model, args.out)
+    print(f"✓ Exported weights to {args.out}")
+
+    if not args.skip_verify:
+        max_diff = verify_parity(
+            TorchEngine.from_checkpoint(args.model, INPUT_SIZE, NUM_CLASSES),
+            NumpyEngine.from_npz(args.out),
+        )
+        print(f"✓ NumPy engine matches torch (max abs diff {max_diff:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Location Catalog - Precomputed state -> district lists served as JSON bytes
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from backend.services.location_index import LocationIndex
+from backend.services.rainfall_store import RainfallStore, get_rainfall_store
+
+
+class CachedJSON:
+    """A pre-serialized JSON body with its strong ETag"""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, payload: dict):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header already names this body"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return any(tag.strip().removeprefix("W/") == self.etag for tag in if_none_match.split(","))
+
+
+class LocationCatalog:
+    """
+    States and their districts, built from the rainfall dataset.
+
+    Every response body is serialized once, together with its ETag, when the
+    rainfall table is (re)loaded; a request only does a dict lookup. The
+    fuzzy LocationIndex is rebuilt at the same time.
+    """
+
+    def __init__(self, store: RainfallStore, fallback_states: Sequence[str] = (), max_age: int = 3600):
+        """
+        Args:
+            store: Rainfall store the catalog is built from
+            fallback_states: States to list when the rainfall file is missing
+            max_age: Cache-Control max-age for clients, in seconds
+        """
+        self.store = store
+        self.fallback_states = list(fallback_states)
+        self.max_age = max_age
+
+        self._table = None
+        self._states: Optional[CachedJSON] = None
+        self._districts: Dict[str, CachedJSON] = {}
+        self._index: Optional[LocationIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_control(self) -> str:
+        """Cache-Control header value for catalog responses"""
+        return f"public, max-age={self.max_age}"
+
+    def _ensure_built(self):
+        """Rebuild the serialized bodies if the rainfall table was reloaded"""
+        table = self.store.table
+        if self._states is None or table is not self._table:
+            with self._lock:
+                if self._states is None or table is not self._table:
+                    self._build(table)
+
+    def _build(self, table):
+        if table is None:
+            states: List[str] = self.fallback_states
+            districts_by_state: Dict[str, List[str]] = {}
+        else:
+            states = list(table.districts_by_state)
+            districts_by_state = table.districts_by_state
+
+        self._districts = {
+            state: CachedJSON({"state": state, "districts": districts})
+            for state, districts in districts_by_state.items()
+        }
+        self._states = CachedJSON({"states": states})
+        self._index = LocationIndex(states, districts_by_state)
+        self._table = table
+
+    def states(self) -> CachedJSON:
+        """Serialized {"states": [...]} body"""
+        self._ensure_built()
+        return self._states
+
+    def districts(self, state: str) -> Optional[CachedJSON]:
+        """
+        Serialized {"state": ..., "districts": [...]} body.
+
+        Args:
+            state: State name (case-insensitive)
+
+        Returns:
+            CachedJSON, or None if the state is unknown
+        """
+        self._ensure_built()
+        return self._districts.get(state.upper())
+
+    def index(self) -> LocationIndex:
+        """Typo-tolerant state/district matcher for the current table"""
+        self._ensure_built()
+        return self._index
+
+    def state_names(self) -> List[str]:
+        """All state names"""
+        self._ensure_built()
+        table = self._table
+        return list(table.districts_by_state) if table is not None else list(self.fallback_states)
+
+    def district_names(self, state: str) -> List[str]:
+        """District names of one state"""
+        self._ensure_built()
+        table = self._table
+        return list(table.districts_by_state.get(state.upper(), [])) if table is not None else []
+
+
+_catalog: Optional[LocationCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_location_catalog(fallback_states: Sequence[str] = ()) -> LocationCatalog:
+    """Return the process-wide LocationCatalog, creating it on first use"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = LocationCatalog(
+                    get_rainfall_store(),
+                    fallback_states=fallback_states,
+                    max_age=int(os.getenv("LOCATION_CACHE_MAX_AGE", "3600")),
+                )
+    return _catalog
@@ -0,0 +1,168 @@
+"""
+Location Index - Typo-tolerant state/district matching over the rainfall dataset
+"""
+
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+
+_NON_ALNUM = re.compile(r"[^0-9A-Z]+")
+
+
+def normalize(name: str) -> str:
+    """Uppercase, with punctuation dropped and whitespace collapsed ("  north-goa." -> "NORTH GOA")"""
+    return " ".join(_NON_ALNUM.sub(" ", name.upper()).split())
+
+
+def trigrams(name: str) -> frozenset:
+    """Padded character trigrams of a normalized name"""
+    padded = f"  {name} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class Match(NamedTuple):
+    """One suggestion: the dataset's own spelling and a similarity in [0, 1]"""
+    name: str
+    state: str
+    score: float
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to names.
+
+    A query only touches the posting lists of its own trigrams, so the
+    cost depends on how many names share trigrams with it, not on the
+    number of names. Candidates are scored with the Dice coefficient of
+    their trigram sets; a name the query is a prefix of scores at least
+    `PREFIX_SCORE` so abbreviations ("MAHA") still rank first.
+    """
+
+    PREFIX_SCORE = 0.75
+
+    def __init__(self, entries: Sequence[Tuple[str, str]]):
+        """
+        Args:
+            entries: (name, state) pairs; for a state index, state == name
+        """
+        self.entries = list(entries)
+        self.keys = [normalize(name) for name, _ in self.entries]
+        self.sizes = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+
+        for entry_id, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings[gram].append(entry_id)
+            self.exact[key].append(entry_id)
+
+        self.postings = dict(self.postings)
+        self.exact = dict(self.exact)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, k: int = 5, state: Optional[str] = None,
+               min_score: float = 0.3) -> List[Match]:
+        """
+        Best matches for `query`, most similar first.
+
+        Args:
+            query: Free-text name
+            k: Maximum number of suggestions
+            state: Only consider entries of this state
+            min_score: Drop suggestions scoring below this
+
+        Returns:
+            Up to k Match tuples; an exact (normalized) match scores 1.0
+        """
+        key = normalize(query)
+        if not key:
+            return []
+
+        exact = [i for i in self.exact.get(key, ()) if state is None or self.entries[i][1] == state]
+        if exact:
+            return [Match(*self.entries[i], 1.0) for i in exact[:k]]
+
+        grams = trigrams(key)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for entry_id in self.postings.get(gram, ()):
+                shared[entry_id] += 1
+
+        scored = []
+        for entry_id, count in shared.items():
+            name, entry_state = self.entries[entry_id]
+            if state is not None and entry_state != state:
+                continue
+            score = 2.0 * count / (len(grams) + self.sizes[entry_id])
+            if len(key) >= 3 and self.keys[entry_id].startswith(key):
+                score = max(score, self.PREFIX_SCORE)
+            if score >= min_score:
+                scored.append((score, entry_id))
+
+        return [Match(*self.entries[i], round(score, 4)) for score, i in heapq.nlargest(k, scored)]
+
+
+class LocationIndex:
+    """
+    State and district matchers built once per rainfall table.
+
+    `resolve_*` return the dataset spelling when the input is an exact
+    (normalized) or clearly best match, and None otherwise; `suggest_*`
+    return ranked alternatives for error messages.
+    """
+
+    # A fuzzy match is accepted only above this score and ahead of the runner-up
+    ACCEPT_SCORE = 0.6
+    ACCEPT_MARGIN = 0.1
+
+    def __init__(self, states: Sequence[str], districts_by_state: Dict[str, Sequence[str]]):
+        self.states = TrigramIndex([(state, state) for state in states])
+        self.districts = TrigramIndex([
+            (district, state)
+            for state, districts in districts_by_state.items()
+            for district in districts
+        ])
+        # Per-state indexes keep state-restricted lookups independent of the other states
+        self.districts_in = {
+            state: TrigramIndex([(district, state) for district in districts])
+            for state, districts in districts_by_state.items() if districts
+        }
+
+    def has_districts(self, state: str) -> bool:
+        """True if district names are known for this state (the dataset is loaded)"""
+        return state in self.districts_in
+
+    def suggest_states(self, query: str, k: int = 5) -> List[Match]:
+        return self.states.search(query, k)
+
+    def suggest_districts(self, query: str, state: Optional[str] = None, k: int = 5) -> List[Match]:
+        if state is None:
+            return self.districts.search(query, k)
+        index = self.districts_in.get(state)
+        return index.search(query, k) if index is not None else []
+
+    def resolve_state(self, query: str, fuzzy: bool = True) -> Optional[str]:
+        """Dataset spelling of a state, or None if unknown or ambiguous"""
+        return self._resolve(self.states.search(query, 2), fuzzy)
+
+    def resolve_district(self, query: str, state: str, fuzzy: bool = True) -> Optional[str]:
+        """Dataset spelling of a district within `state`, or None if unknown or ambiguous"""
+        return self._resolve(self.suggest_districts(query, state, 2), fuzzy)
+
+    def _resolve(self, matches: List[Match], fuzzy: bool) -> Optional[str]:
+        if not matches:
+            return None
+        best = matches[0]
+        if best.score == 1.0:
+            return best.name
+        if not fuzzy or best.score < self.ACCEPT_SCORE:
+            return None
+        if len(matches) > 1 and best.score - matches[1].score < self.ACCEPT_MARGIN:
+            return None
+        return best.name
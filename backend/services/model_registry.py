@@ -0,0 +1,366 @@
+"""
+Model Registry - Process-wide cache of the trained crop model artifacts
+"""
+
+import os
+import pickle
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.services.inference_engine import (
+    NumpyEngine, TorchEngine, export_checkpoint, exported_source_hash, file_sha256, verify_topk
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Project root (model/ lives next to backend/)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODEL_PATH = os.path.join(PROJECT_ROOT, "model/baseline/baseline.hdf5")
+WEIGHTS_PATH = os.path.join(PROJECT_ROOT, "model/baseline/baseline.npz")
+NORMALIZATION_PATH = os.path.join(PROJECT_ROOT, "model/normalization/normalization.npz")
+ENCODER_PATH = os.path.join(PROJECT_ROOT, "model/pkl_files/encoder.pkl")
+
+# Versioned bundles written by model/train.py; model/current points at the promoted one
+BUNDLES_DIR = os.path.join(PROJECT_ROOT, "model/bundles")
+CURRENT_BUNDLE = os.path.join(PROJECT_ROOT, "model/current")
+BUNDLE_FILES = {
+    "model_path": "baseline.hdf5",
+    "weights_path": "baseline.npz",
+    "normalization_path": "normalization.npz",
+    "encoder_path": "encoder.pkl",
+}
+
+INPUT_SIZE = 7
+NUM_CLASSES = 22
+
+ENGINES = ("torch", "numpy")
+MODES = ("standard", "optimized")
+
+
+class ModelLoadError(RuntimeError):
+    """The model artifacts could not be loaded"""
+
+
+class ModelArtifacts:
+    """Everything needed to run one prediction, loaded from one set of files"""
+
+    def __init__(self, engine, mean: Optional[np.ndarray], std: Optional[np.ndarray],
+                 encoder, fingerprint: str, folded: bool = False):
+        self.engine = engine
+        self.mean = mean
+        self.std = std
+        self.encoder = encoder
+        self.fingerprint = fingerprint
+        # True when the normalization is baked into fc1 and inputs are used raw
+        self.folded = folded
+
+        # index -> crop name, so decoding never goes through the encoder
+        if encoder is not None:
+            self.labels = np.asarray(encoder.classes_, dtype=object)
+        else:
+            self.labels = np.array([f"Crop_{i}" for i in range(NUM_CLASSES)], dtype=object)
+
+    def forward(self, inputs: np.ndarray, probabilities: bool = True) -> np.ndarray:
+        """
+        Run the model on raw feature rows.
+
+        Args:
+            inputs: (N, 7) array of un-normalized features
+            probabilities: False skips the final softmax; use it when only
+                the ranking (argmax / top-k order) matters
+
+        Returns:
+            (N, num_classes) scores
+        """
+        inputs = np.asarray(inputs, dtype=np.float32)
+        if not self.folded and self.mean is not None:
+            inputs = (inputs - self.mean) / self.std
+        return self.engine(inputs) if probabilities else self.engine.logits(inputs)
+
+    @property
+    def model(self):
+        """The torch module for the torch engine, otherwise the engine itself"""
+        return self.engine.module if self.engine.module is not None else self.engine
+
+    @property
+    def normalization(self) -> Optional[dict]:
+        """Normalization parameters in the shape of the original npz file"""
+        if self.mean is None or self.std is None:
+            return None
+        return {"mean": self.mean, "std": self.std}
+
+
+class ModelRegistry:
+    """
+    Loads the model weights, normalization and encoder once per process.
+
+    `engine` selects the forward pass: "torch" runs model.net.Net_64_128_64
+    from baseline.hdf5, "numpy" runs NumpyEngine from the exported .npz
+    weights and never imports torch while the .npz is current. The .npz is
+    (re-)exported from baseline.hdf5 when it is missing or older than the
+    checkpoint, judged by the checkpoint hash recorded in the .npz or, for
+    files without one, by modification time.
+
+    `mode` "optimized" compiles the model at load time: the normalization is
+    folded into fc1's weight and bias, so a prediction is matmuls only. With
+    `verify` the compiled model is also checked against the standard one
+    (identical top-k on generated inputs) before it is used; off by default
+    to keep it out of cold start, as the identity is covered by the tests.
+
+    The artifacts stay warm between calls. Every `check_interval` seconds the
+    registry stats the files; when a modification time changes the files are
+    hashed and, if the content really changed, reloaded without a restart.
+
+    With a `bundle` directory, every check first resolves the paths: the
+    bundle's files if the directory exists, else the path arguments. A bundle
+    promoted while the server runs on the fallback files is picked up the
+    same way, without a restart.
+    """
+
+    def __init__(self,
+                 model_path: str = MODEL_PATH,
+                 weights_path: str = WEIGHTS_PATH,
+                 normalization_path: str = NORMALIZATION_PATH,
+                 encoder_path: str = ENCODER_PATH,
+                 engine: str = "torch",
+                 mode: str = "standard",
+                 check_interval: float = 2.0,
+                 verify: bool = False,
+                 bundle: Optional[str] = None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown inference engine '{engine}', expected one of {ENGINES}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown inference mode '{mode}', expected one of {MODES}")
+
+        self.model_path = model_path
+        self.weights_path = weights_path
+        self.normalization_path = normalization_path
+        self.encoder_path = encoder_path
+        self.engine = engine
+        self.mode = mode
+        self.check_interval = check_interval
+        self.verify = verify
+        self.bundle = bundle
+        self._fallback_paths = {
+            "model_path": model_path,
+            "weights_path": weights_path,
+            "normalization_path": normalization_path,
+            "encoder_path": encoder_path,
+        }
+
+        self._artifacts: Optional[ModelArtifacts] = None
+        self._stat_key: Optional[Tuple] = None
+        # Files whose load failed; not retried until they change again
+        self._failed_stat_key: Optional[Tuple] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> ModelArtifacts:
+        """
+        Return the currently loaded artifacts, reloading them if the files changed.
+
+        If a reload fails (e.g. a file is caught half-copied), the error is
+        logged and the previous artifacts keep being served until the files
+        change again.
+
+        Returns:
+            ModelArtifacts instance shared by every caller in the process
+
+        Raises:
+            ModelLoadError: If no artifacts could be loaded yet
+        """
+        artifacts = self._artifacts
+        now = time.monotonic()
+        if artifacts is not None and now - self._last_check < self.check_interval:
+            return artifacts
+
+        with self._lock:
+            self._last_check = now
+            self._resolve_bundle()
+            stat_key = self._stat_files()
+            if self._artifacts is not None and stat_key in (self._stat_key, self._failed_stat_key):
+                return self._artifacts
+
+            try:
+                if self.engine == "numpy" and self._export_if_stale():
+                    stat_key = self._stat_files()
+                fingerprint = self._hash_files()
+                if self._artifacts is None or fingerprint != self._artifacts.fingerprint:
+                    self._artifacts = self._load(fingerprint)
+            except ModelLoadError as e:
+                if self._artifacts is None:
+                    raise
+                logger.error("Model reload failed, still serving %s: %s", self._artifacts.fingerprint[:12], e)
+                self._failed_stat_key = stat_key
+                return self._artifacts
+
+            self._stat_key = stat_key
+            self._failed_stat_key = None
+            return self._artifacts
+
+    def _resolve_bundle(self):
+        """Point the paths at `bundle` if that directory exists, else at the fallback files"""
+        if self.bundle is None:
+            return
+        paths = bundle_paths(self.bundle) if os.path.isdir(self.bundle) else self._fallback_paths
+        if paths["weights_path"] != self.weights_path:
+            logger.info("Serving model files from %s", os.path.dirname(paths["weights_path"]))
+        for argument, path in paths.items():
+            setattr(self, argument, path)
+
+    def _paths(self) -> Tuple[str, ...]:
+        if self.engine == "numpy":
+            # The checkpoint is watched too: a new one makes the .npz stale
+            return self.weights_path, self.model_path, self.normalization_path, self.encoder_path
+        return self.model_path, self.normalization_path, self.encoder_path
+
+    def _export_if_stale(self) -> bool:
+        """
+        Export the checkpoint to the NumPy weights if they are missing or stale
+
+        Returns:
+            True if the weights were (re-)exported
+
+        Raises:
+            ModelLoadError: If the export fails
+        """
+        if not os.path.exists(self.model_path):
+            return False
+        try:
+            if os.path.exists(self.weights_path):
+                recorded = exported_source_hash(self.weights_path)
+                if recorded is not None:
+                    if recorded == file_sha256(self.model_path):
+                        return False
+                elif os.stat(self.model_path).st_mtime_ns <= os.stat(self.weights_path).st_mtime_ns:
+                    return False
+            export_checkpoint(self.model_path, self.weights_path)
+        except Exception as e:
+            raise ModelLoadError(f"Failed to export {self.model_path} to {self.weights_path}: {e}") from e
+        logger.info("Exported model weights from %s to %s", self.model_path, self.weights_path)
+        return True
+
+    def _stat_files(self) -> Tuple:
+        """Cheap change detector: path, inode, mtime and size of every artifact file"""
+        key = [self._paths()]
+        for path in self._paths():
+            try:
+                st = os.stat(path)
+                # The inode changes when a symlinked bundle directory is repointed
+                key.append((st.st_ino, st.st_mtime_ns, st.st_size))
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def _hash_files(self) -> str:
+        """
+        Content hash of every artifact file, used to ignore touch-only changes
+
+        Raises:
+            ModelLoadError: If a file exists but cannot be read
+        """
+        digest = hashlib.sha256()
+        for path in self._paths():
+            if not os.path.exists(path):
+                digest.update(b"missing")
+                continue
+            try:
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+            except OSError as e:
+                raise ModelLoadError(f"Cannot read {path}: {e}") from e
+        return digest.hexdigest()
+
+    def _load(self, fingerprint: str) -> ModelArtifacts:
+        """
+        Load the model, normalization and encoder from disk
+
+        Raises:
+            ModelLoadError: If a file is missing, unreadable or inconsistent
+        """
+        try:
+            if self.engine == "numpy":
+                if not os.path.exists(self.weights_path):
+                    raise FileNotFoundError(f"Model not found at {self.weights_path} or {self.model_path}")
+                engine = NumpyEngine.from_npz(self.weights_path)
+            else:
+                if not os.path.exists(self.model_path):
+                    raise FileNotFoundError(f"Model not found at {self.model_path}")
+                engine = TorchEngine.from_checkpoint(self.model_path, INPUT_SIZE, NUM_CLASSES)
+
+            mean = std = None
+            if os.path.exists(self.normalization_path):
+                with np.load(self.normalization_path) as normalization:
+                    mean = normalization["mean"].astype(np.float32)
+                    std = normalization["std"].astype(np.float32)
+
+            encoder = None
+            if os.path.exists(self.encoder_path):
+                with open(self.encoder_path, "rb") as f:
+                    encoder = pickle.load(f)
+
+            artifacts = ModelArtifacts(engine, mean, std, encoder, fingerprint)
+            if self.mode == "optimized" and mean is not None:
+                artifacts = self._compile(artifacts, verify=self.verify)
+
+            logger.info("ML model loaded (%s engine, %s mode, %s)", engine.name, self.mode, fingerprint[:12])
+            return artifacts
+
+        except Exception as e:
+            raise ModelLoadError(f"Failed to load model: {e}") from e
+
+    @staticmethod
+    def _compile(artifacts: ModelArtifacts, verify: bool = False) -> ModelArtifacts:
+        """Fold the normalization into fc1, optionally checking the ranking is unchanged"""
+        engine = artifacts.engine.fold_normalization(artifacts.mean, artifacts.std)
+        compiled = ModelArtifacts(
+            engine, artifacts.mean, artifacts.std, artifacts.encoder, artifacts.fingerprint, folded=True
+        )
+        if verify:
+            verify_topk(
+                artifacts.forward,
+                lambda inputs: compiled.forward(inputs, probabilities=False),
+                artifacts.mean, artifacts.std,
+            )
+        return compiled
+
+
+def bundle_paths(bundle_dir: str) -> Dict[str, str]:
+    """ModelRegistry path arguments for the files of one bundle directory"""
+    return {argument: os.path.join(bundle_dir, name) for argument, name in BUNDLE_FILES.items()}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Return the process-wide ModelRegistry, creating it on first use.
+
+    Serves the bundle at MODEL_BUNDLE (default model/current) if it exists,
+    else the legacy model/baseline, model/normalization and model/pkl_files
+    files. The bundle is looked up again on every reload check and its path
+    is kept unresolved, so promoting a bundle (creating or repointing the
+    model/current symlink) is picked up as a reload.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(
+                    bundle=os.getenv("MODEL_BUNDLE", CURRENT_BUNDLE),
+                    engine=os.getenv("CROP_MODEL_ENGINE", "torch").lower(),
+                    mode=os.getenv("CROP_INFERENCE_MODE", "standard").lower(),
+                    check_interval=float(os.getenv("MODEL_RELOAD_CHECK_INTERVAL", "2.0")),
+                    verify=os.getenv("CROP_VERIFY_COMPILED", "0").lower() in ("1", "true", "yes"),
+                )
+    return _registry
@@ -0,0 +1,184 @@
+"""
+Rainfall Store - In-memory, indexed district-wise rainfall normals
+"""
+
+import csv
+import os
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+RAINFALL_FILE = "data/district wise rainfall normal.csv"
+
+KEY_COLUMNS = ("STATE_UT_NAME", "DISTRICT")
+
+
+class RainfallTable:
+    """One parsed snapshot of the rainfall CSV"""
+
+    def __init__(self, keys: List[Tuple[str, str]], columns: List[str], values: np.ndarray):
+        self.keys = keys
+        self.columns = columns
+        self.values = values
+
+        # (STATE_UT_NAME, DISTRICT) -> row; the first occurrence wins, as with pandas
+        self.index: Dict[Tuple[str, str], int] = {}
+        for row, key in enumerate(keys):
+            self.index.setdefault(key, row)
+
+        # column name (JAN, FEB, ..., ANNUAL) -> column offset in `values`
+        self.column_index = {name: offset for offset, name in enumerate(columns)}
+
+        # state -> districts in file order, without duplicates
+        self.districts_by_state: Dict[str, List[str]] = {}
+        for state, district in self.index:
+            self.districts_by_state.setdefault(state, []).append(district)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "RainfallTable":
+        """Parse the rainfall CSV without pandas"""
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = [name.strip() for name in next(reader)]
+
+            key_offsets = [header.index(name) for name in KEY_COLUMNS]
+            value_offsets = [i for i, name in enumerate(header) if name not in KEY_COLUMNS]
+
+            keys, rows = [], []
+            for record in reader:
+                if not record:
+                    continue
+                keys.append(tuple(record[i].strip() for i in key_offsets))
+                rows.append([_to_float(record[i]) if i < len(record) else np.nan for i in value_offsets])
+
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(value_offsets))
+        return cls(keys, [header[i] for i in value_offsets], values)
+
+    def lookup(self, state: str, district: str, month: str) -> Optional[float]:
+        """
+        Rainfall for one (state, district) and month column.
+
+        Returns:
+            Rainfall in mm, or None if the state/district pair is unknown
+
+        Raises:
+            KeyError: If `month` is not a column of the file
+        """
+        row = self.index.get((state, district))
+        if row is None:
+            return None
+        return float(self.values[row, self.column_index[month]])
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+class RainfallStore:
+    """
+    Loads the rainfall CSV once and serves O(1) lookups from memory.
+
+    Every `check_interval` seconds a lookup stats the file; if its
+    modification time or size changed, the table is re-parsed and swapped in.
+    If the new file cannot be parsed (e.g. it is caught half-written), the
+    error is logged and the previous table is kept until the file changes again.
+    """
+
+    def __init__(self, path: str = RAINFALL_FILE, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+
+        self._table: Optional[RainfallTable] = None
+        self._stat_key = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def table(self) -> Optional[RainfallTable]:
+        """Current table, or None if the file does not exist"""
+        now = time.monotonic()
+        if self._stat_key is not None and now - self._last_check < self.check_interval:
+            return self._table
+
+        with self._lock:
+            self._last_check = now
+            try:
+                st = os.stat(self.path)
+                stat_key = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stat_key = "missing"
+
+            if stat_key != self._stat_key:
+                if stat_key == "missing":
+                    logger.warning("Rainfall file not found at %s", self.path)
+                    self._table = None
+                else:
+                    try:
+                        self._table = RainfallTable.from_csv(self.path)
+                        logger.info("Rainfall data loaded (%d districts)", len(self._table.index))
+                    except Exception as e:
+                        logger.error("Cannot parse rainfall file %s, %s: %s", self.path,
+                                     "keeping the previous table" if self._table is not None else "no rainfall data", e)
+                self._stat_key = stat_key
+            return self._table
+
+    @property
+    def available(self) -> bool:
+        """True if the rainfall file exists"""
+        return self.table is not None
+
+    def lookup(self, state: str, district: str, month: str) -> Optional[float]:
+        """
+        Get rainfall for a state, district and month.
+
+        Args:
+            state: State name in UPPERCASE
+            district: District name in UPPERCASE
+            month: Month abbreviation (JAN, FEB, etc)
+
+        Returns:
+            Rainfall in mm, or None if the file or the state/district pair is missing
+
+        Raises:
+            KeyError: If `month` is not a column of the file
+        """
+        table = self.table
+        if table is None:
+            return None
+        return table.lookup(state, district, month)
+
+    def states(self) -> List[str]:
+        """All states in file order"""
+        table = self.table
+        return list(table.districts_by_state) if table is not None else []
+
+    def districts(self, state: str) -> List[str]:
+        """Districts of a state in file order"""
+        table = self.table
+        return list(table.districts_by_state.get(state, [])) if table is not None else []
+
+
+_store: Optional[RainfallStore] = None
+_store_lock = threading.Lock()
+
+
+def get_rainfall_store() -> RainfallStore:
+    """Return the process-wide RainfallStore, creating it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RainfallStore(
+                    path=os.getenv("RAINFALL_FILE", RAINFALL_FILE),
+                    check_interval=float(os.getenv("RAINFALL_RELOAD_CHECK_INTERVAL", "5.0")),
+                )
+    return _store
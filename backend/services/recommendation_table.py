@@ -0,0 +1,291 @@
+"""
+Recommendation Table - Precomputed top crops for every district x month
+
+With default soil values the model input depends only on the district,
+the month and the weather. Under climatological weather the whole grid is
+scored offline, once per model, and /predict/ serves it from a
+memory-mapped file. A weather snapshot is one day's observation, not a
+monthly normal, so the table is only built from a climatology file.
+
+Build from project root:
+    python -m backend.services.recommendation_table
+    python -m backend.services.recommendation_table --climatology data/weather_climatology.csv
+    python -m backend.services.recommendation_table --workers 0
+
+Files (in --out-dir, default data/recommendations):
+    recommendations.npy    structured array, one row per (district, month)
+    recommendations.json   row keys, crop labels, model fingerprint, weather source
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+TABLE_DIR = "data/recommendations"
+TABLE_NAME = "recommendations"
+CLIMATOLOGY_FILE = "data/weather_climatology.csv"
+# Sidecar "weather" value of tables built from monthly normals
+CLIMATOLOGY = "climatology"
+
+MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+TOP_N = 3
+
+ROW_DTYPE = np.dtype([
+    ("valid", "?"),
+    ("crops", "<i2", (TOP_N,)),
+    ("confidence", "<f4", (TOP_N,)),
+    ("nitrogen", "<f4"),
+    ("phosphorous", "<f4"),
+    ("potassium", "<f4"),
+    ("ph", "<f4"),
+    ("rainfall", "<f4"),
+    ("temperature", "<f4"),
+    ("humidity", "<f4"),
+])
+
+
+class Recommendation(NamedTuple):
+    """One precomputed answer and the inputs it was computed from"""
+    predictions: List[Tuple[str, float]]
+    soil_values: Dict[str, float]
+    rainfall: float
+    temperature: float
+    humidity: float
+
+
+def load_climatology(path: str) -> Dict[Tuple[str, str, str], Tuple[float, float]]:
+    """
+    Monthly normal temperature and humidity per district.
+
+    CSV columns: STATE_UT_NAME, DISTRICT, MONTH (JAN..DEC), TEMPERATURE (C), HUMIDITY (%)
+
+    Returns:
+        (state, district, month) -> (temperature, humidity)
+    """
+    normals = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            key = (record["STATE_UT_NAME"].strip(), record["DISTRICT"].strip(), record["MONTH"].strip().upper())
+            normals[key] = (float(record["TEMPERATURE"]), float(record["HUMIDITY"]))
+    return normals
+
+
+def snapshot_weather(path: str) -> Dict[Tuple[str, str, str], Tuple[float, float]]:
+    """
+    Use one weather snapshot for every month, when no climatology file exists.
+
+    Only for offline scoring (bulk_scoring); the recommendation table
+    refuses it, since /predict/ would serve one day's weather for any month.
+    """
+    from backend.services.weather_snapshot import SnapshotWeatherService
+
+    snapshot = SnapshotWeatherService(path)
+    normals = {}
+    for (district, state), observation in snapshot.observations.items():
+        if state:
+            for month in MONTHS:
+                normals[(state, district, month)] = observation
+    return normals
+
+
+def load_weather_normals(climatology: str = CLIMATOLOGY_FILE,
+                         snapshot: Optional[str] = None) -> Tuple[Optional[Dict[Tuple[str, str, str], Tuple[float, float]]], str]:
+    """
+    Climatology if the file exists, else the given (or latest) weather snapshot.
+
+    Returns:
+        Tuple of ((state, district, month) -> (temperature, humidity), source file name),
+        or (None, "") if neither is available
+    """
+    if os.path.exists(climatology):
+        return load_climatology(climatology), os.path.basename(climatology)
+
+    from backend.services.weather_snapshot import SNAPSHOT_DIR, latest_snapshot
+
+    snapshot = snapshot or latest_snapshot(SNAPSHOT_DIR)
+    if snapshot is None:
+        return None, ""
+    return snapshot_weather(snapshot), os.path.basename(snapshot)
+
+
+def build_table(crop_service, soil_service, rainfall_table,
+                weather: Dict[Tuple[str, str, str], Tuple[float, float]]) -> Tuple[np.ndarray, List[Tuple[str, str]]]:
+    """
+    Score every (state, district) x month of the rainfall table in one batch.
+
+    Args:
+        crop_service: CropService (or SharedModelPool) used for scoring
+        soil_service: SoilService providing the default soil values
+        rainfall_table: RainfallTable with the district list and monthly normals
+        weather: (state, district, month) -> (temperature, humidity)
+
+    Returns:
+        Tuple of (rows in ROW_DTYPE, (state, district) key per block of 12 rows).
+        Rows without weather or rainfall are left with valid=False.
+    """
+    keys = list(rainfall_table.index)
+    rows = np.zeros(len(keys) * len(MONTHS), dtype=ROW_DTYPE)
+
+    for key_id, (state, district) in enumerate(keys):
+        soil = soil_service.get_default_soil_values(district)
+        for month_id, month in enumerate(MONTHS):
+            row = rows[key_id * len(MONTHS) + month_id]
+            observation = weather.get((state, district, month))
+            rainfall = rainfall_table.lookup(state, district, month)
+            if observation is None or rainfall is None or np.isnan(rainfall):
+                continue
+            row["valid"] = True
+            row["nitrogen"], row["phosphorous"] = soil["nitrogen"], soil["phosphorous"]
+            row["potassium"], row["ph"] = soil["potassium"], soil["ph"]
+            row["rainfall"] = rainfall
+            row["temperature"], row["humidity"] = observation
+
+    valid = rows["valid"]
+    if valid.any():
+        from backend.services.crop_service import FEATURES
+        features = np.stack([rows[name][valid] for name in FEATURES], axis=1)
+        rows["crops"][valid], rows["confidence"][valid] = crop_service.top_crops_arrays(features, TOP_N)
+
+    return rows, keys
+
+
+def write_table(rows: np.ndarray, keys: List[Tuple[str, str]], labels: List[str], metadata: dict,
+                out_dir: str = TABLE_DIR) -> str:
+    """Write the .npy rows and the .json sidecar; each file is replaced atomically"""
+    os.makedirs(out_dir, exist_ok=True)
+    array_path = os.path.join(out_dir, f"{TABLE_NAME}.npy")
+    sidecar_path = os.path.join(out_dir, f"{TABLE_NAME}.json")
+
+    tmp_path = f"{array_path}.tmp.npy"
+    np.save(tmp_path, rows)
+    os.replace(tmp_path, array_path)
+
+    sidecar = {**metadata, "months": list(MONTHS), "top_n": TOP_N, "labels": labels, "keys": keys}
+    with open(f"{sidecar_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(sidecar, f, ensure_ascii=False)
+    os.replace(f"{sidecar_path}.tmp", sidecar_path)
+    return array_path
+
+
+class RecommendationTable:
+    """
+    Memory-mapped view of a precomputed table.
+
+    Opening it reads only the sidecar; rows are paged in by the OS as they
+    are looked up, and every worker process shares the same pages.
+    """
+
+    def __init__(self, array_path: str):
+        self.array_path = array_path
+        with open(os.path.splitext(array_path)[0] + ".json", encoding="utf-8") as f:
+            sidecar = json.load(f)
+
+        if sidecar.get("weather") != CLIMATOLOGY:
+            raise ValueError("not built from a weather climatology; rebuild it with --climatology")
+
+        self.rows = np.load(array_path, mmap_mode="r")
+        self.fingerprint: str = sidecar["fingerprint"]
+        self.weather_source: str = sidecar.get("weather_source", "")
+        self.built_at: str = sidecar.get("built_at", "")
+        self.labels: List[str] = sidecar["labels"]
+        self.months = {month: offset for offset, month in enumerate(sidecar["months"])}
+        self.key_index = {(state, district): key_id for key_id, (state, district) in enumerate(sidecar["keys"])}
+
+        logger.info("Recommendation table loaded (%d districts, model %s, %s weather)",
+                    len(self.key_index), self.fingerprint[:12], self.weather_source)
+
+    def lookup(self, state: str, district: str, month: str) -> Optional[Recommendation]:
+        """Precomputed answer for default soil values, or None if not covered"""
+        key_id = self.key_index.get((state, district))
+        month_id = self.months.get(month)
+        if key_id is None or month_id is None:
+            return None
+
+        row = self.rows[key_id * len(self.months) + month_id]
+        if not row["valid"]:
+            return None
+
+        # Stored as float32; round so responses do not show 6.300000190734863
+        return Recommendation(
+            predictions=[(self.labels[crop], float(conf)) for crop, conf in zip(row["crops"], row["confidence"])],
+            soil_values={name: round(float(row[name]), 4) for name in ("nitrogen", "phosphorous", "potassium", "ph")},
+            rainfall=round(float(row["rainfall"]), 4),
+            temperature=round(float(row["temperature"]), 4),
+            humidity=round(float(row["humidity"]), 4),
+        )
+
+
+def load_recommendation_table(array_path: Optional[str] = None) -> Optional[RecommendationTable]:
+    """
+    Open the table named by RECOMMENDATION_TABLE (default data/recommendations/recommendations.npy).
+
+    Returns None if it has not been built; setting RECOMMENDATION_TABLE to an
+    empty string disables the fast path.
+    """
+    if array_path is None:
+        array_path = os.getenv("RECOMMENDATION_TABLE", os.path.join(TABLE_DIR, f"{TABLE_NAME}.npy"))
+    if not array_path or not os.path.exists(array_path):
+        return None
+    try:
+        return RecommendationTable(array_path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Ignoring recommendation table %s: %s", array_path, e)
+        return None
+
+
+def main():
+    from backend.services.crop_service import get_crop_service
+    from backend.services.rainfall_store import get_rainfall_store
+    from backend.services.soil_service import get_soil_service
+
+    parser = argparse.ArgumentParser(description="Precompute top crops for every district x month")
+    parser.add_argument("--climatology", default=CLIMATOLOGY_FILE, help="monthly temperature/humidity normals CSV")
+    parser.add_argument("--out-dir", default=TABLE_DIR)
+    parser.add_argument("--workers", type=int, default=1, help="processes running the model (0 = all cores)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    store = get_rainfall_store()
+    if not store.available:
+        raise SystemExit(f"Rainfall file not found at {store.path}")
+
+    if not os.path.exists(args.climatology):
+        raise SystemExit(f"No climatology file at {args.climatology}; the table needs monthly "
+                         f"weather normals (a weather snapshot only covers one day)")
+    weather = load_climatology(args.climatology)
+
+    crop_service = get_crop_service()
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers > 1:
+        from backend.services.shared_pool import get_shared_model_pool
+
+        with get_shared_model_pool(workers, TOP_N, chunk_rows=1024) as pool:
+            rows, keys = build_table(pool, get_soil_service(), store.table, weather)
+    else:
+        rows, keys = build_table(crop_service, get_soil_service(), store.table, weather)
+    elapsed = time.perf_counter() - started
+
+    path = write_table(rows, keys, [str(label) for label in crop_service.labels], {
+        "fingerprint": crop_service.registry.get().fingerprint,
+        "weather": CLIMATOLOGY,
+        "weather_source": os.path.basename(args.climatology),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }, args.out_dir)
+
+    print(f"✓ {int(rows['valid'].sum())}/{len(rows)} district-months scored in {elapsed:.2f}s -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Session Store - Bounded chatbot session storage with idle expiry
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+SESSION_DB = "data/chatbot_sessions.sqlite3"
+
+
+def _encode(record: Any) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+
+
+class InMemorySessionStore:
+    """
+    Per-process session store with idle TTL and LRU eviction.
+
+    Every access moves a session to the back of an ordered dict, so the
+    front always holds the least recently used one: expired sessions are
+    pruned from the front in amortized O(1), and when `max_sessions` is
+    exceeded the front entry is evicted.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_ttl: float = 1800.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_sessions: Maximum number of live sessions
+            idle_ttl: Seconds without a message after which a session expires
+            clock: Monotonic time source
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _prune(self, now: float):
+        """Drop expired sessions from the LRU end; must be called with the lock held"""
+        while self._sessions:
+            last_seen, _ = next(iter(self._sessions.values()))
+            if now - last_seen < self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return the session record and mark it as used, or None if unknown or expired"""
+        with self._lock:
+            now = self.clock()
+            self._prune(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session_id: str, record: Any):
+        """Insert or replace a session, evicting the least recently used one if full"""
+        with self._lock:
+            now = self.clock()
+            self._sessions[session_id] = (now, record)
+            self._sessions.move_to_end(session_id)
+            self._prune(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id: str):
+        """Forget a session"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        """Size and eviction counters"""
+        return {
+            "backend": "memory",
+            "size": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_ttl": self.idle_ttl,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteSessionStore:
+    """
+    Session store in a SQLite file shared by every worker process.
+
+    Records are stored as compact JSON. Each thread uses its own
+    connection; WAL mode lets readers in other workers proceed while one
+    writes. Expired and over-limit sessions are swept at most every
+    `sweep_interval` seconds instead of on every write.
+
+    `len()` and `stats()` report the session count taken at the last sweep,
+    so metrics and health checks never query the database themselves.
+    """
+
+    def __init__(self, path: str = SESSION_DB, max_sessions: int = 10000, idle_ttl: float = 1800.0,
+                 sweep_interval: float = 5.0,
+                 encode: Callable[[Any], str] = _encode,
+                 decode: Callable[[str], Any] = json.loads):
+        """
+        Args:
+            path: SQLite database file
+            max_sessions: Maximum number of live sessions
+            idle_ttl: Seconds without a message after which a session expires
+            sweep_interval: Minimum seconds between expiry/eviction sweeps
+            encode: Record -> text serializer
+            decode: Text -> record deserializer
+        """
+        self.path = path
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.encode = encode
+        self.decode = decode
+
+        self._local = threading.local()
+        self._last_sweep = 0.0
+        self._size = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, record TEXT NOT NULL, last_seen REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+        self.sweep()
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def __len__(self) -> int:
+        """Approximate number of live sessions, as of the last sweep"""
+        return self._size
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return the session record and mark it as used, or None if unknown or expired"""
+        now = time.time()
+        with self._connection() as db:
+            row = db.execute(
+                "SELECT record FROM sessions WHERE id = ? AND last_seen > ?", (session_id, now - self.idle_ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE sessions SET last_seen = ? WHERE id = ?", (now, session_id))
+        return self.decode(row[0])
+
+    def put(self, session_id: str, record: Any):
+        """Insert or replace a session"""
+        now = time.time()
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (id, record, last_seen) VALUES (?, ?, ?)",
+                (session_id, self.encode(record), now)
+            )
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep(now)
+
+    def delete(self, session_id: str):
+        """Forget a session"""
+        with self._connection() as db:
+            db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def sweep(self, now: Optional[float] = None):
+        """Delete expired sessions, then the least recently used ones above max_sessions, and recount"""
+        now = now or time.time()
+        with self._connection() as db:
+            db.execute("DELETE FROM sessions WHERE last_seen <= ?", (now - self.idle_ttl,))
+            db.execute(
+                "DELETE FROM sessions WHERE id IN "
+                "(SELECT id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+            self._size = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Size and limits"""
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "size": self._size,
+            "max_sessions": self.max_sessions,
+            "idle_ttl": self.idle_ttl,
+        }
+
+
+def get_session_store(encode: Callable[[Any], str] = _encode, decode: Callable[[str], Any] = json.loads):
+    """
+    Factory function to create the configured chatbot session store.
+
+    `encode` / `decode` serialize records for the shared (sqlite) backend;
+    the in-memory backend keeps the record objects themselves.
+
+    CHATBOT_SESSION_BACKEND selects the implementation:
+        memory (default): per-process, fastest; sessions are lost on restart
+            and not shared between uvicorn workers
+        sqlite: shared file (CHATBOT_SESSION_DB) usable by several workers
+    """
+    backend = os.getenv("CHATBOT_SESSION_BACKEND", "memory").lower()
+    max_sessions = int(os.getenv("CHATBOT_MAX_SESSIONS", "10000"))
+    idle_ttl = float(os.getenv("CHATBOT_SESSION_TTL", "1800"))
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("CHATBOT_SESSION_DB", SESSION_DB), max_sessions, idle_ttl,
+                                  encode=encode, decode=decode)
+    if backend != "memory":
+        raise ValueError(f"Unknown CHATBOT_SESSION_BACKEND '{backend}' (expected memory or sqlite)")
+    return InMemorySessionStore(max_sessions, idle_ttl)
@@ -0,0 +1,321 @@
+"""
+Shared Model Pool - Multi-process batch inference over shared-memory weights
+
+The parent copies the model weights and normalization into one shared
+memory block once; every worker process maps that block and runs a
+NumpyEngine directly on the mapped arrays, so no worker loads or unpickles
+the model files. Input rows and top-k results travel through a ring of
+shared-memory slots: the parent writes a chunk into a free slot, a worker
+scores it in place, and only the slot number crosses the process boundary.
+
+Measure scaling on the current model (from project root):
+    python -m backend.services.shared_pool --rows 1000000 --workers 1 2 4 8
+"""
+
+import os
+import time
+import logging
+import argparse
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.crop_service import FEATURES, top_k
+from backend.services.inference_engine import LAYERS, NumpyEngine, softmax
+from backend.services.model_registry import ModelArtifacts
+
+
+logger = logging.getLogger(__name__)
+
+# Offsets of packed arrays are aligned to a cache line
+ALIGNMENT = 64
+
+# Thread pools of the BLAS libraries NumPy may be linked against; one
+# thread per worker process keeps N workers from running N x cores threads
+BLAS_THREAD_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "VECLIB_MAXIMUM_THREADS")
+
+# (shared memory name, [(array name, dtype, shape, offset), ...])
+ArraySpec = Tuple[str, List[Tuple[str, str, Tuple[int, ...], int]]]
+
+
+def pack_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[SharedMemory, ArraySpec]:
+    """
+    Copy named arrays into one new shared memory block.
+
+    Returns:
+        Tuple of (block, picklable spec for attach_arrays)
+    """
+    layout, size = [], 0
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        layout.append((name, array.dtype.str, array.shape, size))
+        size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    block = SharedMemory(create=True, size=max(size, 1))
+    for (name, dtype, shape, offset), array in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = array
+    return block, (block.name, layout)
+
+
+def attach_arrays(spec: ArraySpec) -> Tuple[SharedMemory, Dict[str, np.ndarray]]:
+    """
+    Map a block created by pack_arrays.
+
+    Returns:
+        Tuple of (block, name -> array view); the views are valid while the block is open
+    """
+    block = SharedMemory(name=spec[0])
+    return block, _views(block, spec)
+
+
+def _views(block: SharedMemory, spec: ArraySpec) -> Dict[str, np.ndarray]:
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        for name, dtype, shape, offset in spec[1]
+    }
+
+
+@contextmanager
+def _single_threaded_blas():
+    """Start processes with one BLAS thread each, leaving this process's environment unchanged"""
+    saved = {name: os.environ.get(name) for name in BLAS_THREAD_VARS}
+    os.environ.update({name: "1" for name in BLAS_THREAD_VARS})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+# ============================================================================
+# WORKER PROCESSES
+# ============================================================================
+
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(model_spec: ArraySpec, folded: bool, fingerprint: str, io_spec: ArraySpec):
+    model_block, weights = attach_arrays(model_spec)
+    io_block, buffers = attach_arrays(io_spec)
+
+    engine = NumpyEngine.from_layers((weights[f"{layer}.weight"], weights[f"{layer}.bias"]) for layer in LAYERS)
+    artifacts = ModelArtifacts(engine, weights.get("mean"), weights.get("std"), None, fingerprint, folded)
+
+    # The blocks must stay open as long as the views into them are used
+    _worker.update(blocks=(model_block, io_block), artifacts=artifacts, **buffers)
+
+
+def _score_slot(slot: int, rows: int) -> int:
+    """Score rows [0, rows) of an input slot into the matching result slot"""
+    artifacts = _worker["artifacts"]
+    indices, scores = _worker["indices"], _worker["scores"]
+
+    probabilities = softmax(artifacts.forward(_worker["inputs"][slot, :rows]), axis=1)
+    slot_indices, slot_scores = top_k(probabilities, indices.shape[2])
+    indices[slot, :rows] = slot_indices
+    scores[slot, :rows] = slot_scores * 100
+    return slot
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class SharedModelPool:
+    """
+    Process pool that scores feature matrices with one shared copy of the model.
+
+    `top_crops_arrays` and `labels` match CropService, so the pool can stand
+    in for it in batch jobs (bulk scoring, the recommendation table). The
+    pool scores the artifacts it was created with; it does not follow model
+    reloads. Calls must come from one thread at a time.
+    """
+
+    def __init__(self, artifacts: ModelArtifacts, workers: Optional[int] = None, top_n: int = 3,
+                 chunk_rows: int = 8192, slots: Optional[int] = None):
+        """
+        Args:
+            artifacts: Loaded model (either engine; torch weights are converted once)
+            workers: Worker processes (default: one per core)
+            top_n: Crops returned per row
+            chunk_rows: Rows per slot; larger matrices are split across workers
+            slots: Chunks in flight at once (default: 2 x workers)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.top_n = top_n
+        self.chunk_rows = chunk_rows
+        self.slots = slots or 2 * self.workers
+        self.labels = artifacts.labels
+        self.fingerprint = artifacts.fingerprint
+
+        engine = NumpyEngine.from_engine(artifacts.engine)
+        weights = {}
+        for layer, (weight, bias) in zip(LAYERS, engine.layers):
+            weights[f"{layer}.weight"], weights[f"{layer}.bias"] = weight, bias
+        if artifacts.mean is not None and artifacts.std is not None:
+            weights["mean"], weights["std"] = artifacts.mean, artifacts.std
+
+        self._model_block, model_spec = pack_arrays(weights)
+        self._io_block, io_spec = pack_arrays({
+            "inputs": np.zeros((self.slots, chunk_rows, len(FEATURES)), dtype=np.float32),
+            "indices": np.zeros((self.slots, chunk_rows, top_n), dtype=np.int32),
+            "scores": np.zeros((self.slots, chunk_rows, top_n), dtype=np.float32),
+        })
+        buffers = _views(self._io_block, io_spec)
+        self._inputs, self._indices, self._scores = buffers["inputs"], buffers["indices"], buffers["scores"]
+        self._free = deque(range(self.slots))
+
+        # spawn: workers start clean instead of inheriting this process's threads and model
+        context = multiprocessing.get_context("spawn")
+        with _single_threaded_blas():
+            self._pool = context.Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(model_spec, artifacts.folded, artifacts.fingerprint, io_spec)
+            )
+        logger.info("Shared model pool started (%d workers, %d slots of %d rows)",
+                    self.workers, self.slots, chunk_rows)
+
+    def map(self, matrices: Iterable[np.ndarray]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Top-N label indices and confidences of every matrix, in input order.
+
+        Matrices are cut into slot-sized chunks that are scored in parallel;
+        at most `slots` chunks are in flight, however long `matrices` is.
+
+        Args:
+            matrices: Iterable of (N, 7) feature matrices in FEATURES order
+
+        Yields:
+            Tuple of (N, top_n) label indices and (N, top_n) confidence percentages per matrix
+        """
+        pending = deque()  # (slot or None, async result, rows, last chunk of its matrix)
+        parts: List[Tuple[np.ndarray, np.ndarray]] = []
+        try:
+            for matrix in matrices:
+                matrix = np.asarray(matrix, dtype=np.float32).reshape(-1, len(FEATURES))
+                if not len(matrix):
+                    pending.append((None, None, 0, True))
+                    continue
+
+                for start in range(0, len(matrix), self.chunk_rows):
+                    chunk = matrix[start:start + self.chunk_rows]
+                    while not self._free:
+                        result = self._collect(pending.popleft(), parts)
+                        if result is not None:
+                            yield result
+
+                    slot = self._free.popleft()
+                    self._inputs[slot, :len(chunk)] = chunk
+                    pending.append((
+                        slot, self._pool.apply_async(_score_slot, (slot, len(chunk))), len(chunk),
+                        start + self.chunk_rows >= len(matrix)
+                    ))
+
+            while pending:
+                result = self._collect(pending.popleft(), parts)
+                if result is not None:
+                    yield result
+        finally:
+            # Abandoned or failed: wait for chunks still being scored before their slots are reused
+            for slot, async_result, _, _ in pending:
+                if slot is not None:
+                    async_result.wait()
+                    self._free.append(slot)
+
+    def _collect(self, entry, parts: List[Tuple[np.ndarray, np.ndarray]]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Copy one finished chunk out of its slot; return the matrix result after its last chunk"""
+        slot, async_result, rows, last = entry
+        if slot is not None:
+            try:
+                async_result.get()
+                parts.append((self._indices[slot, :rows].copy(), self._scores[slot, :rows].copy()))
+            finally:
+                self._free.append(slot)
+        if not last:
+            return None
+
+        if parts:
+            result = np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+        else:
+            result = np.empty((0, self.top_n), dtype=np.int32), np.empty((0, self.top_n), dtype=np.float32)
+        parts.clear()
+        return result
+
+    def top_crops_arrays(self, matrix, top_n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CropService.top_crops_arrays, scored across the pool.
+
+        Raises:
+            ValueError: If more crops are requested than the pool was created for
+        """
+        top_n = top_n or self.top_n
+        if top_n > self.top_n:
+            raise ValueError(f"Pool returns at most {self.top_n} crops per row, {top_n} requested")
+        indices, scores = next(self.map([matrix]))
+        return indices[:, :top_n], scores[:, :top_n]
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        self._pool.close()
+        self._pool.join()
+        self._inputs = self._indices = self._scores = None
+        for block in (self._io_block, self._model_block):
+            block.close()
+            block.unlink()
+
+    def __enter__(self) -> "SharedModelPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_shared_model_pool(workers: Optional[int] = None, top_n: int = 3, chunk_rows: int = 8192) -> SharedModelPool:
+    """Factory function to create a SharedModelPool over the currently loaded model"""
+    from backend.services.model_registry import get_model_registry
+
+    return SharedModelPool(get_model_registry().get(), workers, top_n, chunk_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure shared-memory pool throughput on the current model")
+    parser.add_argument("--rows", type=int, default=1000000, help="feature rows to score")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    parser.add_argument("--chunk-rows", type=int, default=8192)
+    args = parser.parse_args()
+
+    from backend.services.crop_service import get_crop_service
+
+    rng = np.random.default_rng(0)
+    matrix = np.column_stack([
+        rng.uniform(0, 140, args.rows), rng.uniform(5, 145, args.rows), rng.uniform(5, 205, args.rows),
+        rng.uniform(10, 40, args.rows), rng.uniform(20, 95, args.rows), rng.uniform(4.5, 8.5, args.rows),
+        rng.uniform(20, 300, args.rows),
+    ]).astype(np.float32)
+
+    crop_service = get_crop_service()
+    started = time.perf_counter()
+    expected, _ = crop_service.top_crops_arrays(matrix)
+    baseline = time.perf_counter() - started
+    print(f"✓ in-process   {args.rows / baseline:>12,.0f} rows/s")
+
+    for workers in args.workers:
+        with get_shared_model_pool(workers, chunk_rows=args.chunk_rows) as pool:
+            pool.top_crops_arrays(matrix[:workers * args.chunk_rows])  # warm up every worker
+            started = time.perf_counter()
+            indices, _ = pool.top_crops_arrays(matrix)
+            elapsed = time.perf_counter() - started
+        agreement = float((indices[:, 0] == expected[:, 0]).mean())
+        print(f"✓ {workers:>3} worker(s) {args.rows / elapsed:>12,.0f} rows/s "
+              f"({baseline / elapsed:.2f}x, top-1 agreement {agreement:.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,14 @@
 Soil Service - Provides default soil values by district
 """
 
-import pandas as pd
-import os
+import logging
 from typing import Optional, Dict
 
+from backend.services.rainfall_store import get_rainfall_store
+
+
+logger = logging.getLogger(__name__)
+
 
 class SoilService:
     """Service to fetch and provide default soil values"""
@@ -25,6 +29,7 @@ class SoilService:
     def __init__(self):
         """Initialize soil service"""
         self.soil_values = self.DEFAULT_SOIL_VALUES
+        self.rainfall_store = get_rainfall_store()
     
     def get_default_soil_values(self, district: str) -> Dict[str, float]:
         """
@@ -41,7 +46,7 @@ class SoilService:
             return self.soil_values[district].copy()
         
         # If not found, return general default values
-        print(f"⚠ No specific soil data for {district}, using default values")
+        logger.debug("No specific soil data for %s, using default values", district)
         return {
             "nitrogen": 90,
             "phosphorous": 40,
@@ -62,24 +67,19 @@ class SoilService:
             Rainfall in mm
         """
         try:
-            rainfall_file = "data/district wise rainfall normal.csv"
-            
-            if not os.path.exists(rainfall_file):
-                print(f"⚠ Rainfall file not found at {rainfall_file}")
+            if not self.rainfall_store.available:
                 return 100.0  # Default rainfall
             
-            df = pd.read_csv(rainfall_file)
-            row = df[(df['STATE_UT_NAME'] == state) & (df['DISTRICT'] == district)]
+            rainfall = self.rainfall_store.lookup(state, district, month)
             
-            if row.empty:
-                print(f"⚠ No rainfall data for {state}, {district}")
+            if rainfall is None:
+                logger.warning("No rainfall data for %s, %s", state, district)
                 return 100.0  # Default rainfall
             
-            rainfall = row[month].values[0]
-            return float(rainfall)
+            return rainfall
             
         except Exception as e:
-            print(f"⚠ Error fetching rainfall data: {str(e)}")
+            logger.warning("Error fetching rainfall data: %s", e)
             return 100.0  # Default rainfall
 
 
@@ -3,23 +3,96 @@ Weather Service - Fetches temperature, humidity from OpenWeatherMap API
 """
 
 import os
+import asyncio
+import logging
+import httpx
 import requests
 from typing import Tuple, Optional
 
+from backend.utils.cache import TTLCache
+from backend.utils.metrics import REGISTRY
+
+
+logger = logging.getLogger(__name__)
+
+OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+MOCK_WEATHER_URL = "http://127.0.0.1:8090/data/2.5/weather"
+
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "weather_upstream_errors_total",
+    "Failed weather API calls by reason (connection, status, format)",
+    ("reason",),
+)
+
 
 class WeatherService:
     """Service to fetch weather data from OpenWeatherMap API"""
     
-    def __init__(self):
-        self.api_key = os.getenv('OPENWEATHER_API_KEY')
-        self.base_url = "https://api.openweathermap.org/data/2.5/weather"
+    def __init__(self, cache_ttl: float = 600.0, cache_size: int = 2048,
+                 timeout: float = 5.0, max_connections: int = 20, max_concurrency: int = 10,
+                 api_key: Optional[str] = None, base_url: Optional[str] = None):
+        """
+        Args:
+            cache_ttl: Seconds a fetched observation is reused for
+            cache_size: Maximum number of cached districts (LRU eviction)
+            timeout: Upstream request timeout in seconds
+            max_connections: Size of the keep-alive connection pool
+            max_concurrency: Maximum number of upstream requests in flight
+            api_key: API key (defaults to OPENWEATHER_API_KEY)
+            base_url: Weather endpoint (defaults to OPENWEATHER_BASE_URL, then OpenWeatherMap)
+        """
+        self.api_key = api_key or os.getenv('OPENWEATHER_API_KEY')
+        self.base_url = base_url or os.getenv('OPENWEATHER_BASE_URL', OPENWEATHER_URL)
         
+        # Only the real OpenWeatherMap needs a key; stand-in servers accept any
         if not self.api_key:
-            raise ValueError("OPENWEATHER_API_KEY not found in .env file")
+            if self.base_url == OPENWEATHER_URL:
+                raise ValueError("OPENWEATHER_API_KEY not found in .env file")
+            self.api_key = "none"
+        
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.session = requests.Session()
+        
+        # Created lazily inside the running event loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled async HTTP client"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+    
+    async def aclose(self):
+        """Close the async HTTP client and its pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.session.close()
+    
+    @staticmethod
+    def cache_key(district: str, state: Optional[str] = None) -> Tuple[str, str]:
+        """Normalized (district, state) cache key"""
+        return (" ".join(district.split()).upper(), " ".join((state or "").split()).upper())
     
     def get_weather_data(self, district: str, state: Optional[str] = None) -> Tuple[float, float]:
         """
-        Fetch temperature and humidity for a given district.
+        Get temperature and humidity for a given district.
+        
+        Observations are cached per (district, state) for `cache_ttl` seconds.
+        Concurrent misses for the same district share one upstream call.
         
         Args:
             district: District name
@@ -31,38 +104,145 @@ class WeatherService:
         Raises:
             Exception: If API call fails
         """
-        try:
-            # Construct query
-            query = f"{district}, {state}" if state else district
-            
-            params = {
-                "q": query,
-                "appid": self.api_key,
-                "units": "metric"  # Get temperature in Celsius
-            }
-            
-            response = requests.get(self.base_url, params=params, timeout=5)
-            
-            if response.status_code != 200:
-                raise Exception(
-                    f"Weather API error for {district}: {response.json().get('message', 'Unknown error')}"
-                )
+        return self.cache.get_or_load(
+            self.cache_key(district, state),
+            lambda: self.fetch_weather_data(district, state)
+        )
+    
+    async def get_weather_data_async(self, district: str, state: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Async version of get_weather_data that never blocks the event loop.
+        
+        Shares the cache with get_weather_data; concurrent misses for the same
+        district await one upstream call.
+        
+        Args:
+            district: District name
+            state: State name (optional)
             
-            data = response.json()
+        Returns:
+            Tuple of (temperature in Celsius, humidity in percentage)
             
+        Raises:
+            Exception: If API call fails
+        """
+        return await self.cache.get_or_load_async(
+            self.cache_key(district, state),
+            lambda: self.fetch_weather_data_async(district, state)
+        )
+    
+    def _params(self, district: str, state: Optional[str]) -> dict:
+        # Construct query
+        query = f"{district}, {state}" if state else district
+        return {
+            "q": query,
+            "appid": self.api_key,
+            "units": "metric"  # Get temperature in Celsius
+        }
+    
+    @staticmethod
+    def _parse(district: str, status_code: int, data: dict) -> Tuple[float, float]:
+        """Extract (temperature, humidity) from an OpenWeatherMap response body"""
+        if status_code != 200:
+            UPSTREAM_ERRORS.inc(reason="status")
+            raise Exception(
+                f"Weather API error for {district}: {data.get('message', 'Unknown error')}"
+            )
+        
+        try:
             # Extract temperature and humidity
             temperature = data['main']['temp']
             humidity = data['main']['humidity']
+        except KeyError as e:
+            UPSTREAM_ERRORS.inc(reason="format")
+            raise Exception(f"Invalid response format from Weather API: {str(e)}")
+        
+        logger.debug("Weather data fetched for %s", district)
+        return temperature, humidity
+    
+    @staticmethod
+    def _json(response) -> dict:
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+    
+    async def fetch_weather_data_async(self, district: str, state: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Fetch temperature and humidity over the pooled async client, bypassing the cache.
+        
+        At most `max_concurrency` upstream requests run at once; the rest wait
+        without blocking other requests on the worker.
+        """
+        client = self.client
+        try:
+            async with self._semaphore:
+                response = await client.get(self.base_url, params=self._params(district, state))
+        except httpx.HTTPError as e:
+            UPSTREAM_ERRORS.inc(reason="connection")
+            raise Exception(f"Weather API connection error: {str(e)}")
+        
+        return self._parse(district, response.status_code, self._json(response))
+    
+    def fetch_weather_data(self, district: str, state: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Fetch temperature and humidity for a given district, bypassing the cache.
+        
+        Args:
+            district: District name
+            state: State name (optional)
             
-            print(f"✓ Weather data fetched for {district}")
-            return temperature, humidity
+        Returns:
+            Tuple of (temperature in Celsius, humidity in percentage)
             
+        Raises:
+            Exception: If API call fails
+        """
+        try:
+            response = self.session.get(self.base_url, params=self._params(district, state), timeout=self.timeout)
         except requests.RequestException as e:
+            UPSTREAM_ERRORS.inc(reason="connection")
             raise Exception(f"Weather API connection error: {str(e)}")
-        except KeyError as e:
-            raise Exception(f"Invalid response format from Weather API: {str(e)}")
+        
+        return self._parse(district, response.status_code, self._json(response))
 
 
-def get_weather_service() -> WeatherService:
-    """Factory function to create WeatherService instance"""
-    return WeatherService()
+def get_weather_service():
+    """
+    Factory function to create the configured weather backend.
+    
+    WEATHER_BACKEND selects the provider:
+    - openweather (default): OpenWeatherMap (or OPENWEATHER_BASE_URL)
+    - snapshot: a prefetched snapshot file (WEATHER_SNAPSHOT_PATH, or the
+      newest one in WEATHER_SNAPSHOT_DIR)
+    - mock: the bundled mock server (backend/mock_weather_server.py) at
+      MOCK_WEATHER_URL, no API key needed
+    """
+    backend = os.getenv("WEATHER_BACKEND", "openweather").lower()
+    
+    if backend == "snapshot":
+        from backend.services.weather_snapshot import SnapshotWeatherService, SNAPSHOT_DIR, latest_snapshot
+        
+        path = os.getenv("WEATHER_SNAPSHOT_PATH") or latest_snapshot(os.getenv("WEATHER_SNAPSHOT_DIR", SNAPSHOT_DIR))
+        if not path:
+            raise ValueError("WEATHER_BACKEND=snapshot but no weather snapshot was found")
+        return SnapshotWeatherService(path)
+    
+    if backend == "mock":
+        base_url = os.getenv("MOCK_WEATHER_URL", MOCK_WEATHER_URL)
+        api_key = "mock"
+    elif backend == "openweather":
+        base_url = None
+        api_key = None
+    else:
+        raise ValueError(f"Unknown WEATHER_BACKEND '{backend}', expected openweather, snapshot or mock")
+    
+    return WeatherService(
+        cache_ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+        cache_size=int(os.getenv("WEATHER_CACHE_SIZE", "2048")),
+        timeout=float(os.getenv("WEATHER_TIMEOUT", "5")),
+        max_connections=int(os.getenv("WEATHER_MAX_CONNECTIONS", "20")),
+        max_concurrency=int(os.getenv("WEATHER_MAX_CONCURRENCY", "10")),
+        api_key=api_key,
+        base_url=base_url,
+    )
@@ -0,0 +1,219 @@
+"""
+Weather Snapshot - Bulk weather prefetch and an offline snapshot backend
+"""
+
+import os
+import glob
+import time
+import logging
+import asyncio
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "data/weather_snapshots"
+SNAPSHOT_PREFIX = "weather_snapshot_"
+
+
+def _key(district: str, state: Optional[str] = None) -> Tuple[str, str]:
+    """Normalized (district, state) key, same normalization as WeatherService.cache_key"""
+    return (" ".join(district.split()).upper(), " ".join((state or "").split()).upper())
+
+
+class RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per second, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def prefetch_weather(weather_service, locations: Sequence[Tuple[str, str]],
+                           concurrency: int = 10, rate: float = 50.0) -> Dict[str, np.ndarray]:
+    """
+    Fetch current weather for many districts concurrently.
+
+    Args:
+        weather_service: WeatherService whose pooled async client is used
+        locations: (state, district) pairs
+        concurrency: Maximum number of requests in flight
+        rate: Maximum requests per second (0 disables rate limiting)
+
+    Returns:
+        Columnar arrays: state, district, temperature, humidity (NaN on failure)
+    """
+    limiter = RateLimiter(rate, burst=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    temperature = np.full(len(locations), np.nan, dtype=np.float32)
+    humidity = np.full(len(locations), np.nan, dtype=np.float32)
+
+    async def fetch(index: int, state: str, district: str):
+        async with semaphore:
+            await limiter.acquire()
+            try:
+                temperature[index], humidity[index] = await weather_service.fetch_weather_data_async(district, state)
+            except Exception as e:
+                logger.warning("Weather prefetch failed for %s, %s: %s", district, state, e)
+
+    await asyncio.gather(*(fetch(i, state, district) for i, (state, district) in enumerate(locations)))
+
+    return {
+        "state": np.array([state for state, _ in locations], dtype=str),
+        "district": np.array([district for _, district in locations], dtype=str),
+        "temperature": temperature,
+        "humidity": humidity,
+    }
+
+
+def write_snapshot(columns: Dict[str, np.ndarray], out_dir: str = SNAPSHOT_DIR,
+                   fetched_at: Optional[datetime] = None) -> str:
+    """
+    Write prefetched weather to a timestamped, compressed columnar .npz file.
+
+    Args:
+        columns: Output of prefetch_weather
+        out_dir: Snapshot directory
+        fetched_at: Snapshot time (defaults to now, UTC)
+
+    Returns:
+        Path of the written snapshot
+    """
+    fetched_at = fetched_at or datetime.now(timezone.utc)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{SNAPSHOT_PREFIX}{fetched_at.strftime('%Y%m%dT%H%M%SZ')}.npz")
+
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(tmp_path, fetched_at=np.array(fetched_at.isoformat()), **columns)
+    os.replace(tmp_path, path)
+    return path
+
+
+def latest_snapshot(snapshot_dir: str = SNAPSHOT_DIR) -> Optional[str]:
+    """Newest snapshot in a directory (timestamped names sort chronologically)"""
+    paths = sorted(
+        p for p in glob.glob(os.path.join(snapshot_dir, f"{SNAPSHOT_PREFIX}*.npz"))
+        if not p.endswith(".tmp.npz")
+    )
+    return paths[-1] if paths else None
+
+
+class SnapshotWeatherService:
+    """
+    Serves get_weather_data from a snapshot file instead of the network.
+
+    Lookups are a dict hit on the normalized (district, state); a district
+    queried without a state matches if the name is unique in the snapshot.
+    Batch scoring against a fixed snapshot is reproducible.
+    """
+
+    cache = None
+
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+
+        with np.load(snapshot_path) as snapshot:
+            self.fetched_at = str(snapshot["fetched_at"])
+            states = snapshot["state"].tolist()
+            districts = snapshot["district"].tolist()
+            temperature = snapshot["temperature"].tolist()
+            humidity = snapshot["humidity"].tolist()
+
+        self.observations: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        by_district: Dict[str, List[Tuple[float, float]]] = {}
+        for state, district, temp, hum in zip(states, districts, temperature, humidity):
+            if np.isnan(temp) or np.isnan(hum):
+                continue
+            self.observations[_key(district, state)] = (temp, hum)
+            by_district.setdefault(_key(district)[0], []).append((temp, hum))
+
+        for district, values in by_district.items():
+            if len(values) == 1:
+                self.observations.setdefault((district, ""), values[0])
+
+        logger.info("Weather snapshot loaded (%d entries, %s)", len(self.observations), self.fetched_at)
+
+    def get_weather_data(self, district: str, state: Optional[str] = None) -> Tuple[float, float]:
+        """
+        Get temperature and humidity for a district from the snapshot.
+
+        Args:
+            district: District name
+            state: State name (optional)
+
+        Returns:
+            Tuple of (temperature in Celsius, humidity in percentage)
+
+        Raises:
+            Exception: If the district is not in the snapshot
+        """
+        observation = self.observations.get(_key(district, state))
+        if observation is None:
+            raise Exception(f"No weather for {district} in snapshot {os.path.basename(self.snapshot_path)}")
+        return observation
+
+    async def get_weather_data_async(self, district: str, state: Optional[str] = None) -> Tuple[float, float]:
+        """Async wrapper so the snapshot can stand in for WeatherService"""
+        return self.get_weather_data(district, state)
+
+    async def aclose(self):
+        """Nothing to close; the snapshot is fully in memory"""
+
+
+def main():
+    """Prefetch weather for every district in the rainfall dataset"""
+    from backend.services.rainfall_store import get_rainfall_store
+    from backend.services.weather_service import WeatherService
+
+    parser = argparse.ArgumentParser(description="Write a weather snapshot for all catalog districts")
+    parser.add_argument("--out-dir", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight")
+    parser.add_argument("--rate", type=float, default=50.0, help="maximum requests per second (0 = unlimited)")
+    parser.add_argument("--base-url", default=None, help="weather endpoint (e.g. the mock server)")
+    args = parser.parse_args()
+
+    store = get_rainfall_store()
+    if not store.available:
+        raise SystemExit(f"Rainfall file not found at {store.path}")
+    locations = [(state, district) for state in store.states() for district in store.districts(state)]
+
+    async def run():
+        weather_service = WeatherService(
+            max_connections=args.concurrency, max_concurrency=args.concurrency, base_url=args.base_url
+        )
+        try:
+            return await prefetch_weather(weather_service, locations, args.concurrency, args.rate)
+        finally:
+            await weather_service.aclose()
+
+    started = time.perf_counter()
+    columns = asyncio.run(run())
+    path = write_snapshot(columns, args.out_dir)
+
+    fetched = int(np.count_nonzero(~np.isnan(columns["temperature"])))
+    print(f"✓ {fetched}/{len(locations)} districts in {time.perf_counter() - started:.1f}s -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+In-process TTL + LRU cache with single-flight loading
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """One in-progress load that concurrent callers wait on"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+def _retrieve_exception(future: asyncio.Future):
+    """Mark a failed load as observed even if every waiter went away"""
+    if not future.cancelled():
+        future.exception()
+
+
+class TTLCache:
+    """
+    Bounded cache whose entries expire after `ttl` seconds.
+
+    When the cache is full the least recently used entry is evicted.
+    `get_or_load` (threads) and `get_or_load_async` (coroutines) make sure
+    concurrent misses for the same key run the loader once: the first caller
+    loads, the others wait for its result. Failed loads are not cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Entry lifetime in seconds
+            clock: Monotonic time source (injectable for tests and benchmarks)
+        """
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self.clock = clock
+
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._async_inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _lookup(self, key: Hashable):
+        """Return (found, value); must be called with the lock held"""
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh cached value, or `default`"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace an entry, evicting the least recently used one if full"""
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: Hashable, value: Any):
+        self._data[key] = (self.clock() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, calling `loader()` on a miss.
+
+        Only one caller runs the loader per key at a time; concurrent callers
+        for the same key block until it finishes and share its result or error.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self.loads += 1
+            with self._lock:
+                self._store(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Coroutine version of `get_or_load`.
+
+        Concurrent coroutines missing the same key await a single
+        `loader()` call and share its result or error. The load runs as its
+        own task, so a cancelled caller does not cancel it for the others.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        flight = self._async_inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._load_async(key, loader))
+            self._async_inflight[key] = flight
+            flight.add_done_callback(_retrieve_exception)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(flight)
+
+    async def _load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await loader()
+            self.loads += 1
+            with self._lock:
+                self._store(key, value)
+            return value
+        finally:
+            self._async_inflight.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+        }
@@ -2,10 +2,67 @@
 Utility functions for the crop advisory system
 """
 
-from typing import Dict, Tuple
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
+import numpy as np
 
-def calculate_risk_level(rainfall: float, temperature: float, humidity: float) -> Tuple[str, str]:
+
+RISK_LEVELS = ("Low Risk", "Medium Risk", "High Risk")
+
+# Accepted (min, max) of each soil test value, inclusive
+SOIL_RANGES = {
+    "nitrogen": (0, 140),
+    "phosphorous": (0, 145),
+    "potassium": (0, 205),
+    "ph": (0, 14),
+}
+
+
+class _RiskThresholds(NamedTuple):
+    low_rainfall: float = 50.0  # mm
+    high_rainfall: float = 200.0  # mm
+    min_temperature: float = 15.0  # Celsius
+    max_temperature: float = 35.0  # Celsius
+    min_humidity: float = 40.0  # percentage
+    max_humidity: float = 80.0  # percentage
+    medium_score: int = 3
+    high_score: int = 5
+
+
+class RiskThresholds(_RiskThresholds):
+    """
+    Weather limits and score cut-offs used by the risk assessment
+    
+    Raises:
+        ValueError: If a lower limit or cut-off is above its upper counterpart
+    """
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls, *args, **kwargs)
+        for low, high in (("low_rainfall", "high_rainfall"), ("min_temperature", "max_temperature"),
+                          ("min_humidity", "max_humidity"), ("medium_score", "high_score")):
+            if getattr(self, low) > getattr(self, high):
+                raise ValueError(f"{low} ({getattr(self, low)}) is above {high} ({getattr(self, high)})")
+        return self
+
+
+DEFAULT_RISK_THRESHOLDS = RiskThresholds()
+
+
+class RiskAssessment(NamedTuple):
+    """Batch risk result: one entry per input row"""
+    scores: np.ndarray  # int8 risk scores
+    levels: np.ndarray  # int8 indexes into RISK_LEVELS
+    descriptions: Optional[List[str]]
+
+    def level_names(self) -> List[str]:
+        return [RISK_LEVELS[level] for level in self.levels]
+
+
+def calculate_risk_level(rainfall: float, temperature: float, humidity: float,
+                         thresholds: RiskThresholds = DEFAULT_RISK_THRESHOLDS) -> Tuple[str, str]:
     """
     Calculate risk level based on weather conditions.
     
@@ -13,60 +70,106 @@ def calculate_risk_level(rainfall: float, temperature: float, humidity: float) -
         rainfall: Rainfall in mm
         temperature: Temperature in Celsius
         humidity: Humidity percentage
+        thresholds: Weather limits and score cut-offs
         
     Returns:
         Tuple of (risk_level, description)
     """
-    
-    # Risk thresholds
-    LOW_RAINFALL_THRESHOLD = 50  # mm
-    HIGH_RAINFALL_THRESHOLD = 200  # mm
-    
-    MIN_TEMP = 15  # Celsius
-    MAX_TEMP = 35  # Celsius
-    
-    OPTIMAL_HUMIDITY = 60  # percentage
-    
     risk_score = 0
     factors = []
     
     # Assess rainfall
-    if rainfall < LOW_RAINFALL_THRESHOLD:
+    if rainfall < thresholds.low_rainfall:
         risk_score += 3
         factors.append(f"Low rainfall ({rainfall}mm)")
-    elif rainfall > HIGH_RAINFALL_THRESHOLD:
+    elif rainfall > thresholds.high_rainfall:
         risk_score += 1
         factors.append(f"High rainfall ({rainfall}mm)")
     else:
         factors.append(f"Moderate rainfall ({rainfall}mm)")
     
     # Assess temperature
-    if temperature < MIN_TEMP or temperature > MAX_TEMP:
+    if temperature < thresholds.min_temperature or temperature > thresholds.max_temperature:
         risk_score += 2
         factors.append(f"Temperature out of range ({temperature}°C)")
     else:
         factors.append(f"Optimal temperature ({temperature}°C)")
     
     # Assess humidity
-    if humidity < 40 or humidity > 80:
+    if humidity < thresholds.min_humidity or humidity > thresholds.max_humidity:
         risk_score += 1
         factors.append(f"Humidity out of range ({humidity}%)")
     else:
         factors.append(f"Adequate humidity ({humidity}%)")
     
     # Determine risk level
-    if risk_score >= 5:
-        risk_level = "High Risk"
-    elif risk_score >= 3:
-        risk_level = "Medium Risk"
+    if risk_score >= thresholds.high_score:
+        risk_level = RISK_LEVELS[2]
+    elif risk_score >= thresholds.medium_score:
+        risk_level = RISK_LEVELS[1]
     else:
-        risk_level = "Low Risk"
+        risk_level = RISK_LEVELS[0]
     
     description = ", ".join(factors)
     
     return risk_level, description
 
 
+def calculate_risk_level_batch(rainfall, temperature, humidity,
+                               thresholds: RiskThresholds = DEFAULT_RISK_THRESHOLDS,
+                               describe: bool = False) -> RiskAssessment:
+    """
+    Vectorized `calculate_risk_level` over arrays of weather conditions.
+    
+    Scores and levels come from whole-array comparisons, so a full
+    district x month grid is scored in one pass; the per-row description
+    strings are only built when `describe` is set.
+    
+    Args:
+        rainfall: Rainfall in mm, array-like of shape (N,) or a scalar
+        temperature: Temperature in Celsius, shape (N,) or a scalar
+        humidity: Humidity percentage, shape (N,) or a scalar
+        thresholds: Weather limits and score cut-offs
+        describe: Also build the description of every row
+        
+    Returns:
+        RiskAssessment with the same levels and descriptions as calculate_risk_level row by row
+    """
+    if describe:
+        # Descriptions show each value as given (an int stays "0mm", not "0.0mm")
+        given = [values if isinstance(values, (list, tuple)) else list(np.atleast_1d(values))
+                 for values in (rainfall, temperature, humidity)]
+    
+    rainfall = np.atleast_1d(np.asarray(rainfall, dtype=np.float64))
+    temperature = np.atleast_1d(np.asarray(temperature, dtype=np.float64))
+    humidity = np.atleast_1d(np.asarray(humidity, dtype=np.float64))
+    
+    low_rain = rainfall < thresholds.low_rainfall
+    high_rain = ~low_rain & (rainfall > thresholds.high_rainfall)
+    bad_temperature = (temperature < thresholds.min_temperature) | (temperature > thresholds.max_temperature)
+    bad_humidity = (humidity < thresholds.min_humidity) | (humidity > thresholds.max_humidity)
+    
+    scores = (3 * low_rain + high_rain + 2 * bad_temperature + bad_humidity).astype(np.int8)
+    levels = (scores >= thresholds.medium_score).astype(np.int8) + (scores >= thresholds.high_score)
+    
+    descriptions = None
+    if describe:
+        # Scalars broadcast against arrays, as in the comparisons above
+        given = [values * len(scores) if len(values) == 1 else values for values in given]
+        rain_labels = np.where(low_rain, "Low", np.where(high_rain, "High", "Moderate"))
+        rain_labels, bad_temperature, bad_humidity = np.broadcast_arrays(rain_labels, bad_temperature, bad_humidity)
+        descriptions = [
+            f"{rain_label} rainfall ({r}mm), "
+            + (f"Temperature out of range ({t}°C), " if bad_t else f"Optimal temperature ({t}°C), ")
+            + (f"Humidity out of range ({h}%)" if bad_h else f"Adequate humidity ({h}%)")
+            for rain_label, r, t, h, bad_t, bad_h in zip(
+                rain_labels, *given, bad_temperature.tolist(), bad_humidity.tolist()
+            )
+        ]
+    
+    return RiskAssessment(scores, levels, descriptions)
+
+
 def validate_soil_values(nitrogen: float, phosphorous: float, 
                         potassium: float, ph: float) -> Dict[str, bool]:
     """
@@ -82,14 +185,11 @@ def validate_soil_values(nitrogen: float, phosphorous: float,
         Dictionary with validation  results
     """
     
+    values = {"nitrogen": nitrogen, "phosphorous": phosphorous, "potassium": potassium, "ph": ph}
     validation = {
-        "nitrogen_valid": 0 <= nitrogen <= 140,
-        "phosphorous_valid": 0 <= phosphorous <= 145,
-        "potassium_valid": 0 <= potassium <= 205,
-        "ph_valid": 0 <= ph <= 14,
-        "all_valid": True
+        f"{name}_valid": low <= values[name] <= high
+        for name, (low, high) in SOIL_RANGES.items()
     }
-    
     validation["all_valid"] = all([
         validation["nitrogen_valid"],
         validation["phosphorous_valid"],
@@ -159,3 +259,134 @@ def get_season_name(month: str, language: str = "en") -> str:
         "DEC": {"en": "Winter", "hi": "सर्दी", "mr": "हिवाळ"},
     }
     return season_map.get(month.upper(), {}).get(language, "Unknown")
+
+
+def feature_row(item, features: Sequence[str]) -> List[float]:
+    """
+    Convert one batch item to a feature row.
+    
+    Args:
+        item: Either an object with one key per feature or a list in feature order
+        features: Feature names in model input order
+        
+    Returns:
+        List of floats in feature order
+        
+    Raises:
+        ValueError: If the item is missing a feature or is not numeric
+    """
+    if isinstance(item, dict):
+        try:
+            return [float(item[name]) for name in features]
+        except KeyError as e:
+            raise ValueError(f"Missing feature {e}")
+        except (TypeError, ValueError):
+            raise ValueError(f"Non-numeric feature value in {item}")
+    
+    if isinstance(item, (list, tuple)) and len(item) == len(features):
+        try:
+            return [float(value) for value in item]
+        except (TypeError, ValueError):
+            raise ValueError(f"Non-numeric feature value in {item}")
+    
+    raise ValueError(f"Expected an object or a list of {len(features)} values")
+
+
+def parse_feature_rows(body: bytes, content_type: str, features: Sequence[str]) -> np.ndarray:
+    """
+    Parse a batch request body into an (N, len(features)) float32 matrix.
+    
+    Args:
+        body: Raw request body, either a JSON array or NDJSON (one item per line)
+        content_type: Request Content-Type header
+        features: Feature names in model input order
+        
+    Returns:
+        Feature matrix with one row per item
+        
+    Raises:
+        ValueError: If the body or any item is malformed
+    """
+    text = body.decode("utf-8").strip()
+    if not text:
+        return np.empty((0, len(features)), dtype=np.float32)
+    
+    items = None
+    if "ndjson" not in content_type and "jsonlines" not in content_type:
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError:
+            items = None  # not a single JSON document, try NDJSON
+        if isinstance(items, dict):
+            items = [items]
+    
+    if items is None:
+        items = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_number}: {e.msg}")
+    elif not isinstance(items, list):
+        raise ValueError("Expected a JSON array or NDJSON body")
+    
+    rows = []
+    for index, item in enumerate(items):
+        try:
+            rows.append(feature_row(item, features))
+        except ValueError as e:
+            raise ValueError(f"Item {index}: {e}")
+    
+    return np.array(rows, dtype=np.float32).reshape(-1, len(features))
+
+
+def parse_quantization_steps(spec: str, features: Sequence[str], default: float = 1.0) -> Dict[str, float]:
+    """
+    Parse a "name=step,name=step" string into one rounding step per feature.
+    
+    Args:
+        spec: Comma-separated overrides, e.g. "ph=0.1,rainfall=5"
+        features: Feature names in model input order
+        default: Step for features the spec does not mention
+        
+    Returns:
+        Feature name -> step; a step of 0 keeps the exact value
+        
+    Raises:
+        ValueError: If the spec names an unknown feature or a negative step
+    """
+    steps = {name: default for name in features}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in steps:
+            raise ValueError(f"Unknown feature '{name}' in quantization steps")
+        step = float(value)
+        if step < 0:
+            raise ValueError(f"Quantization step for '{name}' must not be negative")
+        steps[name] = step
+    return steps
+
+
+def quantize_features(values: Sequence[float], steps: Sequence[float]) -> Tuple[float, ...]:
+    """
+    Round each value to the nearest multiple of its step, for use in cache keys.
+    
+    Args:
+        values: Feature values
+        steps: Rounding step per value (0 = exact)
+        
+    Returns:
+        Tuple of rounded values; inputs within half a step of each other map to the same tuple
+    """
+    # round(..., 6) removes float noise such as 6.300000000000001 so equal buckets compare equal
+    return tuple(
+        round(round(value / step) * step, 6) if step else float(value)
+        for value, step in zip(values, steps)
+    )
@@ -0,0 +1,53 @@
+"""
+Streaming helpers for NDJSON request and response bodies
+"""
+
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = 65536) -> AsyncIterator[bytes]:
+    """
+    Split a body arriving in arbitrary chunks into lines, without buffering it whole.
+
+    Args:
+        chunks: Body chunks, e.g. Request.stream()
+        max_line_bytes: Longest accepted line
+
+    Yields:
+        Each line without its line terminator (a final unterminated line included)
+
+    Raises:
+        ValueError: If a line exceeds max_line_bytes
+    """
+    pending = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip(b"\r")
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"Line longer than {max_line_bytes} bytes")
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that keep reading the request body while responding.
+
+    Starlette's StreamingResponse watches `receive()` for a disconnect while it
+    streams, which would swallow request body chunks still being read. Here the
+    body reader owns `receive()` and sees the disconnect itself
+    (Request.stream() raises ClientDisconnect).
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
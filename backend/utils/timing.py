@@ -0,0 +1,86 @@
+"""
+Per-stage latency timing for the prediction pipeline
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Deque, Dict, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Durations of the stages of one request, in milliseconds"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a synchronous block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (time.perf_counter() - start) * 1000.0
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable` and record how long it took"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[name] = (time.perf_counter() - start) * 1000.0
+
+    def finish(self) -> Dict[str, float]:
+        """Record the total request time and return all timings"""
+        self.timings["total"] = (time.perf_counter() - self._start) * 1000.0
+        return self.timings
+
+    def server_timing(self) -> str:
+        """Timings formatted as a Server-Timing header value"""
+        return ", ".join(f"{name};dur={duration:.2f}" for name, duration in self.timings.items())
+
+
+class StageStats:
+    """Rolling latency percentiles per stage over the last `window` requests"""
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings: Dict[str, float]):
+        """Add one request's stage timings"""
+        with self._lock:
+            for name, duration in timings.items():
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples[name] = deque(maxlen=self.window)
+                samples.append(duration)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """count / p50 / p95 / p99 / max in milliseconds for every stage"""
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+        return {name: _percentiles(samples) for name, samples in snapshot.items()}
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+
+    def pick(q: float) -> float:
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))], 3)
+
+    return {
+        "count": len(samples),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(samples[-1], 3),
+    }
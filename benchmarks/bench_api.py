@@ -0,0 +1,256 @@
+"""
+End-to-end benchmark for /predict/, /chatbot/ and /districts/{state}
+
+Weather comes from the bundled mock server (backend/mock_weather_server.py),
+so runs are deterministic and never touch OpenWeatherMap. Each scenario
+reports throughput, p50/p95/p99 latency and, in-process, memory allocated
+per request. Results are written to benchmarks/results/ as JSON; compare
+two runs with `python -m benchmarks.compare OLD.json NEW.json`.
+
+Usage (from project root):
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --transport asgi --requests 5000 --concurrency 64
+    python -m benchmarks.bench_api --url http://127.0.0.1:8000   # an already running server
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.common import BackgroundServer, latency_summary, write_results
+
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+class Scenario:
+    """One endpoint under load; `request` issues the i-th request of a worker"""
+
+    name = ""
+
+    def __init__(self, locations: List[Tuple[str, str]], seed: int = 0):
+        self.locations = locations
+        self.rng = random.Random(seed)
+
+    async def request(self, client: httpx.AsyncClient, worker: int, i: int) -> httpx.Response:
+        raise NotImplementedError
+
+
+class PredictScenario(Scenario):
+    name = "predict"
+
+    async def request(self, client, worker, i):
+        state, district = self.rng.choice(self.locations)
+        return await client.post("/predict/", json={
+            "state": state,
+            "district": district,
+            "month": self.rng.choice(MONTHS),
+            "language": self.rng.choice(("en", "hi", "mr")),
+            "use_auto_values": True,
+        })
+
+
+class ChatbotScenario(Scenario):
+    """Every worker walks through complete conversations, one turn per request"""
+
+    name = "chatbot"
+
+    def __init__(self, locations, seed=0):
+        super().__init__(locations, seed)
+        self.sessions: Dict[int, Tuple[str, List[str]]] = {}
+
+    def _script(self) -> List[str]:
+        state, district = self.rng.choice(self.locations)
+        return ["hello", state, district, self.rng.choice(MONTHS), "No, use defaults"]
+
+    async def request(self, client, worker, i):
+        session_id, script = self.sessions.get(worker, (None, []))
+        if not script:
+            session_id, script = f"bench-{worker}-{i}", self._script()
+        message = script.pop(0)
+        self.sessions[worker] = (session_id, script)
+        return await client.post("/chatbot/", json={"message": message, "session_id": session_id})
+
+
+class DistrictsScenario(Scenario):
+    name = "districts"
+
+    async def request(self, client, worker, i):
+        state, _ = self.locations[i % len(self.locations)]
+        return await client.get(f"/districts/{state}")
+
+
+SCENARIOS = {cls.name: cls for cls in (PredictScenario, ChatbotScenario, DistrictsScenario)}
+
+
+async def discover_locations(client: httpx.AsyncClient, limit: int = 200) -> List[Tuple[str, str]]:
+    """(state, district) pairs served by the backend's own catalog"""
+    locations = []
+    states = (await client.get("/states/")).json().get("states", [])
+    for state in states:
+        response = await client.get(f"/districts/{state}")
+        if response.status_code == 200:
+            locations.extend((state, district) for district in response.json()["districts"])
+        if len(locations) >= limit:
+            break
+    return locations[:limit] or [("MAHARASHTRA", "PUNE")]
+
+
+async def run_load(client: httpx.AsyncClient, scenario: Scenario, total: int, concurrency: int) -> dict:
+    """Issue `total` requests from `concurrency` workers and time each one"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(client, worker_id, i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round((total - errors) / elapsed, 1) if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+    }
+
+
+async def measure_allocations(client: httpx.AsyncClient, scenario: Scenario, samples: int) -> dict:
+    """
+    Memory allocated per request, measured with tracemalloc (in-process only).
+
+    peak: highest traced memory above the starting point during one request.
+    retained: memory still held after all samples, divided by the sample count.
+    """
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for i in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await scenario.request(client, 0, i)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "samples": samples,
+        "peak_kib_per_request": round(sum(peaks) / len(peaks) / 1024, 2) if peaks else 0.0,
+        "retained_kib_per_request": round((retained - baseline) / max(1, samples) / 1024, 2),
+    }
+
+
+async def bench_client(client: httpx.AsyncClient, args, in_process: bool) -> dict:
+    locations = await discover_locations(client)
+    results = {}
+    for name in args.scenarios:
+        scenario = SCENARIOS[name](locations, seed=args.seed)
+
+        # Warm caches, pools and the model before timing
+        await run_load(client, scenario, args.warmup, min(args.concurrency, max(1, args.warmup)))
+
+        result = await run_load(client, scenario, args.requests, args.concurrency)
+        if in_process and args.alloc_samples:
+            result["allocations"] = await measure_allocations(client, scenario, args.alloc_samples)
+        results[name] = result
+
+        latency = result["latency"]
+        print(f"  {name:10s} {result['throughput_rps']:>9.1f} req/s  "
+              f"p50 {latency.get('p50_ms', 0):.2f} ms  p95 {latency.get('p95_ms', 0):.2f} ms  "
+              f"p99 {latency.get('p99_ms', 0):.2f} ms  errors {result['errors']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FastAPI backend end to end")
+    parser.add_argument("--transport", choices=("asgi", "http", "both"), default="both",
+                        help="asgi = in-process, http = real sockets via uvicorn")
+    parser.add_argument("--url", help="benchmark an already running server instead")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--alloc-samples", type=int, default=100, help="0 disables allocation tracking")
+    parser.add_argument("--weather-latency-ms", type=float, default=50.0, help="mock weather latency")
+    parser.add_argument("--weather-jitter-ms", type=float, default=25.0)
+    parser.add_argument("--weather-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = parser.parse_args()
+
+    results = {"config": {k: v for k, v in vars(args).items() if k != "no_save"}}
+
+    if args.url:
+        print(f"▶ {args.url}")
+
+        async def remote():
+            async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+                return await bench_client(client, args, in_process=False)
+
+        results["remote"] = asyncio.run(remote())
+    else:
+        from backend.mock_weather_server import create_app
+
+        mock = create_app(args.weather_latency_ms, args.weather_jitter_ms, args.weather_error_rate, args.seed)
+        with BackgroundServer(mock) as weather:
+            # Must be set before backend.main builds its services
+            os.environ["WEATHER_BACKEND"] = "mock"
+            os.environ["MOCK_WEATHER_URL"] = f"{weather.url}/data/2.5/weather"
+            from backend import main as backend
+            app = backend.app
+
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+            if args.transport in ("asgi", "both"):
+                print("▶ in-process (ASGI)")
+
+                async def in_process():
+                    try:
+                        async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=30) as client:
+                            return await bench_client(client, args, in_process=True)
+                    finally:
+                        # The ASGI transport skips lifespan events; release loop-bound
+                        # clients so the HTTP run can recreate them on its own loop
+                        await backend.micro_batcher.stop()
+                        await backend.weather_service.aclose()
+
+                results["asgi"] = asyncio.run(in_process())
+
+            if args.transport in ("http", "both"):
+                with BackgroundServer(app) as server:
+                    print(f"▶ over HTTP ({server.url})")
+
+                    async def over_http():
+                        async with httpx.AsyncClient(base_url=server.url, timeout=30, limits=limits) as client:
+                            return await bench_client(client, args, in_process=False)
+
+                    results["http"] = asyncio.run(over_http())
+
+    if not args.no_save:
+        print(f"✓ Results written to {write_results('api', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Micro-benchmarks for the backend's hot paths, independent of HTTP
+
+Each benchmark is run over workloads of several sizes and reports the
+time per item, so a regression in one function shows up on its own.
+
+    predict_top_crops         N single predictions, one call each
+    predict_top_crops_batch   one (N, 7) matrix
+    get_rainfall_data         N SoilService lookups
+    get_rainfall              N utils/pred_rainfall lookups
+    calculate_risk_level      N (rainfall, temperature, humidity) triples
+    calculate_risk_level_batch  the same triples as three arrays, levels only
+    get_advisory_message      N advisory messages across languages
+
+Usage (from project root):
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --filter predict --sizes 1 64 1024
+"""
+
+import random
+import timeit
+import argparse
+import statistics
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.common import write_results
+
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+RISK_LEVELS = ["Low Risk", "Medium Risk", "High Risk"]
+LANGUAGES = ["en", "hi", "mr"]
+
+
+class Benchmark:
+    """
+    A function under test plus a workload builder.
+
+    `setup(size, rng)` returns the workload for one size; `run(workload)`
+    processes all of it. Timings are divided by `size` to get per-item cost.
+    """
+
+    def __init__(self, name: str, setup: Callable, run: Callable, sizes: List[int]):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.sizes = sizes
+
+    def measure(self, size: int, rng: random.Random, repeat: int, min_time: float) -> Dict[str, float]:
+        workload = self.setup(size, rng)
+        timer = timeit.Timer(lambda: self.run(workload))
+
+        # Pick a loop count so one measurement takes at least min_time
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= min_time or number >= 1_000_000:
+                break
+            number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+        per_item = sorted(t / number / size for t in timer.repeat(repeat, number))
+        return {
+            "size": size,
+            "loops": number,
+            "min_us": round(per_item[0] * 1e6, 4),
+            "median_us": round(statistics.median(per_item) * 1e6, 4),
+            "stdev_us": round(statistics.stdev(per_item) * 1e6, 4) if len(per_item) > 1 else 0.0,
+            "items_per_sec": round(1.0 / per_item[0], 1) if per_item[0] else 0.0,
+        }
+
+
+def _rainfall_keys(store, size: int, rng: random.Random):
+    locations = [(state, district) for state in store.states() for district in store.districts(state)]
+    return [(*rng.choice(locations), rng.choice(MONTHS)) for _ in range(size)]
+
+
+def _feature_rows(size: int, rng: random.Random) -> np.ndarray:
+    """Random but plausible inputs in FEATURES order"""
+    return np.array([
+        [rng.uniform(0, 140), rng.uniform(5, 145), rng.uniform(5, 205),
+         rng.uniform(10, 40), rng.uniform(20, 95), rng.uniform(4.5, 8.5), rng.uniform(20, 300)]
+        for _ in range(size)
+    ], dtype=np.float32)
+
+
+def build_benchmarks(sizes: List[int]) -> List[Benchmark]:
+    """All benchmarks whose dependencies (model files, rainfall data) are present"""
+    from backend.services.crop_service import get_crop_service
+    from backend.services.soil_service import get_soil_service
+    from backend.services.rainfall_store import get_rainfall_store
+    from backend.services.translation_service import get_translation_service
+    from backend.utils.helpers import calculate_risk_level, calculate_risk_level_batch
+    from utils.pred_rainfall import get_rainfall
+
+    translation_service = get_translation_service()
+    benchmarks = [
+        Benchmark(
+            "calculate_risk_level",
+            lambda n, rng: [(rng.uniform(0, 400), rng.uniform(5, 45), rng.uniform(10, 100)) for _ in range(n)],
+            lambda rows: [calculate_risk_level(*row) for row in rows],
+            sizes,
+        ),
+        Benchmark(
+            "calculate_risk_level_batch",
+            lambda n, rng: tuple(
+                np.array([rng.uniform(low, high) for _ in range(n)]) for low, high in ((0, 400), (5, 45), (10, 100))
+            ),
+            lambda columns: calculate_risk_level_batch(*columns),
+            sizes,
+        ),
+        Benchmark(
+            "get_advisory_message",
+            lambda n, rng: [
+                (rng.choice(("Rice", "Maize", "Cotton")), "Pune", rng.choice(MONTHS),
+                 rng.choice(RISK_LEVELS), rng.choice(LANGUAGES))
+                for _ in range(n)
+            ],
+            lambda rows: [translation_service.get_advisory_message(*row) for row in rows],
+            sizes,
+        ),
+    ]
+
+    store = get_rainfall_store()
+    if store.available:
+        soil_service = get_soil_service()
+        benchmarks += [
+            Benchmark(
+                "get_rainfall_data",
+                lambda n, rng: _rainfall_keys(store, n, rng),
+                lambda keys: [soil_service.get_rainfall_data(*key) for key in keys],
+                sizes,
+            ),
+            Benchmark(
+                "get_rainfall",
+                lambda n, rng: _rainfall_keys(store, n, rng),
+                lambda keys: [get_rainfall(*key) for key in keys],
+                sizes,
+            ),
+        ]
+    else:
+        print(f"⚠ Rainfall file not found at {store.path}, skipping rainfall benchmarks")
+
+    try:
+        crop_service = get_crop_service()
+    except Exception as e:
+        print(f"⚠ Crop model unavailable ({str(e)}), skipping inference benchmarks")
+    else:
+        benchmarks += [
+            Benchmark(
+                "predict_top_crops",
+                _feature_rows,
+                lambda matrix: [crop_service.predict_top_crops(*map(float, row)) for row in matrix],
+                sizes,
+            ),
+            Benchmark(
+                "predict_top_crops_batch",
+                _feature_rows,
+                lambda matrix: crop_service.predict_top_crops_batch(matrix),
+                sizes,
+            ),
+        ]
+
+    return benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the backend's hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 256, 4096], help="workload sizes")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="measurements per size")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", action="store_true", help="do not write a results file")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks(args.sizes)
+
+    results: Dict[str, Dict[str, dict]] = {}
+    for benchmark in benchmarks:
+        if args.filter and args.filter not in benchmark.name:
+            continue
+        results[benchmark.name] = {}
+        for size in benchmark.sizes:
+            stats = benchmark.measure(size, random.Random(args.seed), args.repeat, args.min_time)
+            results[benchmark.name][str(size)] = stats
+            print(f"  {benchmark.name:24s} n={size:<6d} {stats['min_us']:>10.3f} us/item  "
+                  f"(median {stats['median_us']:.3f}, {stats['items_per_sec']:,.0f} items/s)")
+
+    if not args.no_save:
+        print(f"✓ Results written to {write_results('micro', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Shared helpers for benchmarks: latency statistics, result files and servers
+"""
+
+import os
+import json
+import time
+import socket
+import platform
+import threading
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    """mean / p50 / p95 / p99 / max of a list of latencies in milliseconds"""
+    values = sorted(latencies_ms)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Short commit hash of the working tree, with a -dirty suffix if modified"""
+    try:
+        sha = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+        dirty = subprocess.call(
+            ["git", "diff", "--quiet", "HEAD"], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ) != 0
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(suite: str, results: dict, out_dir: str = RESULTS_DIR) -> str:
+    """
+    Store benchmark results as JSON, tagged with the commit and machine.
+
+    Args:
+        suite: Suite name used in the file name ("api", "micro", ...)
+        results: Benchmark payload
+        out_dir: Directory for result files
+
+    Returns:
+        Path of the written file
+    """
+    now = datetime.now(timezone.utc)
+    revision = git_revision()
+    payload = {
+        "suite": suite,
+        "revision": revision,
+        "timestamp": now.isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{suite}-{now.strftime('%Y%m%dT%H%M%SZ')}-{revision or 'norev'}.json")
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    return path
+
+
+def free_port() -> int:
+    """An unused localhost TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class BackgroundServer:
+    """Runs an ASGI app under uvicorn in a daemon thread"""
+
+    def __init__(self, app, port: Optional[int] = None):
+        import uvicorn
+
+        self.port = port or free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(config)
+        self.server.install_signal_handlers = lambda: None
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError(f"Server on port {self.port} did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
@@ -0,0 +1,68 @@
+"""
+Compare two benchmark result files
+
+Usage (from project root):
+    python -m benchmarks.compare benchmarks/results/api-OLD.json benchmarks/results/api-NEW.json
+    python -m benchmarks.compare OLD.json NEW.json --threshold 5
+"""
+
+import json
+import argparse
+from typing import Dict, Tuple
+
+
+# Metrics where a smaller number is better; everything else is "higher is better"
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "_kib", "kib_per_request", "errors")
+
+
+def flatten(tree: dict, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a nested dict keyed by their dotted path"""
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def change(metric: str, old: float, new: float) -> Tuple[float, bool]:
+    """Relative change in percent, and whether it is an improvement"""
+    delta = (new - old) / old * 100.0 if old else 0.0
+    lower_better = metric.endswith(LOWER_IS_BETTER)
+    return delta, (delta < 0) == lower_better
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.0,
+                        help="only show metrics that changed by at least this many percent")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    print(f"{old.get('revision')} ({old.get('timestamp')}) -> {new.get('revision')} ({new.get('timestamp')})")
+
+    old_metrics = flatten(old["results"])
+    new_metrics = flatten(new["results"])
+    width = max((len(k) for k in new_metrics), default=10)
+
+    for metric in sorted(set(old_metrics) & set(new_metrics)):
+        if metric.startswith("config."):
+            continue
+        before, after = old_metrics[metric], new_metrics[metric]
+        delta, better = change(metric, before, after)
+        if abs(delta) < args.threshold:
+            continue
+        marker = "" if delta == 0 else ("✓" if better else "✗")
+        print(f"  {metric:{width}s} {before:>12.3f} -> {after:>12.3f}  {delta:+7.1f}% {marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,11 @@ app.add_middleware(
 )
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await pred_temp_hum.close_client()
+
+
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -45,7 +50,7 @@ async def predict(inputs: Inputs):
     try:
         rainfall = pred_rainfall.get_rainfall(state, district, month)
 
-        temperature, humidity = pred_temp_hum.get_temp_hum(district)
+        temperature, humidity = await pred_temp_hum.get_temp_hum(district)
 
         prediction = pred_crop.predict_crop(
             nitrogen, phosphorous, potassium, temperature, humidity, ph, rainfall)
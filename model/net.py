@@ -0,0 +1,27 @@
+"""
+Net_64_128_64 - The crop recommendation network
+"""
+
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+class Net_64_128_64(nn.Module):
+    """Four Linear layers (64, 128, 64 hidden units) with SELU in between"""
+
+    def __init__(self, input_size, num_classes):
+        super(Net_64_128_64, self).__init__()
+        self.fc1 = nn.Linear(input_size, 64)
+        self.fc2 = nn.Linear(64, 128)
+        self.fc3 = nn.Linear(128, 64)
+        self.fc4 = nn.Linear(64, num_classes)
+
+    def logits(self, x):
+        """Scores before the final softmax; train on these with CrossEntropyLoss"""
+        x = F.selu(self.fc1(x))
+        x = F.selu(self.fc2(x))
+        x = F.selu(self.fc3(x))
+        return self.fc4(x)
+
+    def forward(self, x):
+        return F.softmax(self.logits(x), dim=-1)
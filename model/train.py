@@ -0,0 +1,289 @@
+"""
+Train Net_64_128_64 and publish it as a versioned model bundle
+
+Replaces the per-sample loop of crop_recommendation.ipynb: mini-batches
+from a DataLoader, one vectorized forward pass for each validation, early
+stopping on the validation loss, and the best weights kept.
+
+Run from project root:
+    python -m model.train
+    python -m model.train --data data/Crop_recommendation.csv --threads 8 --no-promote
+
+Each run writes model/bundles/<version>/ with baseline.hdf5 (state_dict),
+baseline.npz (NumPy engine weights), normalization.npz, encoder.pkl and
+manifest.json. The bundle is assembled in a hidden temporary directory and
+renamed into place, then model/current is repointed at it; the backend
+serves model/current and reloads when it changes.
+"""
+
+import os
+import csv
+import json
+import time
+import pickle
+import shutil
+import hashlib
+import logging
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+from sklearn.preprocessing import LabelEncoder
+
+from model.net import Net_64_128_64
+from backend.services.inference_engine import export_weights
+from backend.services.model_registry import BUNDLE_FILES, BUNDLES_DIR, CURRENT_BUNDLE
+
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = "data/Crop_recommendation.csv"
+
+
+class TrainedModel(NamedTuple):
+    """Everything a bundle is written from"""
+    state_dict: Dict[str, torch.Tensor]
+    mean: np.ndarray
+    std: np.ndarray
+    encoder: LabelEncoder
+    metrics: Dict[str, float]
+    history: List[Dict[str, float]]
+
+
+def load_dataset(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read the training CSV: every column but the last is a feature, the last is the crop.
+
+    Returns:
+        Tuple of ((N, 7) float32 features in FEATURES order, (N,) crop names)
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)  # header
+        records = [record for record in reader if record]
+    features = np.array([record[:-1] for record in records], dtype=np.float32)
+    labels = np.array([record[-1].strip() for record in records], dtype=object)
+    return features, labels
+
+
+def evaluate(net: Net_64_128_64, features: torch.Tensor, labels: torch.Tensor,
+             criterion: nn.Module) -> Tuple[float, float]:
+    """Loss and accuracy over a whole split in one forward pass"""
+    net.eval()
+    with torch.no_grad():
+        logits = net.logits(features)
+        loss = criterion(logits, labels).item()
+        accuracy = (logits.argmax(dim=1) == labels).float().mean().item()
+    return loss, accuracy
+
+
+def train(features: np.ndarray, label_names: np.ndarray, epochs: int = 300, batch_size: int = 64,
+          learning_rate: float = 1e-3, patience: int = 20, val_fraction: float = 0.2, seed: int = 0,
+          threads: Optional[int] = None, loader_workers: int = 0) -> TrainedModel:
+    """
+    Fit the network with mini-batch Adam and early stopping.
+
+    Args:
+        features: (N, 7) raw feature rows
+        label_names: (N,) crop names
+        epochs: Maximum number of passes over the training split
+        batch_size: Rows per optimizer step
+        learning_rate: Adam learning rate
+        patience: Stop after this many epochs without a better validation loss
+        val_fraction: Share of rows held out for validation
+        seed: Seed of the split, the initialization and the shuffling
+        threads: CPU threads used by torch (default: all cores)
+        loader_workers: DataLoader worker processes (0 loads in the training thread)
+
+    Returns:
+        TrainedModel with the weights of the epoch with the lowest validation loss
+
+    Raises:
+        ValueError: If the validation loss was NaN in every epoch
+    """
+    torch.manual_seed(seed)
+    torch.set_num_threads(threads or os.cpu_count() or 1)
+
+    encoder = LabelEncoder()
+    labels = encoder.fit_transform(label_names)
+
+    order = np.random.default_rng(seed).permutation(len(features))
+    val_size = max(1, int(round(val_fraction * len(features))))
+    val_rows, train_rows = order[:val_size], order[val_size:]
+
+    # Normalization comes from the training split only
+    mean = features[train_rows].mean(axis=0)
+    std = features[train_rows].std(axis=0, ddof=1)
+    normalized = torch.from_numpy((features - mean) / std)
+    targets = torch.from_numpy(labels.astype(np.int64))
+
+    train_x, train_y = normalized[train_rows], targets[train_rows]
+    val_x, val_y = normalized[val_rows], targets[val_rows]
+    loader = DataLoader(
+        TensorDataset(train_x, train_y), batch_size=batch_size, shuffle=True,
+        num_workers=loader_workers, generator=torch.Generator().manual_seed(seed)
+    )
+
+    net = Net_64_128_64(features.shape[1], len(encoder.classes_))
+    criterion = nn.CrossEntropyLoss()
+    optimizer = torch.optim.Adam(net.parameters(), lr=learning_rate)
+
+    history = []
+    best_loss, best_epoch, best_state = float("inf"), 0, None
+    for epoch in range(1, epochs + 1):
+        net.train()
+        for inputs, batch_labels in loader:
+            optimizer.zero_grad()
+            loss = criterion(net.logits(inputs), batch_labels)
+            loss.backward()
+            optimizer.step()
+
+        train_loss, train_accuracy = evaluate(net, train_x, train_y, criterion)
+        val_loss, val_accuracy = evaluate(net, val_x, val_y, criterion)
+        history.append({
+            "epoch": epoch, "train_loss": train_loss, "train_accuracy": train_accuracy,
+            "val_loss": val_loss, "val_accuracy": val_accuracy,
+        })
+        if epoch % 10 == 0:
+            logger.info("Epoch %d: train loss %.4f acc %.4f, val loss %.4f acc %.4f",
+                        epoch, train_loss, train_accuracy, val_loss, val_accuracy)
+
+        if val_loss < best_loss:
+            best_loss, best_epoch = val_loss, epoch
+            best_state = {key: value.detach().clone() for key, value in net.state_dict().items()}
+        elif epoch - best_epoch >= patience:
+            logger.info("Early stopping at epoch %d (best %d)", epoch, best_epoch)
+            break
+
+    if best_state is None:
+        # Every validation loss was NaN (e.g. a constant feature column gives std 0)
+        raise ValueError(
+            f"Validation loss was not finite in any of {len(history)} epochs; "
+            "check the data for constant or non-numeric columns, or lower the learning rate"
+        )
+    net.load_state_dict(best_state)
+    train_loss, train_accuracy = evaluate(net, train_x, train_y, criterion)
+    val_loss, val_accuracy = evaluate(net, val_x, val_y, criterion)
+    metrics = {
+        "best_epoch": best_epoch, "epochs_run": len(history),
+        "train_loss": train_loss, "train_accuracy": train_accuracy,
+        "val_loss": val_loss, "val_accuracy": val_accuracy,
+    }
+    return TrainedModel(best_state, mean.astype(np.float32), std.astype(np.float32), encoder, metrics, history)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_bundle(trained: TrainedModel, manifest: dict, bundles_dir: str = BUNDLES_DIR,
+                 version: Optional[str] = None) -> str:
+    """
+    Write all artifacts of a trained model as one new bundle directory.
+
+    The files are written to a hidden temporary directory that is renamed
+    into place, so a bundle is either complete or absent.
+
+    Returns:
+        Path of the bundle directory
+    """
+    version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    final_dir = os.path.join(bundles_dir, version)
+    if os.path.exists(final_dir):
+        raise FileExistsError(f"Bundle {final_dir} already exists")
+
+    tmp_dir = os.path.join(bundles_dir, f".{version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        paths = {argument: os.path.join(tmp_dir, name) for argument, name in BUNDLE_FILES.items()}
+        torch.save(trained.state_dict, paths["model_path"])
+        export_weights(trained.state_dict, paths["weights_path"], source_sha256=_sha256(paths["model_path"]))
+        np.savez(paths["normalization_path"], mean=trained.mean, std=trained.std)
+        with open(paths["encoder_path"], "wb") as f:
+            pickle.dump(trained.encoder, f)
+
+        manifest = {
+            **manifest,
+            "version": version,
+            "classes": [str(name) for name in trained.encoder.classes_],
+            "metrics": trained.metrics,
+            "files": {os.path.basename(path): _sha256(path) for path in paths.values()},
+        }
+        with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+
+        os.rename(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return final_dir
+
+
+def promote(bundle_dir: str, current: str = CURRENT_BUNDLE):
+    """Atomically repoint the `current` symlink at a bundle"""
+    tmp_link = f"{current}.tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(bundle_dir, os.path.dirname(current)), tmp_link)
+    os.replace(tmp_link, current)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train Net_64_128_64 and write a model bundle")
+    parser.add_argument("--data", default=DATA_FILE, help="training CSV (features..., label)")
+    parser.add_argument("--epochs", type=int, default=300, help="maximum epochs")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--lr", type=float, default=1e-3, help="Adam learning rate")
+    parser.add_argument("--patience", type=int, default=20, help="epochs without improvement before stopping")
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 = all cores)")
+    parser.add_argument("--loader-workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--bundles-dir", default=BUNDLES_DIR)
+    parser.add_argument("--no-promote", action="store_true", help="write the bundle without repointing model/current")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    features, labels = load_dataset(args.data)
+    started = time.perf_counter()
+    trained = train(
+        features, labels, epochs=args.epochs, batch_size=args.batch_size, learning_rate=args.lr,
+        patience=args.patience, val_fraction=args.val_fraction, seed=args.seed,
+        threads=args.threads or None, loader_workers=args.loader_workers,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"✓ Trained in {elapsed:.1f}s ({trained.metrics['epochs_run']} epochs, best {trained.metrics['best_epoch']}): "
+          f"val accuracy {trained.metrics['val_accuracy']:.2%}, train accuracy {trained.metrics['train_accuracy']:.2%}")
+
+    bundle_dir = write_bundle(trained, {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "data": {"path": args.data, "rows": len(features), "sha256": _sha256(args.data)},
+        "hyperparameters": {
+            "epochs": args.epochs, "batch_size": args.batch_size, "learning_rate": args.lr,
+            "patience": args.patience, "val_fraction": args.val_fraction, "seed": args.seed,
+        },
+        "training_seconds": round(elapsed, 2),
+    }, args.bundles_dir)
+    print(f"✓ Bundle written to {bundle_dir}")
+
+    if not args.no_promote:
+        try:
+            promote(bundle_dir)
+            print(f"✓ {CURRENT_BUNDLE} -> {bundle_dir}")
+        except OSError as e:
+            print(f"⚠ Could not link {CURRENT_BUNDLE} ({e}); set MODEL_BUNDLE={bundle_dir} instead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Shared fixtures
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+from backend.services.inference_engine import export_weights
+
+LAYER_SIZES = (7, 64, 128, 64, 22)
+
+
+def random_state_dict(seed: int = 0) -> dict:
+    """Net_64_128_64 weights as NumPy arrays"""
+    rng = np.random.default_rng(seed)
+    state_dict = {}
+    for layer, (fan_in, fan_out) in enumerate(zip(LAYER_SIZES, LAYER_SIZES[1:]), start=1):
+        state_dict[f"fc{layer}.weight"] = rng.standard_normal((fan_out, fan_in)) / np.sqrt(fan_in)
+        state_dict[f"fc{layer}.bias"] = rng.standard_normal(fan_out) * 0.1
+    return state_dict
+
+
+@pytest.fixture(scope="session")
+def model_bundle(tmp_path_factory):
+    """A bundle directory with random NumPy weights and no encoder"""
+    bundle = tmp_path_factory.mktemp("bundle")
+    export_weights(random_state_dict(), str(bundle / "baseline.npz"))
+    np.savez(bundle / "normalization.npz",
+             mean=np.array([50, 53, 48, 25, 71, 6.5, 103], dtype=np.float32),
+             std=np.array([37, 33, 51, 5, 22, 0.8, 55], dtype=np.float32))
+    return bundle
+
+
+@pytest.fixture(scope="session")
+def backend_app(model_bundle):
+    """
+    backend.main imported against the random bundle, without the
+    precomputed table, reloading the model on every check.
+    """
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("dotenv")
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("MODEL_BUNDLE", str(model_bundle))
+        patch.setenv("CROP_MODEL_ENGINE", "numpy")
+        patch.setenv("MODEL_RELOAD_CHECK_INTERVAL", "0")
+        patch.setenv("WEATHER_BACKEND", "mock")
+        patch.setenv("RECOMMENDATION_TABLE", "")
+
+        from backend.services import model_registry
+        patch.setattr(model_registry, "_registry", None)
+        sys.modules.pop("backend.main", None)
+        import backend.main as app_module
+
+        yield app_module
+        sys.modules.pop("backend.main", None)
@@ -0,0 +1,135 @@
+"""
+Tests for the micro-batcher in front of the crop model
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.services.batching_service import MicroBatcher
+
+
+class FakeModel:
+    """Scores each row by its first feature, so every caller can recognise its own answer"""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.top_ns = []
+
+    def predict_batch(self, matrix: np.ndarray, top_n: int):
+        assert matrix.shape[1] == 7
+        self.batch_sizes.append(len(matrix))
+        self.top_ns.append(top_n)
+        return [[(f"crop-{int(row[0])}-{rank}", float(row[0])) for rank in range(top_n)] for row in matrix]
+
+
+def features(i: int):
+    return [i, 0, 0, 0, 0, 0, 0]
+
+
+def run(batcher: MicroBatcher, coro):
+    async def main():
+        try:
+            return await coro()
+        finally:
+            await batcher.stop()
+    return asyncio.run(main())
+
+
+def test_concurrent_callers_get_their_own_predictions():
+    model = FakeModel()
+    batcher = MicroBatcher(model.predict_batch, max_batch=64, max_wait_ms=50)
+
+    results = run(batcher, lambda: asyncio.gather(*(batcher.submit(features(i), top_n=2) for i in range(10))))
+
+    assert model.batch_sizes == [10]
+    for i, prediction in enumerate(results):
+        assert prediction == [(f"crop-{i}-0", float(i)), (f"crop-{i}-1", float(i))]
+
+
+def test_each_caller_gets_its_own_top_n():
+    model = FakeModel()
+    batcher = MicroBatcher(model.predict_batch, max_wait_ms=50)
+
+    results = run(batcher, lambda: asyncio.gather(*(batcher.submit(features(i), top_n=i) for i in (1, 3, 2))))
+
+    # One forward pass with the largest top_n, sliced per caller
+    assert model.top_ns == [3]
+    assert [len(prediction) for prediction in results] == [1, 3, 2]
+
+
+def test_full_batch_flushes_without_waiting():
+    model = FakeModel()
+    # A window this long would time the test out if a full batch waited for it
+    batcher = MicroBatcher(model.predict_batch, max_batch=3, max_wait_ms=60_000)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(features(i)) for i in range(6))), 5)
+
+    results = run(batcher, main)
+
+    assert model.batch_sizes == [3, 3]
+    assert [prediction[0][1] for prediction in results] == [float(i) for i in range(6)]
+    assert batcher.metrics()["avg_batch_size"] == 3.0
+
+
+def test_window_closes_after_max_wait():
+    model = FakeModel()
+    batcher = MicroBatcher(model.predict_batch, max_batch=64, max_wait_ms=20)
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit(features(1)))
+        # Arrives long after the first window closed, so it gets a batch of its own
+        await asyncio.sleep(0.5)
+        assert first.done()
+        second = await batcher.submit(features(2))
+        return await first, second
+
+    first, second = run(batcher, main)
+
+    assert model.batch_sizes == [1, 1]
+    assert (first[0][1], second[0][1]) == (1.0, 2.0)
+
+
+def test_executor_runs_the_forward_pass():
+    model = FakeModel()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        batcher = MicroBatcher(model.predict_batch, max_batch=4, max_wait_ms=50, executor=executor, max_inflight=2)
+        results = run(batcher, lambda: asyncio.gather(*(batcher.submit(features(i)) for i in range(8))))
+
+    assert sorted(model.batch_sizes) == [4, 4]
+    assert [prediction[0][1] for prediction in results] == [float(i) for i in range(8)]
+
+
+def test_errors_reach_every_caller_of_the_batch():
+    def predict_batch(matrix, top_n):
+        raise ValueError("bad input")
+
+    batcher = MicroBatcher(predict_batch, max_wait_ms=50)
+
+    results = run(batcher, lambda: asyncio.gather(*(batcher.submit(features(i)) for i in range(3)),
+                                                  return_exceptions=True))
+
+    assert len(results) == 3
+    assert all(isinstance(error, ValueError) for error in results)
+    assert batcher.metrics()["batches"] == 0
+
+
+def test_stop_fails_queued_requests():
+    model = FakeModel()
+    batcher = MicroBatcher(model.predict_batch, max_batch=1, max_wait_ms=0)
+
+    async def main():
+        # Hold the only in-flight slot so the requests stay queued
+        batcher._ensure_started()
+        await batcher._slots.acquire()
+        pending = [asyncio.ensure_future(batcher.submit(features(i))) for i in range(2)]
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        return await asyncio.gather(*pending, return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(error, RuntimeError) for error in results)
+    assert model.batch_sizes == []
@@ -0,0 +1,114 @@
+"""
+End-to-end test of the bulk-scoring CLI on a small CSV
+"""
+
+import csv
+
+import numpy as np
+import pytest
+
+from backend.services import bulk_scoring
+from backend.services.bulk_scoring import BulkScorer, resolve_columns, score_file
+from backend.services.crop_service import FEATURES
+from backend.services.rainfall_store import RainfallTable
+from backend.services.recommendation_table import MONTHS
+
+RAINFALL_CSV = (
+    "STATE_UT_NAME,DISTRICT," + ",".join(MONTHS) + ",ANNUAL\n"
+    "MAHARASHTRA,PUNE," + ",".join(str(10 * (i + 1)) for i in range(12)) + ",780\n"
+    "KARNATAKA,MYSORE," + ",".join(["50"] * 12) + ",600\n"
+)
+
+# Aliased headers in mixed case, plus a column that is only copied through;
+# the last record leaves out its trailing empty field
+INPUT_CSV = """plot_id,State_UT_Name,District,Month,N,Phosphorus,K,pH,Temperature
+p1,MAHARASHTRA,PUNE,JUN,90,42,43,6.5,
+p2,maharashtra,pune.,june,20,30,40,7,31.5
+p3,ATLANTIS,NOWHERE,SMARCH,999,42,43,6.5,
+p4,ATLANTIS,NOWHERE,JUN,999,42,43,6.5,
+p5,KARNATAKA,MYSORE,JAN,999,42,43,6.5,
+p6,KARNATAKA,MYSORE,JAN,60,42,43,6.5
+"""
+
+# Expected status per row: month first, then location, then soil, then weather
+STATUSES = ["ok", "ok", "invalid_month", "unknown_location", "invalid_soil", "no_weather"]
+
+
+class FakeCropService:
+    """Ranks crops by the row's nitrogen, so each output row can be traced to its input"""
+
+    labels = ["rice", "maize", "chickpea"]
+
+    def top_crops_arrays(self, matrix, top_n: int = 3):
+        matrix = np.asarray(matrix)
+        assert matrix.shape[1] == len(FEATURES)
+        first = matrix[:, FEATURES.index("nitrogen")].astype(np.int64) % len(self.labels)
+        indices = (first[:, None] + np.arange(top_n)) % len(self.labels)
+        scores = np.tile(np.linspace(60, 10, top_n), (len(matrix), 1)).astype(np.float32)
+        return indices, scores
+
+
+@pytest.fixture
+def scorer_factory(tmp_path, monkeypatch):
+    rainfall = tmp_path / "rainfall.csv"
+    rainfall.write_text(RAINFALL_CSV, encoding="utf-8")
+    table = RainfallTable.from_csv(str(rainfall))
+    # Weather normals for Pune only
+    weather = {("MAHARASHTRA", "PUNE", month): (27.0, 80.0) for month in MONTHS}
+
+    def build_scorer(top_k=3, *args, **kwargs):
+        return BulkScorer(FakeCropService(), table, weather, top_k)
+
+    monkeypatch.setattr(bulk_scoring, "build_scorer", build_scorer)
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_resolve_columns_accepts_aliases():
+    names = resolve_columns(["plot_id", " State_UT_Name", "District", "Month", "N", "Phosphorus", "K", "pH"])
+
+    assert names == {
+        "state": " State_UT_Name", "district": "District", "month": "Month",
+        "nitrogen": "N", "phosphorous": "Phosphorus", "potassium": "K", "ph": "pH",
+    }
+    with pytest.raises(ValueError, match="potassium"):
+        resolve_columns(["state", "district", "month", "n", "p", "ph"])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 100])
+def test_score_file(scorer_factory, tmp_path, chunk_size):
+    source = tmp_path / "soil_tests.csv"
+    source.write_text(INPUT_CSV, encoding="utf-8")
+    output = tmp_path / "scores.csv"
+
+    statuses = score_file(str(source), str(output), top_k=2, chunk_size=chunk_size)
+
+    rows = read_csv(output)
+    assert [row["plot_id"] for row in rows] == ["p1", "p2", "p3", "p4", "p5", "p6"]
+    assert [row["status"] for row in rows] == STATUSES
+    assert statuses == {status: STATUSES.count(status) for status in STATUSES}
+
+    p1, p2 = rows[0], rows[1]
+    assert (p1["crop_1"], p1["crop_2"], p1["confidence_1"]) == ("rice", "maize", "60.0")
+    assert (p1["rainfall_used"], p1["temperature_used"], p1["humidity_used"]) == ("60.0", "27.0", "80.0")
+    assert p1["risk_level"]
+    # Case and punctuation variants resolve; the file's own temperature wins over the normals
+    assert (p2["crop_1"], p2["rainfall_used"], p2["temperature_used"]) == ("chickpea", "60.0", "31.5")
+    for row in rows[2:]:
+        assert row["crop_1"] == row["confidence_1"] == row["risk_level"] == ""
+
+
+def test_output_does_not_depend_on_chunk_size(scorer_factory, tmp_path):
+    source = tmp_path / "soil_tests.csv"
+    source.write_text(INPUT_CSV, encoding="utf-8")
+
+    outputs = []
+    for chunk_size in (1, 2, 5, 6):
+        output = tmp_path / f"scores_{chunk_size}.csv"
+        score_file(str(source), str(output), chunk_size=chunk_size)
+        outputs.append(output.read_text(encoding="utf-8"))
+
+    assert len(set(outputs)) == 1
@@ -0,0 +1,160 @@
+"""
+Tests for the TTL + LRU cache and its single-flight loading
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 59.9
+    assert cache.get("a") == 1
+    clock.now = 60.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60, clock=FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_threaded_misses_load_once():
+    cache = TTLCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: cache.coalesced == 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+    assert cache.get("k") == "value"
+
+
+def test_threaded_loader_error_reaches_every_waiter_and_is_not_cached():
+    cache = TTLCache()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load("k", failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: cache.coalesced == 3)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 4 and all(str(e) == "upstream down" for e in errors)
+    assert cache.get_or_load("k", lambda: "recovered") == "recovered"
+
+
+def test_concurrent_async_misses_load_once():
+    cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load_async("k", loader) for _ in range(8)))
+
+    assert asyncio.run(main()) == ["value"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_async_loader_error_reaches_every_waiter_and_is_not_cached():
+    cache = TTLCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def recovered():
+        return "recovered"
+
+    async def main():
+        results = await asyncio.gather(
+            *(cache.get_or_load_async("k", failing) for _ in range(4)), return_exceptions=True
+        )
+        return results, await cache.get_or_load_async("k", recovered)
+
+    errors, value = asyncio.run(main())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert value == "recovered"
+
+
+def test_cancelled_async_caller_does_not_cancel_the_load():
+    cache = TTLCache()
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_load_async("k", loader))
+        second = asyncio.ensure_future(cache.get_or_load_async("k", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "value"
+    assert cache.get("k") == "value"
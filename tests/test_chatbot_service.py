@@ -0,0 +1,116 @@
+"""
+Tests for the chatbot conversation state machine
+"""
+
+import pytest
+
+from backend.services.chatbot_service import ChatbotService, Session, Step
+from backend.services.location_index import LocationIndex
+from backend.services.session_store import InMemorySessionStore, SQLiteSessionStore
+
+DISTRICTS = {"MAHARASHTRA": ["PUNE", "NAGPUR", "NASHIK"], "KARNATAKA": ["MYSORE"]}
+
+
+class FakeCatalog:
+    def __init__(self):
+        self._index = LocationIndex(list(DISTRICTS), DISTRICTS)
+
+    def index(self) -> LocationIndex:
+        return self._index
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def chatbot(request, tmp_path):
+    if request.param == "memory":
+        store = InMemorySessionStore()
+    else:
+        store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), encode=Session.dumps, decode=Session.loads)
+    return ChatbotService(store=store, catalog=FakeCatalog())
+
+
+def step_of(chatbot: ChatbotService, session_id: str) -> Step:
+    return Step(chatbot.sessions.get(session_id).step)
+
+
+def test_full_conversation_with_soil_values(chatbot):
+    # (message, step after it, expected reply fields)
+    turns = [
+        ("hi", Step.ASK_STATE, {"input_type": "text"}),
+        ("maharashtra", Step.ASK_DISTRICT, {"message": "Great! Now, which district in MAHARASHTRA?"}),
+        ("pune", Step.ASK_MONTH, {"input_type": "select", "options": ChatbotService.MONTHS_LIST}),
+        ("jun", Step.ASK_USE_SOIL, {"options": ChatbotService.SOIL_OPTIONS}),
+        ("Yes, I have values", Step.ASK_NITROGEN, {"input_type": "number"}),
+        ("90", Step.ASK_PHOSPHOROUS, {"input_type": "number"}),
+        ("42", Step.ASK_POTASSIUM, {"input_type": "number"}),
+        ("43", Step.ASK_PH, {"input_type": "number"}),
+    ]
+    for message, step, fields in turns:
+        reply = chatbot.get_response(message, "s1")
+        assert step_of(chatbot, "s1") == step, message
+        assert reply["requires_input"] is True
+        assert {key: reply[key] for key in fields} == fields
+
+    reply = chatbot.get_response("6.5", "s1")
+    assert step_of(chatbot, "s1") == Step.PROVIDING_RECOMMENDATION
+    assert reply["ready_for_prediction"] is True and reply["requires_input"] is False
+    assert reply["user_data"] == {
+        "state": "MAHARASHTRA", "district": "PUNE", "month": "JUN",
+        "nitrogen": 90.0, "phosphorous": 42.0, "potassium": 43.0, "ph": 6.5, "use_auto_values": False,
+    }
+
+    # The conversation is over; further messages get the help prompt
+    assert chatbot.get_response("thanks", "s1")["message"] == chatbot.RESPONSES["en"]["help"]
+
+
+def test_default_soil_values_skip_to_recommendation(chatbot):
+    for message in ("hi", "KARNATAKA", "MYSORE", "MAR"):
+        chatbot.get_response(message, "s2")
+    reply = chatbot.get_response("No, use defaults", "s2")
+
+    assert reply["ready_for_prediction"] is True
+    assert reply["user_data"]["use_auto_values"] is True
+    assert reply["user_data"]["nitrogen"] is None
+
+
+@pytest.mark.parametrize("answers, invalid, invalid_key, suggestions", [
+    (["hi"], "Atlantis", "invalid_state", None),
+    (["hi"], "MAHRSTRA", "invalid_state", ["MAHARASHTRA"]),
+    (["hi", "MAHARASHTRA"], "NAGPOOR", "invalid_district", ["NAGPUR"]),
+    (["hi", "MAHARASHTRA", "PUNE"], "JUNE-ISH", "invalid_month", None),
+    (["hi", "MAHARASHTRA", "PUNE", "JUN", "yes"], "lots", "invalid_number", None),
+    (["hi", "MAHARASHTRA", "PUNE", "JUN", "yes", "90"], "", "invalid_number", None),
+    (["hi", "MAHARASHTRA", "PUNE", "JUN", "yes", "90", "42"], "x", "invalid_number", None),
+    (["hi", "MAHARASHTRA", "PUNE", "JUN", "yes", "90", "42", "43"], "acidic", "invalid_ph", None),
+])
+def test_invalid_answer_keeps_the_step(chatbot, answers, invalid, invalid_key, suggestions):
+    for message in answers:
+        chatbot.get_response(message, "s3")
+    step = step_of(chatbot, "s3")
+
+    reply = chatbot.get_response(invalid, "s3")
+
+    assert step_of(chatbot, "s3") == step
+    assert reply["message"] == chatbot.RESPONSES["en"][invalid_key]
+    assert reply["requires_input"] is True
+    if suggestions is not None:
+        assert reply["input_type"] == "select"
+        assert reply["options"][:len(suggestions)] == suggestions
+
+
+def test_replies_follow_the_session_language(chatbot):
+    assert chatbot.get_response("hi", "s4", language="hi")["message"] == chatbot.RESPONSES["hi"]["welcome"]
+    # Texts missing in a language fall back to English
+    assert chatbot.get_response("Atlantis", "s4", language="hi")["message"] == \
+        chatbot.RESPONSES["en"]["invalid_state"]
+
+
+def test_session_round_trips_through_dumps_and_loads():
+    session = Session("mr", step=Step.ASK_POTASSIUM)
+    session.state, session.district, session.month = "MAHARASHTRA", "PUNE", "JUN"
+    session.nitrogen, session.phosphorous = 90.0, 42.5
+
+    loaded = Session.loads(session.dumps())
+
+    assert loaded.step == Step.ASK_POTASSIUM and loaded.language == "mr"
+    assert loaded.user_data() == session.user_data()
+    assert Session.loads(Session().dumps()).user_data() == Session().user_data()
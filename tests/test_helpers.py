@@ -0,0 +1,70 @@
+"""
+Tests for the risk assessment helpers
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from backend.utils.helpers import (
+    RISK_LEVELS, RiskThresholds, calculate_risk_level, calculate_risk_level_batch
+)
+
+# Every threshold, values just inside and outside it, and both integer and float forms
+RAINFALL = [0, 49.9, 50, 50.0, 120, 200, 200.1, 350]
+TEMPERATURE = [-5, 14.9, 15, 25.0, 35, 35.1, 48]
+HUMIDITY = [0, 39.9, 40, 60.0, 80, 80.1, 100]
+
+
+@pytest.mark.parametrize("thresholds", [
+    RiskThresholds(),
+    RiskThresholds(low_rainfall=100, high_rainfall=100, medium_score=2, high_score=2),
+])
+def test_batch_matches_scalar(thresholds):
+    grid = list(itertools.product(RAINFALL, TEMPERATURE, HUMIDITY))
+    rainfall, temperature, humidity = (list(column) for column in zip(*grid))
+
+    batch = calculate_risk_level_batch(rainfall, temperature, humidity, thresholds, describe=True)
+
+    expected = [calculate_risk_level(r, t, h, thresholds) for r, t, h in grid]
+    assert list(zip(batch.level_names(), batch.descriptions)) == expected
+
+
+def test_batch_matches_scalar_for_arrays():
+    rng = np.random.default_rng(0)
+    rainfall = rng.integers(0, 400, 300)
+    temperature = rng.uniform(0, 45, 300).astype(np.float32)
+    humidity = rng.uniform(0, 100, 300)
+
+    batch = calculate_risk_level_batch(rainfall, temperature, humidity, describe=True)
+
+    expected = [calculate_risk_level(r, t, h) for r, t, h in zip(rainfall, temperature, humidity)]
+    assert list(zip(batch.level_names(), batch.descriptions)) == expected
+
+
+def test_batch_accepts_scalars():
+    batch = calculate_risk_level_batch(50.0, 30.0, 70.0, describe=True)
+    assert list(zip(batch.level_names(), batch.descriptions)) == [calculate_risk_level(50.0, 30.0, 70.0)]
+
+    batch = calculate_risk_level_batch(10, [20, 40], 70, describe=True)
+    assert list(zip(batch.level_names(), batch.descriptions)) == [
+        calculate_risk_level(10, 20, 70), calculate_risk_level(10, 40, 70)
+    ]
+
+
+def test_levels_follow_score_cutoffs():
+    batch = calculate_risk_level_batch([120, 10, 10], [25, 25, 5], [60, 60, 60])
+    assert batch.scores.tolist() == [0, 3, 5]
+    assert batch.level_names() == list(RISK_LEVELS)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"medium_score": 5, "high_score": 3},
+    {"low_rainfall": 300.0},
+    {"min_temperature": 40.0},
+    {"max_humidity": 10.0},
+])
+def test_thresholds_reject_inverted_limits(overrides):
+    with pytest.raises(ValueError):
+        RiskThresholds(**overrides)
@@ -0,0 +1,76 @@
+"""
+Tests for typo-tolerant location matching
+"""
+
+import pytest
+
+from backend.services.location_index import LocationIndex, normalize
+
+DISTRICTS = {
+    "UTTAR PRADESH": ["RAMPUR", "RAIPUR", "SITAPUR", "SHAHJAHANPUR", "KANPUR NAGAR", "KANPUR DEHAT"],
+    "MAHARASHTRA": ["PUNE", "NAGPUR", "NASHIK", "AURANGABAD"],
+    "GOA": ["NORTH GOA", "SOUTH GOA"],
+}
+
+
+@pytest.fixture(scope="module")
+def index():
+    return LocationIndex(list(DISTRICTS), DISTRICTS)
+
+
+def test_normalize():
+    assert normalize("  north-goa.") == "NORTH GOA"
+
+
+def test_exact_match(index):
+    assert index.resolve_state("MAHARASHTRA") == "MAHARASHTRA"
+    assert index.resolve_district("PUNE", "MAHARASHTRA", fuzzy=False) == "PUNE"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("maharashtra", "MAHARASHTRA"),
+    ("Uttar-Pradesh", "UTTAR PRADESH"),
+    ("  uttar   pradesh. ", "UTTAR PRADESH"),
+])
+def test_case_and_punctuation_variants_are_exact(index, query, expected):
+    assert index.resolve_state(query, fuzzy=False) == expected
+    assert index.suggest_states(query, k=1)[0].score == 1.0
+
+
+def test_district_is_only_matched_within_its_state(index):
+    assert index.resolve_district("PUNE", "GOA") is None
+    assert index.resolve_district("north goa", "GOA", fuzzy=False) == "NORTH GOA"
+
+
+@pytest.mark.parametrize("query, state, expected", [
+    ("NASHK", "MAHARASHTRA", "NASHIK"),
+    ("AURANGABD", "MAHARASHTRA", "AURANGABAD"),
+    ("SITAPURR", "UTTAR PRADESH", "SITAPUR"),
+    ("RAMPURR", "UTTAR PRADESH", "RAMPUR"),
+])
+def test_one_letter_typo_resolves(index, query, state, expected):
+    best = index.suggest_districts(query, state, k=2)
+    assert best[0].score >= LocationIndex.ACCEPT_SCORE
+    assert index.resolve_district(query, state) == expected
+    # Typos are never corrected on the strict path the API uses
+    assert index.resolve_district(query, state, fuzzy=False) is None
+
+
+@pytest.mark.parametrize("query, candidates", [
+    ("KANPUR", {"KANPUR NAGAR", "KANPUR DEHAT"}),
+    ("RAIMPUR", {"RAIPUR", "RAMPUR"}),
+])
+def test_ambiguous_input_is_rejected_with_suggestions(index, query, candidates):
+    matches = index.suggest_districts(query, "UTTAR PRADESH", k=3)
+    # Both clear the accept score, but neither leads by the margin
+    assert all(match.score >= LocationIndex.ACCEPT_SCORE for match in matches[:2])
+    assert matches[0].score - matches[1].score < LocationIndex.ACCEPT_MARGIN
+
+    assert index.resolve_district(query, "UTTAR PRADESH") is None
+    assert {match.name for match in matches[:2]} == candidates
+
+
+def test_weak_match_is_rejected_with_suggestions(index):
+    matches = index.suggest_districts("NAGPOOR", "MAHARASHTRA", k=3)
+    assert matches[0].name == "NAGPUR" and matches[0].score < LocationIndex.ACCEPT_SCORE
+    assert index.resolve_district("NAGPOOR", "MAHARASHTRA") is None
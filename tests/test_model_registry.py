@@ -0,0 +1,56 @@
+"""
+Tests for bundle resolution and reloading in the model registry
+"""
+
+import os
+
+import numpy as np
+
+from backend.services.inference_engine import export_weights
+from backend.services.model_registry import ModelRegistry, bundle_paths
+from tests.conftest import random_state_dict
+
+
+def write_files(directory, seed: int):
+    os.makedirs(directory, exist_ok=True)
+    export_weights(random_state_dict(seed), os.path.join(directory, "baseline.npz"))
+
+
+def test_promoted_bundle_replaces_the_fallback_files(tmp_path):
+    legacy = tmp_path / "legacy"
+    write_files(legacy, seed=0)
+    fallback = bundle_paths(str(legacy))
+    current = tmp_path / "current"
+
+    registry = ModelRegistry(**fallback, bundle=str(current), engine="numpy", check_interval=0)
+    inputs = np.ones((1, 7), dtype=np.float32)
+    before = registry.get()
+    assert registry.weights_path == fallback["weights_path"]
+
+    # Promote a bundle while the registry serves the fallback files
+    write_files(tmp_path / "bundles" / "v1", seed=1)
+    os.symlink(tmp_path / "bundles" / "v1", current)
+    after = registry.get()
+
+    assert registry.weights_path == str(current / "baseline.npz")
+    assert after.fingerprint != before.fingerprint
+    assert not np.allclose(after.forward(inputs), before.forward(inputs))
+
+    # Removing the bundle falls back to the legacy files again
+    os.unlink(current)
+    assert registry.get().fingerprint == before.fingerprint
+
+
+def test_repointed_bundle_is_reloaded(tmp_path):
+    for version, seed in (("v1", 1), ("v2", 2)):
+        write_files(tmp_path / "bundles" / version, seed)
+    current = tmp_path / "current"
+    os.symlink(tmp_path / "bundles" / "v1", current)
+
+    registry = ModelRegistry(bundle=str(current), engine="numpy", check_interval=0)
+    first = registry.get()
+
+    os.unlink(current)
+    os.symlink(tmp_path / "bundles" / "v2", current)
+
+    assert registry.get().fingerprint != first.fingerprint
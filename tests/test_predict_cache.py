@@ -0,0 +1,54 @@
+"""
+Tests for the /predict/ prediction cache
+"""
+
+import asyncio
+import os
+
+from backend.models.request_models import PredictRequest
+from backend.services.inference_engine import export_weights
+
+from tests.conftest import random_state_dict
+
+
+def predict_request(nitrogen: float) -> PredictRequest:
+    return PredictRequest(
+        state="MAHARASHTRA", district="PUNE", month="JUN",
+        nitrogen=nitrogen, phosphorous=40, potassium=40, ph=6.5, use_auto_values=False
+    )
+
+
+def test_cache_shares_predictions_not_inputs(backend_app, model_bundle, monkeypatch):
+    submitted = []
+
+    async def weather(district, state=None):
+        return 25.0, 70.0
+
+    async def submit(features, top_n=3):
+        submitted.append(list(features))
+        return [("rice", 80.0), ("maize", 15.0), ("jute", 5.0)]
+
+    monkeypatch.setattr(backend_app.weather_service, "get_weather_data_async", weather)
+    monkeypatch.setattr(backend_app.micro_batcher, "submit", submit)
+    backend_app.predict_cache.clear()
+
+    first = asyncio.run(backend_app.run_prediction(predict_request(40.4)))
+    second = asyncio.run(backend_app.run_prediction(predict_request(40.2)))
+
+    # Same rounding bucket: one inference, but each caller sees its own inputs
+    assert len(submitted) == 1
+    assert first.top_predictions == second.top_predictions
+    assert first.soil_values_used["nitrogen"] == 40.4
+    assert second.soil_values_used["nitrogen"] == 40.2
+    assert (second.temperature, second.humidity) == (25.0, 70.0)
+
+    # A reloaded model gets a new fingerprint and misses the cache
+    weights_path = model_bundle / "baseline.npz"
+    previous = os.stat(weights_path)
+    try:
+        export_weights(random_state_dict(seed=1), str(weights_path))
+        os.utime(weights_path, ns=(previous.st_atime_ns, previous.st_mtime_ns + 10**9))
+        asyncio.run(backend_app.run_prediction(predict_request(40.4)))
+        assert len(submitted) == 2
+    finally:
+        export_weights(random_state_dict(), str(weights_path))
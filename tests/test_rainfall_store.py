@@ -0,0 +1,50 @@
+"""
+Tests for the rainfall store
+"""
+
+import os
+
+from backend.services import rainfall_store
+from backend.services.rainfall_store import RainfallStore, RainfallTable
+
+CSV = (
+    "\ufeffSTATE_UT_NAME,DISTRICT,JAN,FEB,ANNUAL\n"
+    "MAHARASHTRA,PUNE,1.5,2.5,900\n"
+    "KERALA,IDUKKI,20,30,3000\n"
+)
+
+
+def write(path, text: str, mtime_ns: int):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reads_csv_with_bom(tmp_path):
+    path = tmp_path / "rainfall.csv"
+    write(path, CSV, 10**18)
+
+    table = RainfallTable.from_csv(str(path))
+    assert table.lookup("MAHARASHTRA", "PUNE", "FEB") == 2.5
+    assert table.districts_by_state == {"MAHARASHTRA": ["PUNE"], "KERALA": ["IDUKKI"]}
+
+
+def test_keeps_last_good_table_when_reload_fails(tmp_path, monkeypatch):
+    path = tmp_path / "rainfall.csv"
+    write(path, CSV, 10**18)
+    store = RainfallStore(str(path), check_interval=0)
+    good = store.table
+
+    parses = []
+    from_csv = RainfallTable.from_csv.__func__
+    monkeypatch.setattr(rainfall_store.RainfallTable, "from_csv",
+                        classmethod(lambda cls, p: parses.append(p) or from_csv(cls, p)))
+
+    # Caught half-written: the key columns are not there yet
+    write(path, "STATE_UT_NAME,DIS", 2 * 10**18)
+    assert store.table is good
+    assert store.table is good
+    assert len(parses) == 1  # the failed file is not re-parsed on every lookup
+
+    write(path, CSV.replace("1.5", "4.5"), 3 * 10**18)
+    assert store.lookup("MAHARASHTRA", "PUNE", "JAN") == 4.5
+    assert len(parses) == 2
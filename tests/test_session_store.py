@@ -0,0 +1,93 @@
+"""
+Tests for the chatbot session stores
+"""
+
+import pytest
+
+from backend.services import session_store
+from backend.services.chatbot_service import Session, Step
+from backend.services.session_store import InMemorySessionStore, SQLiteSessionStore
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def sqlite_store(tmp_path, clock):
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), max_sessions=2, idle_ttl=60, sweep_interval=0)
+
+
+def test_memory_store_expires_idle_sessions():
+    clock = FakeClock()
+    store = InMemorySessionStore(max_sessions=10, idle_ttl=60, clock=clock)
+    store.put("a", {"step": 1})
+    store.put("b", {"step": 2})
+
+    clock.now += 30
+    assert store.get("a") == {"step": 1}  # touching "a" extends its lifetime
+
+    clock.now += 45
+    assert store.get("a") == {"step": 1}
+    assert store.get("b") is None
+    assert store.stats()["expired"] == 1
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2, idle_ttl=60, clock=FakeClock())
+    store.put("a", 1)
+    store.put("b", 2)
+    store.get("a")
+    store.put("c", 3)
+
+    assert store.get("b") is None
+    assert (store.get("a"), store.get("c")) == (1, 3)
+    assert store.stats()["evictions"] == 1
+
+
+def test_sqlite_store_expires_idle_sessions(sqlite_store, clock):
+    sqlite_store.put("a", {"step": 1})
+    clock.now += 61
+    assert sqlite_store.get("a") is None
+
+    sqlite_store.sweep()
+    assert len(sqlite_store) == 0
+
+
+def test_sqlite_store_evicts_least_recently_used(sqlite_store, clock):
+    for session_id in ("a", "b"):
+        sqlite_store.put(session_id, session_id)
+        clock.now += 1
+    sqlite_store.get("a")
+    clock.now += 1
+    sqlite_store.put("c", "c")  # sweeps: three sessions, room for two
+
+    assert sqlite_store.get("b") is None
+    assert (sqlite_store.get("a"), sqlite_store.get("c")) == ("a", "c")
+    assert len(sqlite_store) == 2
+
+
+def test_sqlite_store_round_trips_sessions(tmp_path, clock):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), encode=Session.dumps, decode=Session.loads)
+    session = Session("hi", step=Step.ASK_PH)
+    session.state, session.district, session.month = "MAHARASHTRA", "PUNE", "JUN"
+    session.nitrogen, session.phosphorous, session.potassium = 90.0, 42.0, 43.0
+    session.use_auto_values = False
+    store.put("s1", session)
+
+    loaded = store.get("s1")
+    assert isinstance(loaded, Session)
+    assert loaded.step == Step.ASK_PH and loaded.language == "hi"
+    assert loaded.user_data() == session.user_data()
+    assert loaded.dumps() == session.dumps()
@@ -1,6 +1,4 @@
-from model import net
-import torch
-import pickle
+from backend.services.model_registry import get_model_registry
 import numpy as np
 
 
@@ -9,24 +7,17 @@ def predict_crop(nitrogen, phosphorous, potassium, temperature, humidity, ph, ra
 
 
 def get_prediction(x):
-    model = net.Net_64_128_64(7, 22)
-    model.load_state_dict(torch.load('model/baseline/baseline.hdf5'))
-    normalization = np.load("model/normalization/normalization.npz")
-    mean = normalization["mean"]
-    std = normalization["std"]
+    # Weights, normalization and encoder are loaded once per process and
+    # shared with backend CropService
+    artifacts = get_model_registry().get()
     print(x)
-    input_vector = torch.tensor(x, dtype=torch.float32)
-    input_vector = (input_vector - mean) / std
+    input_vector = np.array([x], dtype=np.float32)
 
-    # print(input_vector.double())
-
-    prediction = model(input_vector)
-
-    with open("model/pkl_files/encoder.pkl", "rb") as file:
-        encoder = pickle.load(file)
+    # Only the argmax is needed, so skip the softmax
+    prediction = artifacts.forward(input_vector, probabilities=False)[0]
 
     predicted = prediction.argmax().item()
-    encoded_labels = encoder.inverse_transform(np.array([predicted]))
+    encoded_labels = artifacts.labels[[predicted]]
 
     # DEBUG
     # print("Encoded labels:", encoded_labels)
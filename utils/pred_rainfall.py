@@ -1,12 +1,13 @@
-import pandas as pd
+from backend.services.rainfall_store import get_rainfall_store
 
 
 def get_rainfall(state, district, month):
-    df = pd.read_csv('data/district wise rainfall normal.csv')
-    row = df[(df['STATE_UT_NAME'] == state) & (df['DISTRICT'] == district)]
-    rainfall = row[month].values
-    if rainfall.size == 0:
+    # Served from the in-memory rainfall index shared with the backend
+    try:
+        rainfall = get_rainfall_store().lookup(state, district, month)
+    except KeyError:
+        rainfall = None
+    if rainfall is None:
         raise Exception(
             f"Unable to match month:{month} with the state:{state} and district:{district}")
-    return rainfall[0]
-
+    return rainfall
@@ -1,19 +1,41 @@
-import requests
+import httpx
 
+# One pooled keep-alive client shared by every request, created on first use
+_client = None
 
-def get_temp_hum(district, state=None, month=None):
 
+def get_client():
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_api_key():
+    # Read on every call so a rotated key is picked up without a restart
     with open(".api_key.txt", "r") as file:
-        API_KEY = file.read().strip()
+        return file.read().strip()
+
+
+async def get_temp_hum(district, state=None, month=None):
+
+    API_KEY = get_api_key()
 
     # Use the API key
 
     url = f"https://api.openweathermap.org/data/2.5/weather?q={district}&appid={API_KEY}"
 
-    payload = {}
-    headers = {}
-
-    response = requests.request("GET", url, headers=headers, data=payload)
+    response = await get_client().get(url)
 
     if response.status_code != 200:
         print(response.text)